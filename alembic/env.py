@@ -26,6 +26,7 @@ from src.models import Base  # noqa
 
 # import models
 from src.models import *  # noqa
+from src.oauth2.models import *  # noqa
 from src.sessions.models import *  # noqa
 from src.users.models import *  # noqa
 
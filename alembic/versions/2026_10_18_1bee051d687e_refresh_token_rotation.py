@@ -0,0 +1,42 @@
+"""refresh token rotation
+
+Revision ID: 1bee051d687e
+Revises: f03058ef414b
+Create Date: 2026-10-18 18:25:14.906342
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "1bee051d687e"
+down_revision: str | None = "f03058ef414b"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "oauth2_sessions",
+        sa.Column("previous_token_hash", sa.LargeBinary(), nullable=True),
+    )
+    op.add_column(
+        "oauth2_sessions", sa.Column("rotated_at", sa.DateTime(), nullable=True)
+    )
+    op.create_index(
+        op.f("ix_oauth2_sessions_previous_token_hash"),
+        "oauth2_sessions",
+        ["previous_token_hash"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f("ix_oauth2_sessions_previous_token_hash"), table_name="oauth2_sessions"
+    )
+    op.drop_column("oauth2_sessions", "rotated_at")
+    op.drop_column("oauth2_sessions", "previous_token_hash")
@@ -0,0 +1,29 @@
+"""user_sessions expires_at index
+
+Revision ID: 68a0d33208ee
+Revises: f0ef7f8c3891
+Create Date: 2026-10-18 14:03:27.118764
+
+"""
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "68a0d33208ee"
+down_revision: str | None = "f0ef7f8c3891"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        op.f("ix_user_sessions_expires_at"),
+        "user_sessions",
+        ["expires_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_user_sessions_expires_at"), table_name="user_sessions")
@@ -0,0 +1,121 @@
+"""partition user_sessions by expires_at
+
+Only applied on postgres when asked for, otherwise a no-op:
+
+    alembic -x partition_user_sessions=true upgrade head
+
+To partition later, downgrade to 68a0d33208ee and upgrade again with it.
+
+Revision ID: da99b330a013
+Revises: 68a0d33208ee
+Create Date: 2026-10-18 14:21:05.640397
+
+"""
+import datetime
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import context, op
+from src.config import settings
+from src.sessions import partitions
+
+# revision identifiers, used by Alembic.
+revision: str = "da99b330a013"
+down_revision: str | None = "68a0d33208ee"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+COLUMNS = "id, user_id, session_id, last_used, ip_address, expires_at"
+
+
+def create_table(name: str, primary_key: str, suffix: str = "") -> None:
+    op.execute(
+        f"CREATE TABLE {name} ("
+        "id INTEGER NOT NULL DEFAULT nextval('user_sessions_id_seq'), "
+        "user_id INTEGER NOT NULL REFERENCES users (id) ON DELETE CASCADE, "
+        "session_id UUID NOT NULL, "
+        "last_used TIMESTAMP WITHOUT TIME ZONE NOT NULL, "
+        "ip_address VARCHAR, "
+        "expires_at TIMESTAMP WITHOUT TIME ZONE NOT NULL, "
+        f"PRIMARY KEY ({primary_key})"
+        f"){suffix}"
+    )
+
+
+def is_partitioned() -> bool:
+    result = op.get_bind().execute(
+        sa.text(
+            "SELECT 1 FROM pg_partitioned_table "
+            "JOIN pg_class ON pg_partitioned_table.partrelid = pg_class.oid "
+            "WHERE pg_class.relname = 'user_sessions'"
+        )
+    )
+    return result.first() is not None
+
+
+def replace_table(primary_key: str, suffix: str = "", where: str = "") -> None:
+    """Move the rows of user_sessions into a new table of the same name."""
+    op.drop_index(op.f("ix_user_sessions_expires_at"), table_name="user_sessions")
+    op.drop_index(op.f("ix_user_sessions_user_id"), table_name="user_sessions")
+    op.execute("ALTER TABLE user_sessions RENAME TO user_sessions_old")
+    op.execute(
+        "ALTER TABLE user_sessions_old "
+        "RENAME CONSTRAINT user_sessions_pkey TO user_sessions_old_pkey"
+    )
+    # the sequence would be dropped together with the old table
+    op.execute("ALTER SEQUENCE user_sessions_id_seq OWNED BY NONE")
+    create_table("user_sessions", primary_key, suffix)
+    if suffix:
+        latest = op.get_bind().scalar(
+            sa.text("SELECT max(expires_at) FROM user_sessions_old")
+        )
+        until = datetime.datetime.now() + datetime.timedelta(
+            hours=settings.USER_TOKEN_EXPIRE_HOURS, days=31
+        )
+        first = partitions.month_start(datetime.datetime.now())
+        for month in partitions.months(
+            first, partitions.month_start(max(until, latest or until))
+        ):
+            op.execute(partitions.create_partition_sql(month))
+    op.execute(
+        f"INSERT INTO user_sessions ({COLUMNS}) "
+        f"SELECT {COLUMNS} FROM user_sessions_old {where}"
+    )
+    op.execute("DROP TABLE user_sessions_old")
+    op.execute("ALTER SEQUENCE user_sessions_id_seq OWNED BY user_sessions.id")
+    op.create_index(
+        op.f("ix_user_sessions_user_id"), "user_sessions", ["user_id"], unique=False
+    )
+    op.create_index(
+        op.f("ix_user_sessions_expires_at"),
+        "user_sessions",
+        ["expires_at"],
+        unique=False,
+    )
+
+
+def partition_requested() -> bool:
+    x_args = context.get_x_argument(as_dictionary=True)
+    return x_args.get("partition_user_sessions", "false").lower() == "true"
+
+
+def upgrade() -> None:
+    if (
+        not partition_requested()
+        or op.get_bind().dialect.name != "postgresql"
+        or is_partitioned()
+    ):
+        return
+    # sessions that expired before this month have no partition to go to
+    replace_table(
+        primary_key="id, expires_at",
+        suffix=" PARTITION BY RANGE (expires_at)",
+        where="WHERE expires_at >= date_trunc('month', now())",
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql" or not is_partitioned():
+        return
+    replace_table(primary_key="id")
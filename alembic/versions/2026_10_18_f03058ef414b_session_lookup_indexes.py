@@ -0,0 +1,74 @@
+"""session lookup indexes
+
+Revision ID: f03058ef414b
+Revises: da99b330a013
+Create Date: 2026-10-18 16:40:52.273915
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f03058ef414b"
+down_revision: str | None = "da99b330a013"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # oauth2_sessions used to be created by the app on startup only
+    if not sa.inspect(op.get_bind()).has_table("oauth2_sessions"):
+        op.create_table(
+            "oauth2_sessions",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("refresh_token_hash", sa.LargeBinary(), nullable=False),
+            sa.Column("session_id", sa.Uuid(), nullable=False),
+            sa.Column("app_id", sa.Uuid(), nullable=False),
+            sa.Column("scope", sa.String(), nullable=False),
+            sa.Column("last_used", sa.DateTime(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index(
+            op.f("ix_oauth2_sessions_refresh_token_hash"),
+            "oauth2_sessions",
+            ["refresh_token_hash"],
+            unique=False,
+        )
+    else:
+        op.drop_index("ix_oauth2_sessions_user_id", table_name="oauth2_sessions")
+    op.create_index(
+        "ix_oauth2_sessions_user_id_session_id",
+        "oauth2_sessions",
+        ["user_id", "session_id"],
+        unique=True,
+    )
+
+    op.drop_index(op.f("ix_user_sessions_user_id"), table_name="user_sessions")
+    op.create_index(
+        "ix_user_sessions_user_id_session_id",
+        "user_sessions",
+        # unique indexes of a partitioned table have to contain expires_at
+        ["user_id", "session_id", "expires_at"],
+        unique=True,
+        postgresql_include=["id", "last_used", "ip_address"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_sessions_user_id_session_id", table_name="user_sessions")
+    op.create_index(
+        op.f("ix_user_sessions_user_id"), "user_sessions", ["user_id"], unique=False
+    )
+    op.drop_index("ix_oauth2_sessions_user_id_session_id", table_name="oauth2_sessions")
+    op.create_index(
+        op.f("ix_oauth2_sessions_user_id"),
+        "oauth2_sessions",
+        ["user_id"],
+        unique=False,
+    )
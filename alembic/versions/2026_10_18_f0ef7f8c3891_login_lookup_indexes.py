@@ -0,0 +1,32 @@
+"""login lookup indexes
+
+Revision ID: f0ef7f8c3891
+Revises: 921ec37abd97
+Create Date: 2026-10-18 10:12:41.508213
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f0ef7f8c3891"
+down_revision: str | None = "921ec37abd97"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_users_lower_username", "users", [sa.text("lower(username)")], unique=False
+    )
+    op.create_index(
+        "ix_users_lower_email", "users", [sa.text("lower(email)")], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_lower_email", table_name="users")
+    op.drop_index("ix_users_lower_username", table_name="users")
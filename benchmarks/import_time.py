@@ -0,0 +1,99 @@
+"""
+Import time of the app, the main part of a worker's cold start.
+
+Imports `--module` in `--runs` fresh interpreters with `-X importtime` and
+reports the median total, the packages that take the longest and the
+slowest first-party modules of the median run:
+
+    python -m benchmarks.import_time --module src.main --runs 5 \\
+        --output importtime.txt
+
+The settings are read as on startup, run it where `.env` is.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from dataclasses import dataclass
+
+
+@dataclass
+class ImportEntry:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def measure(module: str) -> list[ImportEntry]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        if not self_us.strip().isdigit():
+            # the header line
+            continue
+        entries.append(
+            ImportEntry(
+                module=name.strip(),
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+                depth=(len(name) - len(name.lstrip())) // 2,
+            )
+        )
+    return entries
+
+
+def total_us(entries: list[ImportEntry]) -> int:
+    return sum(entry.self_us for entry in entries)
+
+
+def report(entries: list[ImportEntry], top: int = 20) -> str:
+    by_package: dict[str, int] = defaultdict(int)
+    for entry in entries:
+        by_package[entry.module.partition(".")[0]] += entry.self_us
+    first_party = [entry for entry in entries if entry.module.startswith("src.")]
+
+    lines = [f"total {total_us(entries) / 1000:9.1f}ms  {len(entries)} modules", ""]
+    lines.append("packages (self time of all their modules)")
+    for package, us in sorted(by_package.items(), key=lambda item: -item[1])[:top]:
+        lines.append(f"  {us / 1000:9.1f}ms  {package}")
+    lines.append("")
+    lines.append("first-party modules (cumulative)")
+    for entry in sorted(first_party, key=lambda entry: -entry.cumulative_us)[:top]:
+        lines.append(f"  {entry.cumulative_us / 1000:9.1f}ms  {entry.module}")
+    return "\n".join(lines) + "\n"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="src.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    runs = sorted((measure(args.module) for _ in range(args.runs)), key=total_us)
+    median = runs[len(runs) // 2]
+    print(
+        f"{args.module}: median {statistics.median(map(total_us, runs)) / 1000:.1f}ms"
+        f" over {args.runs} runs"
+    )
+    text = report(median, top=args.top)
+    print(text, end="")
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Latency of the login endpoint broken down by stage.
+
+Logs in `--requests` times with `--concurrency` parallel clients against a
+running server and reports the total latency and the per-stage durations the
+endpoint returns in its Server-Timing header. The server only sends the
+header with `LOGIN_SERVER_TIMING=true`:
+
+    python -m benchmarks.login_latency \\
+        --url http://localhost:8000/auth/login/ \\
+        --login johndoe --password 'INrf3fs@' --requests 500 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from collections import defaultdict
+
+import httpx
+
+
+def parse_server_timing(header: str) -> dict[str, float]:
+    stages = {}
+    for entry in header.split(","):
+        name, _, duration = entry.strip().partition(";dur=")
+        if duration:
+            stages[name] = float(duration)
+    return stages
+
+
+def report(name: str, values: list[float]) -> None:
+    values = sorted(values)
+    p99 = values[int(len(values) * 0.99) - 1] if len(values) > 1 else values[0]
+    print(
+        f"{name:<10}"
+        f"  mean {statistics.mean(values):7.2f}ms"
+        f"  p50 {statistics.median(values):7.2f}ms"
+        f"  p99 {p99:7.2f}ms"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", required=True)
+    parser.add_argument("--login", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    totals: list[float] = []
+    stages: dict[str, list[float]] = defaultdict(list)
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def login(client: httpx.AsyncClient) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post(
+                args.url, json={"login": args.login, "password": args.password}
+            )
+            totals.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+        for name, duration in parse_server_timing(
+            response.headers.get("Server-Timing", "")
+        ).items():
+            stages[name].append(duration)
+
+    async with httpx.AsyncClient(timeout=60) as client:
+        await asyncio.gather(*(login(client) for _ in range(args.requests)))
+
+    report("total", totals)
+    for name, durations in stages.items():
+        report(name, durations)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,16 @@
+import os
+
+# settings the tests run with unless the environment sets them
+TEST_ENVIRONMENT = {
+    "SQLALCHEMY_DATABASE_URI": "sqlite+aiosqlite:///test.db",
+    "REDIS_URL": "redis://localhost:6379",
+    "MONGO_URL": "mongodb://localhost:27017",
+    "MONGO_DATABASE_NAME": "auth_server_test",
+    "SMTP_USER": "test",
+    "SMTP_PASSWORD": "test",
+    "SMTP_FROM_EMAIL": "test@example.com",
+    "SMTP_FROM_NAME": "Auth Server",
+}
+
+for name, value in TEST_ENVIRONMENT.items():
+    os.environ.setdefault(name, value)
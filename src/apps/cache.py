@@ -0,0 +1,134 @@
+import asyncio
+import contextlib
+import logging
+from typing import Any
+from uuid import UUID
+
+from cachetools import TTLCache
+from redis.exceptions import RedisError
+
+from src.config import settings
+from src.metrics import metrics
+from src.redis_helper import redis_client
+
+from .schemas import AppInMongo
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "apps_cache_invalidate"
+
+
+class CachedApp:
+    """Read-only app registration prepared for the OAuth2 endpoints."""
+
+    __slots__ = (
+        "id",
+        "client_id",
+        "client_secret",
+        "creator_id",
+        "redirect_uris",
+        "scopes",
+        "allowed_scopes",
+    )
+
+    def __init__(self, app: AppInMongo) -> None:
+        self.id = app.id
+        self.client_id = app.client_id
+        self.client_secret = app.client_secret
+        self.creator_id = app.creator_id
+        self.redirect_uris = frozenset(app.redirect_uris)
+        # keeps the registered order for the `scope` of issued tokens
+        self.scopes = tuple(app.scopes)
+        self.allowed_scopes = frozenset(app.scopes)
+
+
+class AppCache:
+    """
+    In-process cache of apps by `client_id`, bounded in size and age.
+
+    Changes made through `AppsRegistry` evict the app locally and announce
+    it on a Redis channel so other workers evict it too; `ttl` bounds how
+    long a worker that missed the announcement may serve a stale app.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self._cache = TTLCache(maxsize=max(maxsize, 1), ttl=ttl)
+        # bumped on every eviction, a lookup that raced with an eviction
+        # must not store what it read
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.subscribed = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+
+    def get(self, client_id: UUID) -> CachedApp | None:
+        if self.maxsize <= 0:
+            return None
+        app: CachedApp | None = self._cache.get(client_id)
+        if app is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return app
+
+    def set(self, app: CachedApp, generation: int) -> None:
+        if self.maxsize > 0 and generation == self.generation:
+            self._cache[app.client_id] = app
+
+    def evict(self, client_id: UUID) -> None:
+        self.generation += 1
+        self._cache.pop(client_id, None)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._cache.clear()
+
+    async def invalidate(self, client_id: UUID) -> None:
+        self.evict(client_id)
+        try:
+            await redis_client.publish(INVALIDATION_CHANNEL, client_id.hex)
+        except RedisError:
+            logger.exception("Failed to announce app cache invalidation")
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with redis_client.pubsub() as pubsub:
+                    await pubsub.subscribe(INVALIDATION_CHANNEL)
+                    # announcements may have been missed while unsubscribed
+                    self.clear()
+                    self.subscribed.set()
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self.evict(UUID(hex=message["data"].decode()))
+            except Exception:
+                logger.exception("App cache invalidation listener failed")
+                self.subscribed.clear()
+                self.clear()
+                await asyncio.sleep(1)
+
+    def start(self) -> None:
+        if self._task is None and self.maxsize > 0:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "size": len(self._cache),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+app_cache = AppCache(
+    maxsize=settings.APPS_CACHE_SIZE, ttl=settings.APPS_CACHE_TTL_SECONDS
+)
+metrics.register("apps_cache", app_cache.stats)
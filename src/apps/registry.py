@@ -5,6 +5,7 @@ from pymongo import ReturnDocument
 
 from src.mongo_helper import db
 
+from .cache import CachedApp, app_cache
 from .schemas import AppInMongo
 
 app_collection = db["apps"]
@@ -25,16 +26,37 @@ class AppsRegistry:
         return None
 
     @staticmethod
-    async def get_by_client_id(client_id: UUID) -> AppInMongo | None:
+    async def get_by_client_id(client_id: UUID) -> CachedApp | None:
+        cached_app = app_cache.get(client_id)
+        if cached_app:
+            return cached_app
+        generation = app_cache.generation
         found_app = await app_collection.find_one({"client_id": client_id})
         if found_app:
-            return AppInMongo(**found_app)
+            app = CachedApp(AppInMongo(**found_app))
+            app_cache.set(app, generation=generation)
+            return app
         return None
 
+    @staticmethod
+    async def preload(limit: int) -> int:
+        """Fill the app cache with up to `limit` apps."""
+        generation = app_cache.generation
+        loaded = 0
+        async for found_app in app_collection.find().limit(limit):
+            app_cache.set(CachedApp(AppInMongo(**found_app)), generation=generation)
+            loaded += 1
+        return loaded
+
     @staticmethod
     async def delete(app_id: UUID) -> int:
-        result = await app_collection.delete_one({"_id": app_id})
-        return result.deleted_count
+        deleted_app = await app_collection.find_one_and_delete(
+            {"_id": app_id}, projection={"client_id": True}
+        )
+        if deleted_app:
+            await app_cache.invalidate(deleted_app["client_id"])
+            return 1
+        return 0
 
     @staticmethod
     async def update(app_id: UUID, new_values: dict[str, Any]) -> AppInMongo:
@@ -43,7 +65,9 @@ class AppsRegistry:
             {"$set": new_values},
             return_document=ReturnDocument.AFTER,
         )
-        return AppInMongo(**updated_app)
+        app = AppInMongo(**updated_app)
+        await app_cache.invalidate(app.client_id)
+        return app
 
     @staticmethod
     async def update_optional(
@@ -55,5 +79,7 @@ class AppsRegistry:
             return_document=ReturnDocument.AFTER,
         )
         if updated_app:
-            return AppInMongo(**updated_app)
+            app = AppInMongo(**updated_app)
+            await app_cache.invalidate(app.client_id)
+            return app
         return None
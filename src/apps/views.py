@@ -23,9 +23,7 @@ router = APIRouter(prefix="", tags=["apps"])
     response_model_by_alias=False,
 )
 async def regenerate_client_secret(app: AppAccessControlDep) -> Any:
-    app.client_secret = uuid4()
-    await AppsRegistry.update(app.id, {"client_secret": app.client_secret})
-    return app
+    return await AppsRegistry.update(app.id, {"client_secret": uuid4()})
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model_by_alias=False)
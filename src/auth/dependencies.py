@@ -1,17 +1,20 @@
 from typing import Annotated
 
-import jwt
 from fastapi import Security
 from fastapi.security import OAuth2PasswordBearer, SecurityScopes
 from jwt.exceptions import ExpiredSignatureError, PyJWTError
 from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.auth.schemas import UserTokenPayload
+from src.auth.revocation import token_revocation
+from src.auth.schemas import UserPrincipal, UserTokenPayload
+from src.auth.token_cache import token_cache
 from src.config import settings
-from src.database import DbSession
+from src.database import DbReadSession, DbSession
+from src.keys.manager import key_manager
+from src.oauth2.denylist import oauth2_denylist
 from src.oauth2.schemas import OAuth2AccessTokenPayload
-from src.sessions.crud import SessionsDB
+from src.sessions.last_used import last_used_writer
 from src.sessions.models import UserSessionsInDB
 from src.users.crud import UsersDB
 from src.users.exceptions import (
@@ -39,20 +42,22 @@ BearerToken = Annotated[str | None, Security(oauth2_scheme)]
 def decode_payload(
     token: str,
 ) -> UserTokenPayload | OAuth2AccessTokenPayload:
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
     try:
-        payload_dict = jwt.decode(
-            jwt=token,
-            key=settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM],
-        )
+        payload_dict = key_manager.decode(token)
+        payload: UserTokenPayload | OAuth2AccessTokenPayload
         if "scopes" in payload_dict:
-            return OAuth2AccessTokenPayload(**payload_dict)
+            payload = OAuth2AccessTokenPayload(**payload_dict)
         else:
-            return UserTokenPayload(**payload_dict)
+            payload = UserTokenPayload(**payload_dict)
     except ExpiredSignatureError:
         raise InvalidToken()
     except (PyJWTError, ValidationError):
         raise InvalidToken()
+    token_cache.set(token, payload)
+    return payload
 
 
 def get_authorization(token: BearerToken) -> str:
@@ -79,21 +84,32 @@ async def authenticate_as_user(
         raise InvalidToken()
     elif not user.active:
         raise InactiveUser()
-    await SessionsDB.update_last_used(user_session=user_session, session=session)
+    last_used_writer.touch(user_session)
     return user, user_session
 
 
 async def authenticate_as_oauth2(
     req_scopes: SecurityScopes, payload: OAuth2AccessTokenPayload, session: AsyncSession
-) -> UserInDB:
+) -> UserInDB | UserPrincipal:
     disallowed_scopes = [
         scope for scope in payload.scopes if scope not in req_scopes.scopes
     ]
     if disallowed_scopes:
         raise MissingScope(disallowed_scopes)
-    user = await UsersDB.get_by_id(id=int(payload.sub), session=session)
+    # the token itself or its whole OAuth2 session may have been revoked
+    revocable = [jti for jti in (payload.jti, payload.sid) if jti is not None]
+    if revocable and await token_revocation.filter_revoked(revocable, sole_record=True):
+        raise InvalidToken()
+    user_id = int(payload.sub)
+    if settings.STATELESS_ACCESS_TOKENS:
+        if oauth2_denylist.is_denied(user_id, issued_at=payload.iat):
+            raise InvalidToken()
+        return UserPrincipal(id=user_id, scopes=payload.scopes)
+    user = await UsersDB.get_by_id(id=user_id, session=session)
     if user is None:
         raise UserNotFound()
+    elif not user.active:
+        raise InactiveUser()
     return user
 
 
@@ -101,9 +117,12 @@ async def user_authorization(
     req_scopes: SecurityScopes,
     session: DbSession,
     token: str = Security(get_authorization),
-) -> tuple[UserInDB, UserSessionsInDB | None]:
+) -> tuple[UserInDB | UserPrincipal, UserSessionsInDB | None]:
     payload = decode_payload(token)
     if isinstance(payload, UserTokenPayload):
+        # revoked sessions are rejected before they are looked up
+        if await token_revocation.is_revoked(payload.jti):
+            raise InvalidToken()
         return await authenticate_as_user(payload, session)
     elif isinstance(payload, OAuth2AccessTokenPayload):
         user = await authenticate_as_oauth2(req_scopes, payload, session)
@@ -111,17 +130,38 @@ async def user_authorization(
 
 
 UserAuthorizationDep = Annotated[
-    tuple[UserInDB, UserSessionsInDB | None], Security(user_authorization)
+    tuple[UserInDB | UserPrincipal, UserSessionsInDB | None],
+    Security(user_authorization),
 ]
 
 
 async def get_user(
     user_with_session: UserAuthorizationDep,
-) -> UserInDB:
+) -> UserInDB | UserPrincipal:
     user, _ = user_with_session
     return user
 
 
+async def get_user_profile(
+    user: Annotated[UserInDB | UserPrincipal, Security(get_user)],
+    session: DbReadSession,
+) -> UserInDB:
+    """
+    Get user loaded from the database.
+
+    Stateless OAuth2 tokens only carry a `UserPrincipal`, so the user is
+    fetched for endpoints that need the whole profile.
+    """
+    if isinstance(user, UserInDB):
+        return user
+    found_user = await UsersDB.get_by_id(id=user.id, session=session)
+    if found_user is None:
+        raise UserNotFound()
+    elif not found_user.active:
+        raise InactiveUser()
+    return found_user
+
+
 async def get_user_with_session(
     user_with_session: UserAuthorizationDep,
 ) -> tuple[UserInDB, UserSessionsInDB]:
@@ -135,7 +175,7 @@ async def get_user_with_session(
             and it does not support sessions
     """
     user, user_session = user_with_session
-    if user_session is None:
+    if user_session is None or not isinstance(user, UserInDB):
         raise NotSupportedByOAuth2()
     return user, user_session
 
@@ -144,7 +184,7 @@ async def get_user_optional(
     req_scopes: SecurityScopes,
     session: DbSession,
     token: str | None = Security(get_authorization_optional),
-) -> UserInDB | None:
+) -> UserInDB | UserPrincipal | None:
     if token is None:
         return None
     else:
@@ -17,6 +17,15 @@ class UsernameAlreadyExists(HTTPException):
         )
 
 
+class HashingOverloaded(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests, try again later",
+            headers={"Retry-After": "1"},
+        )
+
+
 class InvalidCredentials(HTTPException):
     def __init__(self) -> None:
         super().__init__(
@@ -0,0 +1,132 @@
+from abc import ABC, abstractmethod
+
+import bcrypt
+from argon2 import PasswordHasher as Argon2PasswordHasher
+from argon2 import Type
+from argon2.exceptions import InvalidHashError, VerificationError
+
+from src.config import settings
+
+
+class PasswordHasher(ABC):
+    """
+    A password hashing scheme.
+
+    Hashes are stored in a self-describing format (`$2b$12$...`,
+    `$argon2id$v=19$m=...`), so the scheme and its parameters are read back
+    from the hash itself.
+    """
+
+    name: str
+
+    @abstractmethod
+    def identify(self, hashed_password: bytes) -> bool:
+        ...
+
+    @abstractmethod
+    def hash(self, password: str) -> bytes:
+        ...
+
+    @abstractmethod
+    def verify(self, password: str, hashed_password: bytes) -> bool:
+        ...
+
+    @abstractmethod
+    def needs_rehash(self, hashed_password: bytes) -> bool:
+        ...
+
+
+class BcryptHasher(PasswordHasher):
+    name = "bcrypt"
+
+    def __init__(self, rounds: int) -> None:
+        self.rounds = rounds
+
+    def identify(self, hashed_password: bytes) -> bool:
+        return hashed_password.startswith((b"$2a$", b"$2b$", b"$2y$"))
+
+    def hash(self, password: str) -> bytes:
+        return bcrypt.hashpw(
+            password=password.encode(),
+            salt=bcrypt.gensalt(rounds=self.rounds),
+        )
+
+    def verify(self, password: str, hashed_password: bytes) -> bool:
+        return bcrypt.checkpw(
+            password=password.encode(),
+            hashed_password=hashed_password,
+        )
+
+    def needs_rehash(self, hashed_password: bytes) -> bool:
+        return int(hashed_password[4:6]) != self.rounds
+
+
+class Argon2idHasher(PasswordHasher):
+    name = "argon2id"
+
+    def __init__(self, time_cost: int, memory_cost: int, parallelism: int) -> None:
+        self._hasher = Argon2PasswordHasher(
+            time_cost=time_cost,
+            memory_cost=memory_cost,
+            parallelism=parallelism,
+            type=Type.ID,
+        )
+
+    def identify(self, hashed_password: bytes) -> bool:
+        return hashed_password.startswith(b"$argon2")
+
+    def hash(self, password: str) -> bytes:
+        return self._hasher.hash(password).encode()
+
+    def verify(self, password: str, hashed_password: bytes) -> bool:
+        try:
+            return self._hasher.verify(hashed_password, password)
+        except (VerificationError, InvalidHashError):
+            return False
+
+    def needs_rehash(self, hashed_password: bytes) -> bool:
+        return self._hasher.check_needs_rehash(hashed_password.decode())
+
+
+class HasherRegistry:
+    """
+    Hashes new passwords with the default hasher and verifies stored hashes
+    with whichever registered hasher produced them.
+    """
+
+    def __init__(self, hashers: list[PasswordHasher], default: str) -> None:
+        self._hashers = {hasher.name: hasher for hasher in hashers}
+        self.default = self._hashers[default]
+
+    def identify(self, hashed_password: bytes) -> PasswordHasher | None:
+        for hasher in self._hashers.values():
+            if hasher.identify(hashed_password):
+                return hasher
+        return None
+
+    def hash(self, password: str) -> bytes:
+        return self.default.hash(password)
+
+    def verify(self, password: str, hashed_password: bytes) -> bool:
+        hasher = self.identify(hashed_password)
+        if hasher is None:
+            return False
+        return hasher.verify(password, hashed_password)
+
+    def needs_rehash(self, hashed_password: bytes) -> bool:
+        """Whether the hash uses another scheme or stale parameters."""
+        hasher = self.identify(hashed_password)
+        return hasher is not self.default or self.default.needs_rehash(hashed_password)
+
+
+password_hashers = HasherRegistry(
+    hashers=[
+        BcryptHasher(rounds=settings.BCRYPT_ROUNDS),
+        Argon2idHasher(
+            time_cost=settings.ARGON2_TIME_COST,
+            memory_cost=settings.ARGON2_MEMORY_COST_KIB,
+            parallelism=settings.ARGON2_PARALLELISM,
+        ),
+    ],
+    default=settings.PASSWORD_HASHER,
+)
@@ -0,0 +1,103 @@
+import asyncio
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from src.config import settings
+from src.metrics import metrics
+
+from .exceptions import HashingOverloaded
+
+T = TypeVar("T")
+
+
+def _timed(func: Callable[..., T], *args: Any) -> tuple[float, float, T]:
+    started = time.monotonic()
+    result = func(*args)
+    return started, time.monotonic(), result
+
+
+class HashingExecutor:
+    """
+    Runs password hashing off the event loop in a dedicated pool.
+
+    At most `workers` hashes run at once and `max_queue` more may wait for
+    a worker; anything beyond that is rejected with 429 instead of piling
+    up behind a saturated pool.
+    """
+
+    def __init__(self, workers: int, max_queue: int, use_processes: bool) -> None:
+        self.workers = workers
+        self.max_queue = max_queue
+        self.use_processes = use_processes
+        self._executor: Executor | None = None
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.hash_seconds_total = 0.0
+        self.hash_seconds_max = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.use_processes:
+                # multiprocessing is only imported when it is used
+                from concurrent.futures import ProcessPoolExecutor
+
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                # bcrypt releases the GIL while hashing
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="hashing"
+                )
+        return self._executor
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        if self.in_flight >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise HashingOverloaded()
+        self.in_flight += 1
+        submitted = time.monotonic()
+        try:
+            loop = asyncio.get_running_loop()
+            timed: tuple[float, float, T] = await loop.run_in_executor(
+                self._get_executor(), _timed, func, *args
+            )
+        finally:
+            self.in_flight -= 1
+        started, finished, result = timed
+        wait, duration = started - submitted, finished - started
+        self.completed += 1
+        self.wait_seconds_total += wait
+        self.wait_seconds_max = max(self.wait_seconds_max, wait)
+        self.hash_seconds_total += duration
+        self.hash_seconds_max = max(self.hash_seconds_max, duration)
+        return result
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "wait_seconds_total": self.wait_seconds_total,
+            "wait_seconds_max": self.wait_seconds_max,
+            "hash_seconds_total": self.hash_seconds_total,
+            "hash_seconds_max": self.hash_seconds_max,
+        }
+
+
+hashing_executor = HashingExecutor(
+    workers=settings.PASSWORD_HASHING_WORKERS,
+    max_queue=settings.PASSWORD_HASHING_MAX_QUEUE,
+    use_processes=settings.PASSWORD_HASHING_USE_PROCESSES,
+)
+metrics.register("password_hashing", hashing_executor.stats)
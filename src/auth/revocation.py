@@ -0,0 +1,224 @@
+import asyncio
+import contextlib
+import datetime
+import hashlib
+import logging
+import math
+import time
+from collections.abc import Iterable, Mapping
+from typing import Any
+from uuid import UUID
+
+from redis.exceptions import RedisError
+
+from src.config import settings
+from src.metrics import metrics
+from src.redis_helper import redis_client
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "revoked_jti:"
+REVOCATION_CHANNEL = "revoked_jti"
+
+
+def _key(jti: UUID) -> str:
+    return f"{KEY_PREFIX}{jti.hex}"
+
+
+class BloomFilter:
+    """
+    Set of token ids that may report false positives but no false
+    negatives, sized for `capacity` ids at `error_rate`.
+    """
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        capacity = max(capacity, 1)
+        self.bits = max(
+            math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2), 8
+        )
+        self.hashes = max(round(self.bits / capacity * math.log(2)), 1)
+        self.size = 0
+        self._array = bytearray((self.bits + 7) // 8)
+
+    def _positions(self, jti: UUID) -> Iterable[int]:
+        digest = hashlib.blake2b(jti.bytes, digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (first + i * second) % self.bits
+
+    def add(self, jti: UUID) -> None:
+        for position in self._positions(jti):
+            self._array[position >> 3] |= 1 << (position & 7)
+        self.size += 1
+
+    def __contains__(self, jti: UUID) -> bool:
+        return all(
+            self._array[position >> 3] & (1 << (position & 7))
+            for position in self._positions(jti)
+        )
+
+
+class TokenRevocationList:
+    """
+    Token ids (`jti`) revoked before their tokens expire.
+
+    Redis keeps a key per revoked id that expires together with the token.
+    Each worker mirrors the ids in a bloom filter, fed by a Redis channel
+    and rebuilt from the keys every `rebuild_interval` seconds to forget
+    expired ones, so an id missing from the filter is not revoked without
+    asking Redis. Ids in the filter, or any id before the filter is synced,
+    are checked in Redis.
+
+    Redis errors let the token through if the sessions table stays
+    authoritative for it. Redis is the only record of a revoked OAuth2
+    access token, those are treated as revoked if `fail_closed`.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        error_rate: float,
+        rebuild_interval: float,
+        fail_closed: bool = False,
+    ) -> None:
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.rebuild_interval = rebuild_interval
+        self.fail_closed = fail_closed
+        self._filter = BloomFilter(capacity, error_rate)
+        self.synced = asyncio.Event()
+        self.checks = 0
+        self.lookups = 0
+        self.revoked_hits = 0
+        self._task: asyncio.Task[None] | None = None
+
+    def _may_be_revoked(self, jti: UUID) -> bool:
+        self.checks += 1
+        if not self.synced.is_set() or jti in self._filter:
+            self.lookups += 1
+            return True
+        return False
+
+    async def is_revoked(self, jti: UUID, sole_record: bool = False) -> bool:
+        """
+        `sole_record` if nothing but this list records the token revoked.
+        """
+        if not self._may_be_revoked(jti):
+            return False
+        try:
+            revoked = bool(await redis_client.exists(_key(jti)))
+        except RedisError:
+            logger.warning("Token revocation list is unavailable", exc_info=True)
+            return sole_record and self.fail_closed
+        self.revoked_hits += revoked
+        return revoked
+
+    async def filter_revoked(
+        self, jtis: Iterable[UUID], sole_record: bool = False
+    ) -> set[UUID]:
+        """Return the revoked ids among `jtis` with one round trip at most."""
+        candidates = [jti for jti in set(jtis) if self._may_be_revoked(jti)]
+        if not candidates:
+            return set()
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for jti in candidates:
+                    pipe.exists(_key(jti))
+                found = await pipe.execute()
+        except RedisError:
+            logger.warning("Token revocation list is unavailable", exc_info=True)
+            return set(candidates) if sole_record and self.fail_closed else set()
+        revoked = {jti for jti, exists in zip(candidates, found, strict=True) if exists}
+        self.revoked_hits += len(revoked)
+        return revoked
+
+    async def revoke(self, expiries: Mapping[UUID, datetime.datetime]) -> None:
+        """Revoke tokens by id, each would be valid until its expiry."""
+        now = time.time()
+        remaining = {
+            jti: math.ceil(expires_at.timestamp() - now)
+            for jti, expires_at in expiries.items()
+        }
+        jtis = [jti for jti, seconds in remaining.items() if seconds > 0]
+        if not jtis:
+            return
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for jti in jtis:
+                pipe.set(_key(jti), 1, ex=remaining[jti])
+            # announced after the keys are set, a rebuild that misses the
+            # announcement reads the keys
+            for jti in jtis:
+                pipe.publish(REVOCATION_CHANNEL, jti.bytes)
+            await pipe.execute()
+        for jti in jtis:
+            self._filter.add(jti)
+
+    async def rebuild(self) -> None:
+        bloom = BloomFilter(self.capacity, self.error_rate)
+        async for key in redis_client.scan_iter(match=f"{KEY_PREFIX}*", count=1000):
+            bloom.add(UUID(hex=key[len(KEY_PREFIX) :].decode()))
+        self._filter = bloom
+        if bloom.size > self.capacity:
+            logger.warning(
+                "%s revoked tokens exceed the filter capacity of %s",
+                bloom.size,
+                self.capacity,
+            )
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with redis_client.pubsub() as pubsub:
+                    await pubsub.subscribe(REVOCATION_CHANNEL)
+                    # revocations may have been missed while unsubscribed
+                    await self.rebuild()
+                    self.synced.set()
+                    rebuild_at = time.monotonic() + self.rebuild_interval
+                    while True:
+                        message = await pubsub.get_message(
+                            ignore_subscribe_messages=True,
+                            timeout=max(rebuild_at - time.monotonic(), 0),
+                        )
+                        if message is not None and message["type"] == "message":
+                            self._filter.add(UUID(bytes=message["data"]))
+                        if time.monotonic() >= rebuild_at:
+                            await self.rebuild()
+                            rebuild_at = time.monotonic() + self.rebuild_interval
+            except Exception:
+                logger.exception("Token revocation listener failed")
+                self.synced.clear()
+                await asyncio.sleep(1)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        self.synced.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "synced": self.synced.is_set(),
+            "size": self._filter.size,
+            "capacity": self.capacity,
+            "bits": self._filter.bits,
+            "hashes": self._filter.hashes,
+            "checks": self.checks,
+            "lookups": self.lookups,
+            "revoked_hits": self.revoked_hits,
+        }
+
+
+token_revocation = TokenRevocationList(
+    capacity=settings.TOKEN_REVOCATION_CAPACITY,
+    error_rate=settings.TOKEN_REVOCATION_ERROR_RATE,
+    rebuild_interval=settings.TOKEN_REVOCATION_REBUILD_SECONDS,
+    fail_closed=settings.TOKEN_REVOCATION_FAIL_CLOSED,
+)
+metrics.register("token_revocation", token_revocation.stats)
@@ -19,6 +19,13 @@ class UserTokenPayload(BaseModel):
     )
 
 
+class UserPrincipal(BaseModel):
+    """User identified by a trusted OAuth2 access token, not loaded from DB."""
+
+    id: int
+    scopes: list[str]
+
+
 class UserTokenSchema(BaseModel):
     user_id: int
     token: str
@@ -0,0 +1,67 @@
+import hashlib
+import time
+from typing import Any
+
+from cachetools import TLRUCache
+
+from src.auth.schemas import UserTokenPayload
+from src.config import settings
+from src.metrics import metrics
+from src.oauth2.schemas import OAuth2AccessTokenPayload
+
+TokenPayload = UserTokenPayload | OAuth2AccessTokenPayload
+
+
+def _expires_at(_: bytes, payload: TokenPayload, __: float) -> float:
+    return payload.exp.timestamp()
+
+
+class TokenCache:
+    """
+    Bounded LRU of validated token payloads keyed by the token digest.
+
+    Entries expire together with the token (`exp`), so a token is only
+    verified and parsed once for its whole lifetime.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._cache = TLRUCache(
+            maxsize=max(maxsize, 1), ttu=_expires_at, timer=time.time
+        )
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> TokenPayload | None:
+        if self.maxsize <= 0:
+            return None
+        payload: TokenPayload | None = self._cache.get(self._key(token))
+        if payload is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return payload
+
+    def set(self, token: str, payload: TokenPayload) -> None:
+        if self.maxsize <= 0:
+            return
+        self._cache[self._key(token)] = payload
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "size": len(self._cache),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+token_cache = TokenCache(maxsize=settings.TOKEN_CACHE_SIZE)
+metrics.register("token_cache", token_cache.stats)
@@ -3,16 +3,17 @@ import string
 import uuid
 from typing import Any
 
-import bcrypt
-import jwt
 from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.config import settings
+from src.keys.manager import key_manager
+from src.rate_limit.dependencies import client_ip
 from src.sessions.crud import SessionsDB
 from src.users.models import UserInDB
 from src.utils import UUIDEncoder
 
+from .hashers import password_hashers
+from .hashing import hashing_executor
 from .schemas import (
     UserTokenPayload,
     UserTokenSchema,
@@ -28,23 +29,17 @@ def gen_otp_with_token() -> tuple[str, str]:
 def _create_token(
     data: dict[str, Any],
 ) -> str:
-    encoded_jwt = jwt.encode(
+    encoded_jwt = key_manager.encode(
         payload={
             **data,
         },
-        key=settings.SECRET_KEY,
-        algorithm=settings.ALGORITHM,
         json_encoder=UUIDEncoder,
     )
     return encoded_jwt
 
 
 def decode_token(token: str) -> dict[str, Any]:
-    return jwt.decode(  # type: ignore
-        jwt=token,
-        key=settings.SECRET_KEY,
-        algorithms=[settings.ALGORITHM],
-    )
+    return key_manager.decode(token)
 
 
 def validate_user_token(token: str) -> UserTokenPayload:
@@ -52,21 +47,21 @@ def validate_user_token(token: str) -> UserTokenPayload:
     return UserTokenPayload(**payload)
 
 
-def check_password(
+async def check_password(
     password: str,
     hashed_password: bytes,
 ) -> bool:
-    return bcrypt.checkpw(
-        password=password.encode(),
-        hashed_password=hashed_password,
+    return await hashing_executor.run(
+        password_hashers.verify, password, hashed_password
     )
 
 
-def hash_password(password: str) -> bytes:
-    return bcrypt.hashpw(
-        password=password.encode(),
-        salt=bcrypt.gensalt(),
-    )
+async def hash_password(password: str) -> bytes:
+    return await hashing_executor.run(password_hashers.hash, password)
+
+
+def password_needs_rehash(hashed_password: bytes) -> bool:
+    return password_hashers.needs_rehash(hashed_password)
 
 
 def create_user_token(
@@ -90,7 +85,7 @@ async def create_new_session(
     await SessionsDB.create_new(
         user_id=user.id,
         session_id=jti,
-        ip_address=req.client.host if req.client else None,
+        ip_address=client_ip(req),
         session=session,
     )
     return create_user_token(payload=UserTokenPayload(sub=user.id, jti=jti))
@@ -1,15 +1,21 @@
+import re
 from typing import Any
 
 from fastapi import (
     APIRouter,
-    BackgroundTasks,
+    Depends,
     Request,
+    Response,
     status,
 )
+from sqlalchemy.exc import IntegrityError
 
+from src.config import settings
 from src.dependencies import DbSession, UserAuthorizationWithSession
 from src.emails.dependencies import OtpEmailDep, ResetPassEmailDep
 from src.emails.utils import send_otp_email, send_reset_password_email
+from src.rate_limit.dependencies import client_ip, limit_by_ip
+from src.rate_limit.limiter import rate_limiter
 from src.sessions.crud import SessionsDB
 from src.users.crud import UsersDB
 from src.users.exceptions import (
@@ -21,6 +27,7 @@ from src.users.schemas import (
     ResetPasswordSchema,
     UserSchema,
 )
+from src.utils import ServerTiming
 
 from .exceptions import (
     EmailAlreadyExists,
@@ -37,10 +44,21 @@ from .utils import (
     check_password,
     create_new_session,
     gen_otp_with_token,
+    password_needs_rehash,
 )
 
 router = APIRouter()
 
+# sqlite: "UNIQUE constraint failed: users.email",
+# postgres: 'duplicate key value violates unique constraint "ix_users_email"'
+_UNIQUE_VIOLATION = re.compile(r"(?:users\.|ix_users_)(email|username)\b")
+
+
+def _conflicting_column(e: IntegrityError) -> str | None:
+    # only the first line, the postgres DETAIL line echoes the values
+    match = _UNIQUE_VIOLATION.search(str(e.orig).split("\n", 1)[0])
+    return match.group(1) if match else None
+
 
 @router.post(
     "/register/",
@@ -51,44 +69,68 @@ async def register(
     data: RegistrationSchema,
     session: DbSession,
 ) -> Any:
-    existed_email = await UsersDB.get_by_email(email=data.email, session=session)
-    if existed_email:
-        raise EmailAlreadyExists()
-    existed_username = await UsersDB.get_by_username(
-        username=data.username, session=session
-    )
-    if existed_username:
-        raise UsernameAlreadyExists()
-
-    new_user = await UsersDB.create_new(
-        username=data.username,
-        password=data.password,
-        email=data.email,
-        session=session,
-    )
+    try:
+        new_user = await UsersDB.create_new(
+            username=data.username,
+            password=data.password,
+            email=data.email,
+            session=session,
+        )
+    except IntegrityError as e:
+        await session.rollback()
+        column = _conflicting_column(e)
+        if column == "email":
+            raise EmailAlreadyExists() from None
+        elif column == "username":
+            raise UsernameAlreadyExists() from None
+        raise
     return new_user
 
 
-@router.post("/login/")
+@router.post(
+    "/login/",
+    dependencies=[Depends(limit_by_ip("login", settings.RATE_LIMIT_LOGIN_PER_IP))],
+)
 async def login(
     data: LoginSchema,
     req: Request,
+    response: Response,
     session: DbSession,
 ) -> UserTokenSchema:
-    if "@" in data.login:
-        user = await UsersDB.get_by_email(email=data.login, session=session)
-    else:
-        user = await UsersDB.get_by_username(username=data.login, session=session)
+    # before the password is hashed, guessing costs the attacker a request;
+    # keyed on the client too, so others cannot lock the owner out
+    await rate_limiter.hit(
+        "login",
+        f"{data.login.lower()}:{client_ip(req)}",
+        settings.RATE_LIMIT_LOGIN_PER_ACCOUNT,
+    )
+    timing = ServerTiming()
+    with timing.measure("lookup"):
+        user = await UsersDB.get_by_login(login=data.login, session=session)
+        # return the connection to the pool while the password is checked
+        await session.close()
     if user is None:
         raise UserNotFound()
     elif not user.active:
         raise InactiveUser()
-    elif not check_password(
-        password=data.password,
-        hashed_password=user.hashed_password,
-    ):
+    with timing.measure("verify"):
+        valid = await check_password(
+            password=data.password,
+            hashed_password=user.hashed_password,
+        )
+    if not valid:
         raise InvalidCredentials()
-    return await create_new_session(req=req, user=user, session=session)
+    with timing.measure("session"):
+        if password_needs_rehash(user.hashed_password):
+            await UsersDB.rehash_password(
+                user=user, password=data.password, session=session
+            )
+            # the sessions backend may not write to the database at all
+            await session.commit()
+        token = await create_new_session(req=req, user=user, session=session)
+    if settings.LOGIN_SERVER_TIMING:
+        response.headers["Server-Timing"] = timing.header()
+    return token
 
 
 @router.delete("/logout/", status_code=status.HTTP_204_NO_CONTENT)
@@ -103,12 +145,18 @@ async def revoke_token(
     )
 
 
-@router.post("/forgot/", status_code=status.HTTP_204_NO_CONTENT)
+@router.post(
+    "/forgot/",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(limit_by_ip("forgot", settings.RATE_LIMIT_FORGOT_PER_IP))],
+)
 async def recover_password(
     data: EmailRequest,
     session: DbSession,
-    worker: BackgroundTasks,
 ) -> None:
+    await rate_limiter.hit(
+        "forgot", data.email.lower(), settings.RATE_LIMIT_FORGOT_PER_EMAIL
+    )
     user = await UsersDB.get_by_email(email=data.email, session=session)
     if not user:
         raise UserNotFound()
@@ -116,7 +164,7 @@ async def recover_password(
         raise InactiveUser()
     elif not user.email_verified:
         raise EmailNotVerified()
-    worker.add_task(send_reset_password_email, data.email)
+    await send_reset_password_email(data.email)
 
 
 @router.post("/reset/", response_model=UserSchema)
@@ -139,23 +187,30 @@ async def reset_password(
     return user
 
 
-@router.put("/otp/")
-async def send_opt(
-    otp_data: EmailRequest, session: DbSession, worker: BackgroundTasks
-) -> dict[str, Any]:
+@router.put(
+    "/otp/",
+    dependencies=[Depends(limit_by_ip("otp", settings.RATE_LIMIT_OTP_PER_IP))],
+)
+async def send_opt(otp_data: EmailRequest, session: DbSession) -> dict[str, Any]:
+    await rate_limiter.hit(
+        "otp", otp_data.email.lower(), settings.RATE_LIMIT_OTP_PER_EMAIL
+    )
     user = await UsersDB.get_by_email(email=otp_data.email, session=session)
     if not user:
         raise UserNotFound()
     elif not user.email_verified:
         raise EmailNotVerified()
     otp, token = gen_otp_with_token()
-    worker.add_task(send_otp_email, otp_data.email, user.username, otp, token)
+    await send_otp_email(otp_data.email, user.username, otp, token)
     return {
         "token": token,
     }
 
 
-@router.post("/otp/")
+@router.post(
+    "/otp/",
+    dependencies=[Depends(limit_by_ip("otp", settings.RATE_LIMIT_OTP_PER_IP))],
+)
 async def otp_auth(
     email: OtpEmailDep,
     req: Request,
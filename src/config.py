@@ -1,8 +1,21 @@
+from ipaddress import IPv4Network, IPv6Network, ip_network
+from typing import Literal
+
 from pydantic import AnyUrl, RedisDsn
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from src.emails.config import EmailSettings
+from src.oauth2.config import OAuth2Settings
+from src.rate_limit.config import RateLimitSettings
+
+
+class Settings(BaseSettings, OAuth2Settings, EmailSettings, RateLimitSettings):
+    """
+    All settings of the server, the environment and `.env` are read once.
+
+    Options of a single package are declared next to it and mixed in here.
+    """
 
-class Settings(BaseSettings):
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -12,16 +25,97 @@ class Settings(BaseSettings):
 
     PROJECT_NAME: str = "Authorization Server"
     SERVER_HOST: str = "http://localhost"
+    # proxies whose X-Forwarded-For gives the client address, as a JSON list
+    # of addresses or networks; uvicorn runs with --no-proxy-headers
+    TRUSTED_PROXIES: list[IPv4Network | IPv6Network] = [ip_network("127.0.0.1")]
 
     SQLALCHEMY_DATABASE_URI: AnyUrl
+    # read replicas for DbReadSession, JSON list
+    SQLALCHEMY_REPLICA_URIS: list[AnyUrl] = []
+    DB_REPLICA_HEALTH_CHECK_SECONDS: float = 5
+    # per worker process, ignored by SQLite
+    DB_POOL_SIZE: int = 5
+    DB_POOL_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30
+    # -1 keeps connections open indefinitely
+    DB_POOL_RECYCLE_SECONDS: int = 30 * 60
+    DB_POOL_PRE_PING: bool = True
+    # asyncpg prepared statements cached per connection, 0 behind pgbouncer
+    DB_STATEMENT_CACHE_SIZE: int = 100
 
     SECRET_KEY: str = "secret_key"
     ALGORITHM: str = "HS256"
+    # asymmetric algorithms only, HS* keep signing with SECRET_KEY
+    SIGNING_KEY_ROTATION_HOURS: int = 30 * 24
+    # should cover the longest token lifetime (USER_TOKEN_EXPIRE_HOURS)
+    SIGNING_KEY_OVERLAP_HOURS: int = 30 * 24
+    SIGNING_KEYS_REFRESH_SECONDS: float = 5 * 60
+    JWKS_MAX_AGE_SECONDS: int = 60 * 60
+    # decoded token payloads kept in memory, 0 disables the cache
+    TOKEN_CACHE_SIZE: int = 10_000
+    # revoked token ids each worker's bloom filter is sized for, more raise
+    # the share of checks that ask Redis
+    TOKEN_REVOCATION_CAPACITY: int = 100_000
+    TOKEN_REVOCATION_ERROR_RATE: float = 0.001
+    # the filter forgets expired ids when it is rebuilt
+    TOKEN_REVOCATION_REBUILD_SECONDS: float = 10 * 60
+    # while Redis is unavailable, OAuth2 access tokens that may be revoked
+    # (every one before the filter is synced) are rejected; off lets revoked
+    # tokens through until Redis is back
+    TOKEN_REVOCATION_FAIL_CLOSED: bool = True
     USER_TOKEN_EXPIRE_HOURS: int = 30 * 24
     KEYS_LENGTH: int = 40
     OTP_EXPIRE_SECONDS: int = 5 * 60
 
+    # new hashes use this scheme, others are upgraded on login
+    PASSWORD_HASHER: Literal["argon2id", "bcrypt"] = "argon2id"
+    BCRYPT_ROUNDS: int = 12
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST_KIB: int = 64 * 1024
+    ARGON2_PARALLELISM: int = 4
+    PASSWORD_HASHING_WORKERS: int = 4
+    # hashes allowed to wait for a worker before requests get 429
+    PASSWORD_HASHING_MAX_QUEUE: int = 64
+    PASSWORD_HASHING_USE_PROCESSES: bool = False
+
+    SESSION_LAST_USED_FLUSH_SECONDS: float = 5.0
+    SESSION_LAST_USED_MAX_PENDING: int = 10_000
+    # where user sessions live, redis expires them natively and keeps the
+    # session churn out of the database
+    SESSIONS_BACKEND: Literal["postgres", "redis"] = "postgres"
+    SESSION_REAPER_INTERVAL_SECONDS: float = 5 * 60
+    SESSION_REAPER_BATCH_SIZE: int = 1000
+    # 0 disables the Redis cache for the user + session lookup
+    USER_SESSION_CACHE_TTL_SECONDS: int = 60
+
+    # apps by client_id kept in memory, 0 disables the cache
+    APPS_CACHE_SIZE: int = 1024
+    APPS_CACHE_TTL_SECONDS: float = 60
+
+    # bearer token `GET /metrics` requires, unset the endpoint is disabled
+    METRICS_TOKEN: str | None = None
+    # login stage timings in a Server-Timing header, for profiling only:
+    # they tell apart unknown accounts and wrong passwords
+    LOGIN_SERVER_TIMING: bool = False
+
+    # refuse to start on a database that is not at the Alembic head,
+    # otherwise only warn
+    STARTUP_REQUIRE_SCHEMA_HEAD: bool = True
+    # connections opened per pool before the worker reports ready
+    STARTUP_WARM_CONNECTIONS: int = 5
+    STARTUP_PRELOAD_APPS: int = 1000
+    STARTUP_PHASE_TIMEOUT_SECONDS: float = 30
+
     REDIS_URL: RedisDsn
+    # callers wait up to REDIS_POOL_TIMEOUT_SECONDS for a free connection
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_POOL_TIMEOUT_SECONDS: float = 5
+    REDIS_SOCKET_TIMEOUT_SECONDS: float = 5
+    REDIS_SOCKET_CONNECT_TIMEOUT_SECONDS: float = 5
+    # retries of a command that timed out or lost its connection
+    REDIS_RETRY_ATTEMPTS: int = 3
+    # idle connections are pinged before reuse after this long
+    REDIS_HEALTH_CHECK_INTERVAL_SECONDS: int = 30
     MONGO_URL: str
     MONGO_DATABASE_NAME: str
 
@@ -1,29 +1,248 @@
+import asyncio
+import contextlib
+import itertools
+import logging
+import time
 from collections.abc import AsyncGenerator
-from typing import Annotated
+from contextvars import ContextVar
+from typing import Annotated, Any
 
 from fastapi import Depends
+from sqlalchemy import Engine, exc, make_url, text
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, QueuePool
+from sqlalchemy.sql.expression import SelectBase
 
 from src.config import settings
+from src.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# set once the current request has committed on the primary, its later reads
+# must see that write and cannot go to a lagging replica
+_pinned_to_primary: ContextVar[bool] = ContextVar("pinned_to_primary", default=False)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        # includes opening a new connection when the pool is not full yet
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            wait = time.perf_counter() - started
+            self.checkouts += 1
+            self.wait_seconds_total += wait
+            self.wait_seconds_max = max(self.wait_seconds_max, wait)
+
+    def wait_stats(self) -> dict[str, Any]:
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_seconds_total": self.wait_seconds_total,
+            "wait_seconds_max": self.wait_seconds_max,
+        }
+
+
+class PrimarySession(AsyncSession):
+    async def commit(self) -> None:
+        await super().commit()
+        _pinned_to_primary.set(True)
+
+
+class ReadSession(Session):
+    """Sends queries to a replica unless they have to see the primary."""
+
+    def get_bind(  # type: ignore
+        self, mapper: Any = None, *, clause: Any = None, **kw: Any
+    ) -> Engine:
+        db: DatabaseHelper = self.info["db_helper"]
+        if (
+            self._flushing
+            or _pinned_to_primary.get()
+            or (clause is not None and not isinstance(clause, SelectBase))
+        ):
+            return db.engine.sync_engine
+        return db.read_engine().sync_engine
 
 
 class DatabaseHelper:
-    def __init__(self, url: str, echo: bool) -> None:
-        self.engine = create_async_engine(
-            url=url,
-            echo=echo,
-        )
-        self.session_factory = async_sessionmaker(
+    def __init__(
+        self,
+        url: str,
+        echo: bool,
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        pool_timeout: float = 30,
+        pool_recycle: int = -1,
+        pool_pre_ping: bool = False,
+        statement_cache_size: int | None = None,
+        replica_urls: list[str] | None = None,
+        health_check_interval: float = 5,
+    ) -> None:
+        engine_options: dict[str, Any] = {
+            "echo": echo,
+            "pool_size": pool_size,
+            "max_overflow": max_overflow,
+            "pool_timeout": pool_timeout,
+            "pool_recycle": pool_recycle,
+            "pool_pre_ping": pool_pre_ping,
+            "statement_cache_size": statement_cache_size,
+        }
+        self.engine = self._create_engine(url, **engine_options)
+        self.replicas = [
+            self._create_engine(replica_url, **engine_options)
+            for replica_url in replica_urls or []
+        ]
+        self.healthy_replicas = list(self.replicas)
+        self.health_check_interval = health_check_interval
+        self._round_robin = itertools.count()
+        self._task: asyncio.Task[None] | None = None
+        self.session_factory: async_sessionmaker[AsyncSession] = async_sessionmaker(
             bind=self.engine,
+            class_=PrimarySession,
+            autoflush=False,
+            autocommit=False,
+            expire_on_commit=False,
+        )
+        self.read_session_factory = async_sessionmaker(
+            sync_session_class=ReadSession,
+            info={"db_helper": self},
             autoflush=False,
             autocommit=False,
             expire_on_commit=False,
         )
 
+    @staticmethod
+    def _create_engine(
+        url: str,
+        echo: bool,
+        pool_size: int,
+        max_overflow: int,
+        pool_timeout: float,
+        pool_recycle: int,
+        pool_pre_ping: bool,
+        statement_cache_size: int | None,
+    ) -> AsyncEngine:
+        engine_url = make_url(url)
+        kwargs: dict[str, Any] = {}
+        # SQLite keeps its NullPool/StaticPool, which take no sizing
+        if engine_url.get_backend_name() != "sqlite":
+            kwargs.update(
+                poolclass=InstrumentedPool,
+                pool_size=pool_size,
+                max_overflow=max_overflow,
+                pool_timeout=pool_timeout,
+                pool_recycle=pool_recycle,
+                pool_pre_ping=pool_pre_ping,
+            )
+        if statement_cache_size is not None and engine_url.drivername.endswith(
+            "+asyncpg"
+        ):
+            engine_url = engine_url.update_query_dict(
+                {"prepared_statement_cache_size": str(statement_cache_size)}
+            )
+        return create_async_engine(
+            url=engine_url,
+            echo=echo,
+            **kwargs,
+        )
+
+    def read_engine(self) -> AsyncEngine:
+        """Next healthy replica in round-robin order, or the primary."""
+        healthy = self.healthy_replicas
+        if not healthy:
+            return self.engine
+        return healthy[next(self._round_robin) % len(healthy)]
+
+    async def _is_healthy(self, engine: AsyncEngine) -> bool:
+        try:
+            async with asyncio.timeout(self.health_check_interval):
+                async with engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+            return True
+        except Exception:
+            return False
+
+    async def check_replicas(self) -> None:
+        results = await asyncio.gather(
+            *(self._is_healthy(replica) for replica in self.replicas)
+        )
+        healthy = [
+            replica for replica, ok in zip(self.replicas, results, strict=True) if ok
+        ]
+        if len(healthy) != len(self.healthy_replicas):
+            logger.warning(
+                "%s of %s database replicas are healthy",
+                len(healthy),
+                len(self.replicas),
+            )
+        self.healthy_replicas = healthy
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            await self.check_replicas()
+
+    async def start(self) -> None:
+        if self.replicas and self._task is None:
+            await self.check_replicas()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def warm_up(self, connections: int) -> None:
+        """Open up to `connections` pooled connections on every engine."""
+        await asyncio.gather(
+            *(
+                self._warm_up_engine(engine, connections)
+                for engine in [self.engine, *self.replicas]
+            )
+        )
+
+    @staticmethod
+    async def _warm_up_engine(engine: AsyncEngine, connections: int) -> None:
+        pool = engine.pool
+        # connections beyond pool_size would be closed again on checkin
+        if isinstance(pool, QueuePool):
+            connections = min(connections, pool.size())
+        else:
+            connections = min(connections, 1)
+        # all are held until the last one is open, so none is reused
+        opened = asyncio.Barrier(connections)
+
+        async def hold() -> None:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                await opened.wait()
+
+        async with asyncio.TaskGroup() as tasks:
+            for _ in range(connections):
+                tasks.create_task(hold())
+
     async def session_dependency(self) -> AsyncGenerator[AsyncSession, None]:
         async with self.session_factory() as session:
             try:
@@ -31,10 +250,48 @@ class DatabaseHelper:
             finally:
                 await session.close()
 
+    async def read_session_dependency(self) -> AsyncGenerator[AsyncSession, None]:
+        async with self.read_session_factory() as session:
+            try:
+                yield session
+            finally:
+                await session.close()
+
+    def pool_stats(self) -> dict[str, Any]:
+        pool = self.engine.pool
+        stats: dict[str, Any] = {"pool": type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            stats.update(
+                size=pool.size(),
+                checked_in=pool.checkedin(),
+                checked_out=pool.checkedout(),
+                overflow=max(pool.overflow(), 0),
+            )
+        if isinstance(pool, InstrumentedPool):
+            stats.update(pool.wait_stats())
+        if self.replicas:
+            stats.update(
+                replicas=len(self.replicas),
+                healthy_replicas=len(self.healthy_replicas),
+            )
+        return stats
+
 
 db_helper = DatabaseHelper(
     url=str(settings.SQLALCHEMY_DATABASE_URI),
     echo=False,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_POOL_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    statement_cache_size=settings.DB_STATEMENT_CACHE_SIZE,
+    replica_urls=[str(url) for url in settings.SQLALCHEMY_REPLICA_URIS],
+    health_check_interval=settings.DB_REPLICA_HEALTH_CHECK_SECONDS,
 )
+metrics.register("db_pool", db_helper.pool_stats)
 
 DbSession = Annotated[AsyncSession, Depends(db_helper.session_dependency)]
+
+# reads that tolerate replication lag, unless this request already committed
+DbReadSession = Annotated[AsyncSession, Depends(db_helper.read_session_dependency)]
@@ -2,12 +2,22 @@ from typing import Annotated
 
 from fastapi import Security
 
-from src.auth.dependencies import get_user, get_user_optional, get_user_with_session
+from src.auth.dependencies import (
+    get_user,
+    get_user_optional,
+    get_user_profile,
+    get_user_with_session,
+)
+from src.auth.schemas import UserPrincipal
+from src.database import DbReadSession as DbReadSession  # noqa
 from src.database import DbSession as DbSession  # noqa
 from src.sessions.models import UserSessionsInDB
 from src.users.models import UserInDB
 
-UserAuthorization = Annotated[UserInDB, Security(get_user)]
+UserAuthorization = Annotated[UserInDB | UserPrincipal, Security(get_user)]
+
+
+UserProfileAuthorization = Annotated[UserInDB, Security(get_user_profile)]
 
 
 UserAuthorizationWithSession = Annotated[
@@ -15,4 +25,6 @@ UserAuthorizationWithSession = Annotated[
 ]
 
 
-UserAuthorizationOptional = Annotated[UserInDB | None, Security(get_user_optional)]
+UserAuthorizationOptional = Annotated[
+    UserInDB | UserPrincipal | None, Security(get_user_optional)
+]
@@ -1,18 +1,26 @@
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic import BaseModel
 
 
-class Settings(BaseSettings):
-    model_config = SettingsConfigDict(
-        env_file=".env",
-        env_file_encoding="utf-8",
-        extra="ignore",
-        case_sensitive=True,
-    )
+class EmailSettings(BaseModel):
+    """Email options, read from the environment by `src.config.Settings`."""
 
     SMTP_PORT: int = 465
     SMTP_SERVER: str = "smtp.gmail.com"
     SMTP_USER: str
     SMTP_PASSWORD: str
+    # implicit TLS (port 465), otherwise STARTTLS when the server offers it
+    SMTP_USE_TLS: bool = True
+    SMTP_START_TLS: bool | None = None
+    SMTP_POOL_SIZE: int = 4
+    SMTP_TIMEOUT_SECONDS: float = 30
+
+    # emails sent over one SMTP connection per worker iteration
+    EMAIL_QUEUE_BATCH_SIZE: int = 50
+    EMAIL_QUEUE_MAX_ATTEMPTS: int = 6
+    # retry delays double after each failed attempt
+    EMAIL_QUEUE_RETRY_BASE_SECONDS: float = 10
+    # emails left unacknowledged by a dead worker are picked up after this
+    EMAIL_QUEUE_CLAIM_IDLE_SECONDS: int = 5 * 60
 
     SMTP_FROM_EMAIL: str
     SMTP_FROM_NAME: str
@@ -20,6 +28,3 @@ class Settings(BaseSettings):
     EMAIL_VERIFICATION_TOKEN_EXPIRE_SECONDS: int = 48 * 60 * 60
 
     OTP_EXPIRES_SECONDS: int = 60
-
-
-settings = Settings()  # type: ignore
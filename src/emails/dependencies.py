@@ -1,9 +1,8 @@
 from typing import Annotated
-from uuid import UUID
 
 from fastapi import Security
 
-from src.redis_helper import redis_client
+from src.redis_helper import redis_helper
 
 from .exceptions import InvalidOtp, InvalidToken
 from .schemas import EmailToken, OtpAuthSchema
@@ -15,10 +14,11 @@ async def check_token(token: str, key_prefix: str) -> str:
     if payload is None:
         raise InvalidToken()
 
-    expected_jti = await redis_client.get(f"{key_prefix}{payload.sub}")
-    if UUID(bytes=expected_jti) != payload.jti:
+    # the token is redeemed together with the check, it can't be used twice
+    if not await redis_helper.compare_and_delete(
+        f"{key_prefix}{payload.sub}", payload.jti.bytes
+    ):
         raise InvalidToken()
-    await redis_client.delete(f"{key_prefix}{payload.sub}")
 
     return payload.sub
 
@@ -38,13 +38,11 @@ VerifyEmailDep = Annotated[str, Security(check_verify_email_token)]
 
 
 async def get_otp(data: OtpAuthSchema) -> str:
-    expected_otp = await redis_client.get(f"otp_{data.email}_{data.token}")
-
-    if data.otp != expected_otp:
+    if not await redis_helper.compare_and_delete(
+        f"otp_{data.email}_{data.token}", data.otp
+    ):
         raise InvalidOtp()
 
-    await redis_client.delete(f"otp_{data.email}_{data.token}")
-
     return data.email
 
 
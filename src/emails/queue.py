@@ -0,0 +1,77 @@
+import json
+import time
+from typing import Any
+from uuid import uuid4
+
+from redis.asyncio.client import Pipeline
+
+from src.redis_helper import redis_client
+
+EMAIL_STREAM = "emails"
+EMAIL_RETRY_KEY = "emails_retry"
+EMAIL_DEAD_LETTER_STREAM = "emails_dead"
+EMAIL_CONSUMER_GROUP = "email_workers"
+
+# KEYS: retry sorted set, stream; ARGV: now (unix), max emails to move
+# an email is removed and requeued at once, it is never lost in between
+REQUEUE_DUE = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1],
+                       'LIMIT', 0, ARGV[2])
+for _, data in ipairs(due) do
+    redis.call('ZREM', KEYS[1], data)
+    redis.call('XADD', KEYS[2], '*', 'email', data)
+end
+return #due
+"""
+
+requeue_due_script = redis_client.register_script(REQUEUE_DUE)
+
+
+class EmailQueue:
+    """
+    Outgoing emails stored in a Redis stream until a worker delivers them.
+
+    Failed deliveries wait in a sorted set scored by their next attempt time
+    and are moved back to the stream when due; emails that keep failing end
+    up in a dead-letter stream.
+    """
+
+    @staticmethod
+    def decode(data: bytes | str) -> dict[str, Any]:
+        email: dict[str, Any] = json.loads(data)
+        return email
+
+    @staticmethod
+    async def enqueue(
+        email_to: str, subject: str, html_body: str, pipe: Pipeline | None = None
+    ) -> None:
+        """With `pipe` the email is only queued when the pipeline executes."""
+        email = {
+            "id": uuid4().hex,
+            "to": email_to,
+            "subject": subject,
+            "body": html_body,
+            "attempts": 0,
+        }
+        client = redis_client if pipe is None else pipe
+        await client.xadd(EMAIL_STREAM, {"email": json.dumps(email)})
+
+    @staticmethod
+    async def schedule_retry(email: dict[str, Any], delay: float) -> None:
+        data = json.dumps({**email, "attempts": email["attempts"] + 1})
+        await redis_client.zadd(EMAIL_RETRY_KEY, {data: time.time() + delay})
+
+    @staticmethod
+    async def dead_letter(email: dict[str, Any], error: str) -> None:
+        await redis_client.xadd(
+            EMAIL_DEAD_LETTER_STREAM,
+            {"email": json.dumps(email), "error": error},
+        )
+
+    @staticmethod
+    async def requeue_due(limit: int = 1000) -> int:
+        """Move up to `limit` retries whose backoff has elapsed to the stream."""
+        moved: int = await requeue_due_script(
+            keys=[EMAIL_RETRY_KEY, EMAIL_STREAM], args=[time.time(), limit]
+        )
+        return moved
@@ -3,7 +3,7 @@ from typing import Any
 import jwt
 from pydantic import ValidationError
 
-from src.config import settings
+from src.keys.manager import key_manager
 from src.utils import UUIDEncoder
 
 from .schemas import EmailTokenPayload
@@ -12,10 +12,8 @@ from .schemas import EmailTokenPayload
 def gen_email_token(
     payload: EmailTokenPayload,
 ) -> str:
-    encoded_jwt = jwt.encode(
+    encoded_jwt = key_manager.encode(
         payload=payload.model_dump(),
-        key=settings.SECRET_KEY,
-        algorithm=settings.ALGORITHM,
         json_encoder=UUIDEncoder,
     )
     return encoded_jwt
@@ -23,11 +21,7 @@ def gen_email_token(
 
 def validate_email_token(token: str) -> EmailTokenPayload | None:
     try:
-        payload: dict[str, Any] = jwt.decode(
-            token,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM],
-        )
+        payload: dict[str, Any] = key_manager.decode(token)
         return EmailTokenPayload(**payload)
     except (jwt.exceptions.PyJWTError, ValidationError):
         return None
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from email.message import Message
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from aiosmtplib import SMTP, SMTPServerDisconnected
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def build_message(email_to: str, subject: str, html_body: str) -> Message:
+    msg = MIMEMultipart()
+    msg["From"] = f"{settings.SMTP_FROM_NAME} {settings.SMTP_FROM_EMAIL}"
+    msg["To"] = email_to
+    msg["Subject"] = subject
+    msg.attach(MIMEText(html_body, "html"))
+    return msg
+
+
+class SMTPPool:
+    """
+    Persistent, authenticated SMTP connections shared by all senders.
+
+    At most `size` connections are open at once. A connection is kept open
+    after a send and reused by the next one; a connection dropped by the
+    server is replaced and the unsent messages are retried once.
+    """
+
+    def __init__(
+        self,
+        hostname: str,
+        port: int,
+        username: str | None,
+        password: str | None,
+        use_tls: bool,
+        start_tls: bool | None,
+        size: int,
+        timeout: float,
+    ) -> None:
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.start_tls = start_tls
+        self.size = size
+        self.timeout = timeout
+        self._idle: list[SMTP] = []
+        self._semaphore = asyncio.Semaphore(size)
+
+    async def _connect(self) -> SMTP:
+        client = SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            username=self.username,
+            password=self.password,
+            use_tls=self.use_tls,
+            start_tls=self.start_tls,
+            timeout=self.timeout,
+        )
+        await client.connect()
+        return client
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[SMTP]:
+        async with self._semaphore:
+            client = self._idle.pop() if self._idle else None
+            if client is None or not client.is_connected:
+                client = await self._connect()
+            try:
+                yield client
+            except BaseException:
+                client.close()
+                raise
+            self._idle.append(client)
+
+    async def send(self, *messages: Message) -> None:
+        """Send the messages one after another over a single connection."""
+        pending = list(messages)
+        for attempt in range(2):
+            try:
+                async with self.connection() as client:
+                    while pending:
+                        await client.send_message(pending[0])
+                        pending.pop(0)
+                return
+            except SMTPServerDisconnected:
+                if attempt:
+                    raise
+                logger.warning("SMTP connection dropped, reconnecting")
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for client in idle:
+            try:
+                await client.quit()
+            except Exception:
+                client.close()
+
+
+smtp_pool = SMTPPool(
+    hostname=settings.SMTP_SERVER,
+    port=settings.SMTP_PORT,
+    username=settings.SMTP_USER,
+    password=settings.SMTP_PASSWORD,
+    use_tls=settings.SMTP_USE_TLS,
+    start_tls=None if settings.SMTP_USE_TLS else settings.SMTP_START_TLS,
+    size=settings.SMTP_POOL_SIZE,
+    timeout=settings.SMTP_TIMEOUT_SECONDS,
+)
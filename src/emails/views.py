@@ -1,6 +1,6 @@
-from fastapi import APIRouter, BackgroundTasks, status
+from fastapi import APIRouter, status
 
-from src.dependencies import DbSession, UserAuthorization
+from src.dependencies import DbSession, UserProfileAuthorization
 from src.emails.dependencies import VerifyEmailDep
 from src.users.crud import UsersDB
 from src.users.exceptions import InactiveUser, UserNotFound
@@ -13,12 +13,11 @@ router = APIRouter(tags=["emails"])
 
 @router.put("/verify/", status_code=status.HTTP_204_NO_CONTENT)
 async def send_confirmation_email(
-    user: UserAuthorization,
-    worker: BackgroundTasks,
+    user: UserProfileAuthorization,
 ) -> None:
     if user.email_verified:
         raise EmailAlreadyVerified()
-    worker.add_task(send_verify_email, user.email, user.username)
+    await send_verify_email(user.email, user.username)
 
 
 @router.post("/verify/", status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,151 @@
+"""
+Email delivery worker, run it with `python -m src.emails.worker`.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+from typing import Any
+
+from aiosmtplib import SMTPRecipientsRefused, SMTPResponseException
+from redis.exceptions import ResponseError
+
+from src.config import settings
+from src.redis_helper import redis_client
+
+from .queue import EMAIL_CONSUMER_GROUP, EMAIL_STREAM, EmailQueue
+from .transport import build_message, smtp_pool
+
+logger = logging.getLogger(__name__)
+
+
+class EmailWorker:
+    """
+    Delivers queued emails in batches, each batch over one SMTP connection.
+
+    A delivery that fails is retried with exponential backoff; after
+    `max_attempts` the email is moved to the dead-letter stream. Entries are
+    acknowledged only once handled, so emails read by a worker that died
+    are claimed by another one after `claim_idle_seconds`.
+    """
+
+    def __init__(
+        self,
+        consumer: str,
+        batch_size: int,
+        max_attempts: int,
+        retry_base: float,
+        claim_idle_seconds: int,
+        block_seconds: float = 5,
+    ) -> None:
+        self.consumer = consumer
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.claim_idle_seconds = claim_idle_seconds
+        self.block_seconds = block_seconds
+
+    async def setup(self) -> None:
+        try:
+            await redis_client.xgroup_create(
+                EMAIL_STREAM, EMAIL_CONSUMER_GROUP, id="0", mkstream=True
+            )
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def read_batch(self) -> list[tuple[bytes, dict[bytes, bytes]]]:
+        _, claimed, *_ = await redis_client.xautoclaim(
+            EMAIL_STREAM,
+            EMAIL_CONSUMER_GROUP,
+            self.consumer,
+            min_idle_time=self.claim_idle_seconds * 1000,
+            count=self.batch_size,
+        )
+        if claimed:
+            return claimed  # type: ignore
+        response = await redis_client.xreadgroup(
+            EMAIL_CONSUMER_GROUP,
+            self.consumer,
+            {EMAIL_STREAM: ">"},
+            count=self.batch_size,
+            block=int(self.block_seconds * 1000),
+        )
+        if not response:
+            return []
+        _, entries = response[0]
+        return entries  # type: ignore
+
+    async def fail(self, email: dict[str, Any], error: Exception) -> None:
+        if email["attempts"] + 1 >= self.max_attempts:
+            logger.error("Giving up on email %s: %r", email["id"], error)
+            await EmailQueue.dead_letter(email, repr(error))
+        else:
+            delay = self.retry_base * 2 ** email["attempts"]
+            logger.warning("Retrying email %s in %ss: %r", email["id"], delay, error)
+            await EmailQueue.schedule_retry(email, delay=delay)
+
+    async def deliver(self, entries: list[tuple[bytes, dict[bytes, bytes]]]) -> None:
+        pending = [
+            (entry_id, EmailQueue.decode(fields[b"email"]))
+            for entry_id, fields in entries
+        ]
+        handled: list[bytes] = []
+        try:
+            async with smtp_pool.connection() as client:
+                while pending:
+                    entry_id, email = pending[0]
+                    message = build_message(
+                        email["to"], email["subject"], email["body"]
+                    )
+                    try:
+                        await client.send_message(message)
+                    except (SMTPRecipientsRefused, SMTPResponseException) as e:
+                        await self.fail(email, e)
+                    pending.pop(0)
+                    handled.append(entry_id)
+        except Exception as e:
+            # the connection is gone, retry what was not sent over it
+            for entry_id, email in pending:
+                await self.fail(email, e)
+                handled.append(entry_id)
+        finally:
+            if handled:
+                await redis_client.xack(EMAIL_STREAM, EMAIL_CONSUMER_GROUP, *handled)
+
+    async def run_once(self) -> int:
+        await EmailQueue.requeue_due()
+        entries = await self.read_batch()
+        if entries:
+            await self.deliver(entries)
+        return len(entries)
+
+    async def run(self) -> None:
+        await self.setup()
+        logger.info("Email worker %s started", self.consumer)
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Email worker iteration failed")
+                await asyncio.sleep(1)
+
+
+async def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    worker = EmailWorker(
+        consumer=f"{socket.gethostname()}-{os.getpid()}",
+        batch_size=settings.EMAIL_QUEUE_BATCH_SIZE,
+        max_attempts=settings.EMAIL_QUEUE_MAX_ATTEMPTS,
+        retry_base=settings.EMAIL_QUEUE_RETRY_BASE_SECONDS,
+        claim_idle_seconds=settings.EMAIL_QUEUE_CLAIM_IDLE_SECONDS,
+    )
+    try:
+        await worker.run()
+    finally:
+        await smtp_pool.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
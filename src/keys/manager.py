@@ -0,0 +1,273 @@
+import asyncio
+import contextlib
+import datetime
+import hashlib
+import json
+import logging
+from itertools import pairwise
+from typing import Any
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from jwt.algorithms import get_default_algorithms
+from pymongo.errors import DuplicateKeyError
+
+from src.config import settings
+from src.mongo_helper import db
+
+logger = logging.getLogger(__name__)
+
+key_collection = db["signing_keys"]
+
+SYMMETRIC_ALGORITHMS = {"HS256", "HS384", "HS512"}
+
+PrivateKey = rsa.RSAPrivateKey | ec.EllipticCurvePrivateKey | ed25519.Ed25519PrivateKey
+
+
+def generate_private_key(algorithm: str) -> PrivateKey:
+    if algorithm.startswith(("RS", "PS")):
+        return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    elif algorithm == "ES256":
+        return ec.generate_private_key(ec.SECP256R1())
+    elif algorithm == "ES384":
+        return ec.generate_private_key(ec.SECP384R1())
+    elif algorithm == "EdDSA":
+        return ed25519.Ed25519PrivateKey.generate()
+    raise ValueError(f"Unsupported signing algorithm: {algorithm}")
+
+
+class SigningKey:
+    def __init__(
+        self,
+        kid: str,
+        private_key: PrivateKey,
+        not_before: datetime.datetime,
+    ) -> None:
+        self.kid = kid
+        self.private_key = private_key
+        self.public_key = private_key.public_key()
+        self.not_before = not_before
+
+
+class KeyManager:
+    """
+    Signs and verifies every JWT issued by the server.
+
+    HMAC algorithms use `SECRET_KEY` as before. Asymmetric algorithms
+    (RS256, ES256, EdDSA, ...) use key pairs shared by all workers through
+    MongoDB: each token gets a `kid` header, public keys are published as a
+    JWKS and keys are rotated every `rotation_period`. A new key is
+    published `publish_ahead` before it is used to sign, and a retired key
+    stays published for `overlap` after its successor starts signing so
+    tokens it signed can still be verified.
+    """
+
+    def __init__(
+        self,
+        algorithm: str,
+        secret_key: str,
+        rotation_period: datetime.timedelta,
+        overlap: datetime.timedelta,
+        publish_ahead: datetime.timedelta,
+        refresh_interval: float,
+    ) -> None:
+        if algorithm not in get_default_algorithms() or algorithm == "none":
+            raise ValueError(f"Unsupported signing algorithm: {algorithm}")
+        self.algorithm = algorithm
+        self.secret_key = secret_key
+        self.rotation_period = rotation_period
+        self.overlap = overlap
+        self.publish_ahead = publish_ahead
+        self.refresh_interval = refresh_interval
+        self._keys: dict[str, SigningKey] = {}
+        self._jwks: dict[str, Any] = {"keys": []}
+        self._jwks_etag = self._etag(self._jwks)
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def is_symmetric(self) -> bool:
+        return self.algorithm in SYMMETRIC_ALGORITHMS
+
+    def _signing_key(self) -> SigningKey:
+        now = datetime.datetime.now(datetime.timezone.utc)
+        usable = [key for key in self._keys.values() if key.not_before <= now]
+        if not usable:
+            raise RuntimeError("No signing key is loaded")
+        return max(usable, key=lambda key: key.not_before)
+
+    def encode(
+        self,
+        payload: dict[str, Any],
+        json_encoder: type[json.JSONEncoder] | None = None,
+    ) -> str:
+        if self.is_symmetric:
+            return jwt.encode(
+                payload=payload,
+                key=self.secret_key,
+                algorithm=self.algorithm,
+                json_encoder=json_encoder,
+            )
+        signing_key = self._signing_key()
+        return jwt.encode(
+            payload=payload,
+            key=signing_key.private_key,
+            algorithm=self.algorithm,
+            headers={"kid": signing_key.kid},
+            json_encoder=json_encoder,
+        )
+
+    def decode(self, token: str) -> dict[str, Any]:
+        if self.is_symmetric:
+            return jwt.decode(  # type: ignore
+                jwt=token,
+                key=self.secret_key,
+                algorithms=[self.algorithm],
+            )
+        kid = jwt.get_unverified_header(token).get("kid")
+        verifying_key = self._keys.get(kid) if kid else None
+        if verifying_key is None:
+            raise jwt.InvalidTokenError("Unknown signing key")
+        return jwt.decode(  # type: ignore
+            jwt=token,
+            key=verifying_key.public_key,
+            algorithms=[self.algorithm],
+        )
+
+    def jwks(self) -> tuple[dict[str, Any], str]:
+        return self._jwks, self._jwks_etag
+
+    @staticmethod
+    def _etag(jwks: dict[str, Any]) -> str:
+        body = json.dumps(jwks, sort_keys=True).encode()
+        return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+    def _build_jwks(self) -> None:
+        algorithm = get_default_algorithms()[self.algorithm]
+        keys = []
+        for key in sorted(self._keys.values(), key=lambda key: key.not_before):
+            jwk: dict[str, Any] = algorithm.to_jwk(key.public_key, as_dict=True)
+            jwk.update(kid=key.kid, alg=self.algorithm, use="sig")
+            keys.append(jwk)
+        self._jwks = {"keys": keys}
+        self._jwks_etag = self._etag(self._jwks)
+
+    def _load_key(self, doc: dict[str, Any]) -> SigningKey:
+        private_key = serialization.load_pem_private_key(
+            doc["private_key"].encode(), password=self.secret_key.encode()
+        )
+        return SigningKey(
+            kid=doc["_id"],
+            private_key=private_key,  # type: ignore
+            not_before=doc["not_before"].replace(tzinfo=datetime.timezone.utc),
+        )
+
+    def _slot_kid(self, slot: str) -> str:
+        return hashlib.sha256(f"{self.algorithm}:{slot}".encode()).hexdigest()[:32]
+
+    async def _create_key(self, kid: str, not_before: datetime.datetime) -> None:
+        """
+        Insert the key of a rotation slot unless another worker already did.
+
+        Every worker that finds a rotation due derives the same `kid`, the
+        first insert wins and the others load it.
+        """
+        private_key = generate_private_key(self.algorithm)
+        pem = private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.BestAvailableEncryption(
+                self.secret_key.encode()
+            ),
+        )
+        with contextlib.suppress(DuplicateKeyError):
+            await key_collection.insert_one(
+                {
+                    "_id": kid,
+                    "algorithm": self.algorithm,
+                    "private_key": pem.decode(),
+                    "created_at": datetime.datetime.now(datetime.timezone.utc),
+                    "not_before": not_before,
+                }
+            )
+
+    async def _find_keys(self) -> list[dict[str, Any]]:
+        cursor = key_collection.find({"algorithm": self.algorithm})
+        docs: list[dict[str, Any]] = await cursor.to_list(length=None)
+        return sorted(docs, key=lambda doc: doc["not_before"])
+
+    async def _delete_retired(
+        self, docs: list[dict[str, Any]], now: datetime.datetime
+    ) -> list[dict[str, Any]]:
+        # a key signs until its successor starts to, tokens it signed last
+        # are valid for `overlap` from then
+        retired = {
+            doc["_id"]
+            for doc, successor in pairwise(docs)
+            if successor["not_before"].replace(tzinfo=datetime.timezone.utc)
+            + self.overlap
+            <= now
+        }
+        if retired:
+            await key_collection.delete_many({"_id": {"$in": list(retired)}})
+        return [doc for doc in docs if doc["_id"] not in retired]
+
+    async def refresh(self) -> None:
+        """Load published keys and rotate the signing key when it is due."""
+        if self.is_symmetric:
+            return
+        now = datetime.datetime.now(datetime.timezone.utc)
+        docs = await self._delete_retired(await self._find_keys(), now)
+        newest = docs[-1] if docs else None
+        if newest is None:
+            # workers booting together share the slot of the current period
+            period = int(now.timestamp() // self.rotation_period.total_seconds())
+            await self._create_key(
+                kid=self._slot_kid(f"first:{period}"), not_before=now
+            )
+            docs = await self._find_keys()
+        elif (
+            newest["not_before"].replace(tzinfo=datetime.timezone.utc)
+            + self.rotation_period
+            <= now
+        ):
+            await self._create_key(
+                kid=self._slot_kid(f"after:{newest['_id']}"),
+                not_before=now + self.publish_ahead,
+            )
+            docs = await self._find_keys()
+        self._keys = {
+            doc["_id"]: self._keys.get(doc["_id"]) or self._load_key(doc)
+            for doc in docs
+        }
+        self._build_jwks()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Failed to refresh signing keys")
+
+    async def start(self) -> None:
+        await self.refresh()
+        if self._task is None and not self.is_symmetric:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
+key_manager = KeyManager(
+    algorithm=settings.ALGORITHM,
+    secret_key=settings.SECRET_KEY,
+    rotation_period=datetime.timedelta(hours=settings.SIGNING_KEY_ROTATION_HOURS),
+    overlap=datetime.timedelta(hours=settings.SIGNING_KEY_OVERLAP_HOURS),
+    publish_ahead=datetime.timedelta(seconds=settings.JWKS_MAX_AGE_SECONDS),
+    refresh_interval=settings.SIGNING_KEYS_REFRESH_SECONDS,
+)
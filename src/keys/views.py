@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Request, Response, status
+from fastapi.responses import JSONResponse
+
+from src.config import settings
+
+from .manager import key_manager
+
+router = APIRouter(tags=["keys"])
+
+
+@router.get("/.well-known/jwks.json")
+async def get_jwks(req: Request) -> Response:
+    jwks, etag = key_manager.jwks()
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.JWKS_MAX_AGE_SECONDS}",
+    }
+    if req.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return JSONResponse(jwks, headers=headers)
@@ -4,16 +4,24 @@ from typing import Any
 
 from fastapi import FastAPI
 
+from src.apps.cache import app_cache
 from src.apps.views import router as apps_router
+from src.auth.hashing import hashing_executor
+from src.auth.revocation import token_revocation
 from src.auth.views import router as auth_router
+from src.config import settings
 from src.database import db_helper
 from src.emails.views import router as emails_router
-from src.mongo_helper import mongo_client
-from src.oauth2.models import OAuth2SessionsInDB
+from src.keys.manager import key_manager
+from src.keys.views import router as keys_router
+from src.metrics import router as metrics_router
+from src.oauth2.denylist import oauth2_denylist
 from src.oauth2.views import router as oauth2_router
-from src.redis_helper import redis_client
-from src.sessions.models import UserSessionsInDB
+from src.sessions.last_used import last_used_writer
+from src.sessions.reaper import session_reaper
 from src.sessions.views import router as sessions_router
+from src.startup import router as startup_router
+from src.startup import startup
 from src.users.views import router as users_router
 
 logger = logging.getLogger(__name__)
@@ -21,12 +29,23 @@ logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> Any:
-    async with db_helper.engine.begin() as conn:
-        await conn.run_sync(OAuth2SessionsInDB.metadata.create_all)
-        await conn.run_sync(UserSessionsInDB.metadata.create_all)
-    logger.info("MongoDB connected: ", await mongo_client.server_info())
-    logger.info("Redis connected: ", await redis_client.info())
+    await startup.check_schema()
+    await startup.load_keys()
+    await db_helper.start()
+    last_used_writer.start()
+    if settings.SESSIONS_BACKEND == "postgres":
+        session_reaper.start()
+    startup.start()
     yield
+    await startup.stop()
+    await oauth2_denylist.stop()
+    await token_revocation.stop()
+    await app_cache.stop()
+    await session_reaper.stop()
+    await last_used_writer.stop()
+    await key_manager.stop()
+    hashing_executor.shutdown()
+    await db_helper.stop()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -37,6 +56,9 @@ app.include_router(apps_router, prefix="/apps", tags=["apps"])
 app.include_router(oauth2_router, prefix="/oauth2", tags=["oauth2"])
 app.include_router(emails_router, prefix="/emails", tags=["emails"])
 app.include_router(users_router, prefix="/users", tags=["users"])
+app.include_router(keys_router, tags=["keys"])
+app.include_router(metrics_router, tags=["metrics"])
+app.include_router(startup_router, tags=["health"])
 
 
 @app.get("/ping")
@@ -0,0 +1,54 @@
+import secrets
+from collections.abc import Callable
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+
+from src.config import settings
+
+
+class MetricsRegistry:
+    """Named collectors whose stats are reported by `GET /metrics`."""
+
+    def __init__(self) -> None:
+        self._collectors: dict[str, Callable[[], dict[str, Any]]] = {}
+
+    def register(self, name: str, collector: Callable[[], dict[str, Any]]) -> None:
+        self._collectors[name] = collector
+
+    def collect(self) -> dict[str, dict[str, Any]]:
+        return {name: collector() for name, collector in self._collectors.items()}
+
+
+metrics = MetricsRegistry()
+
+router = APIRouter(tags=["metrics"])
+
+
+class MetricsDisabled(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+
+class InvalidMetricsToken(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Invalid metrics token"
+        )
+
+
+def check_metrics_token(authorization: Annotated[str | None, Header()] = None) -> None:
+    if settings.METRICS_TOKEN is None:
+        raise MetricsDisabled()
+    expected = f"Bearer {settings.METRICS_TOKEN}"
+    if authorization is None or not secrets.compare_digest(
+        authorization.encode(), expected.encode()
+    ):
+        raise InvalidMetricsToken()
+
+
+@router.get(
+    "/metrics", include_in_schema=False, dependencies=[Depends(check_metrics_token)]
+)
+async def get_metrics() -> dict[str, dict[str, Any]]:
+    return metrics.collect()
@@ -1,3 +1,5 @@
+import asyncio
+
 import motor.motor_asyncio
 
 from src.config import settings
@@ -7,3 +9,10 @@ mongo_client = motor.motor_asyncio.AsyncIOMotorClient(  # type: ignore
 )
 
 db = mongo_client[settings.MONGO_DATABASE_NAME]
+
+
+async def warm_up(connections: int) -> None:
+    """Open up to `connections` pooled connections with concurrent pings."""
+    await asyncio.gather(
+        *(mongo_client.admin.command("ping") for _ in range(connections))
+    )
@@ -0,0 +1,86 @@
+import base64
+import hashlib
+import json
+import secrets
+from typing import Literal
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from src.config import settings
+from src.redis_helper import redis_client
+
+
+class AuthorizationCode(BaseModel):
+    """What the user granted in `/authorize/`, redeemed once at `/token/`."""
+
+    user_id: int
+    scopes: list[str]
+    redirect_uri: str
+    code_challenge: str | None = None
+    code_challenge_method: Literal["S256", "plain"] | None = None
+
+    def dump(self) -> str:
+        # positional array, the field names would double the stored size
+        return json.dumps(
+            [
+                self.user_id,
+                self.scopes,
+                self.redirect_uri,
+                self.code_challenge,
+                self.code_challenge_method,
+            ],
+            separators=(",", ":"),
+        )
+
+    @classmethod
+    def load(cls, raw: bytes) -> "AuthorizationCode":
+        (
+            user_id,
+            scopes,
+            redirect_uri,
+            code_challenge,
+            code_challenge_method,
+        ) = json.loads(raw)
+        return cls(
+            user_id=user_id,
+            scopes=scopes,
+            redirect_uri=redirect_uri,
+            code_challenge=code_challenge,
+            code_challenge_method=code_challenge_method,
+        )
+
+    def verify_code_verifier(self, code_verifier: str | None) -> bool:
+        """PKCE (RFC 7636) check, codes issued without a challenge pass."""
+        if self.code_challenge is None:
+            return True
+        if code_verifier is None:
+            return False
+        if self.code_challenge_method == "plain":
+            expected = code_verifier
+        else:
+            digest = hashlib.sha256(code_verifier.encode("ascii")).digest()
+            expected = base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+        return secrets.compare_digest(expected, self.code_challenge)
+
+
+def _code_key(client_id: UUID, code: str) -> str:
+    return f"auth_code_{client_id}_{code}"
+
+
+class AuthorizationCodes:
+    @staticmethod
+    async def save(client_id: UUID, code: str, record: AuthorizationCode) -> None:
+        await redis_client.set(
+            _code_key(client_id, code),
+            record.dump(),
+            ex=settings.AUTHORIZATION_CODE_EXPIRE_SECONDS,
+        )
+
+    @staticmethod
+    async def consume(client_id: UUID, code: str) -> AuthorizationCode | None:
+        """Read and delete the code at once, so it is redeemed at most once."""
+        raw = await redis_client.getdel(_code_key(client_id, code))
+        if raw is None:
+            return None
+        return AuthorizationCode.load(raw)
@@ -1,18 +1,20 @@
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic import BaseModel
 
 
-class Settings(BaseSettings):
-    model_config = SettingsConfigDict(
-        env_file=".env",
-        env_file_encoding="utf-8",
-        extra="ignore",
-        case_sensitive=True,
-    )
+class OAuth2Settings(BaseModel):
+    """OAuth2 options, read from the environment by `src.config.Settings`."""
 
     REFRESH_TOKEN_LENGTH: int = 120
     AUTHORIZATION_CODE_LENGTH: int = 120
     AUTHORIZATION_CODE_EXPIRE_SECONDS: int = 60
     ACCESS_TOKEN_EXPIRE_SECONDS: int = 3600
+    # a client retrying a refresh whose response it lost may reuse the old
+    # token this long, later reuse revokes the session, 0 disables the window
+    REFRESH_TOKEN_REUSE_GRACE_SECONDS: int = 10
 
+    # tokens a resource server may check in one introspection request
+    INTROSPECTION_MAX_TOKENS: int = 100
 
-settings = Settings()
+    # trust signed access tokens and skip the users table lookup
+    STATELESS_ACCESS_TOKENS: bool = False
+    DENYLIST_SYNC_SECONDS: float = 5.0
@@ -1,11 +1,18 @@
 import datetime
+import logging
 from uuid import UUID
 
-from sqlalchemy import select
+from redis.exceptions import RedisError
+from sqlalchemy import ColumnElement, and_, case, delete, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.auth.revocation import token_revocation
+from src.config import settings
+
 from .models import OAuth2SessionsInDB
 
+logger = logging.getLogger(__name__)
+
 
 class OAuth2SessionsDB:
     @staticmethod
@@ -41,11 +48,70 @@ class OAuth2SessionsDB:
         return result.scalar_one_or_none()
 
     @staticmethod
-    async def update(
-        oauth2_session: OAuth2SessionsInDB,
-        refresh_token_hash: bytes,
+    async def rotate(
+        token_hash: bytes,
+        new_token_hash: bytes,
         session: AsyncSession,
-    ) -> None:
-        oauth2_session.last_used = datetime.datetime.now(datetime.timezone.utc)
-        oauth2_session.refresh_token_hash = refresh_token_hash
+    ) -> OAuth2SessionsInDB | None:
+        """
+        Swap the refresh token of the session holding `token_hash` in a
+        single UPDATE, so concurrent refreshes with one token can't both win.
+
+        The rotated out token is accepted again within the grace window only,
+        reusing it later means it leaked and the session is revoked.
+        """
+        now = datetime.datetime.now(datetime.timezone.utc)
+        is_current = OAuth2SessionsInDB.refresh_token_hash == token_hash
+        accepted: ColumnElement[bool] = is_current
+        if settings.REFRESH_TOKEN_REUSE_GRACE_SECONDS > 0:
+            grace_start = now - datetime.timedelta(
+                seconds=settings.REFRESH_TOKEN_REUSE_GRACE_SECONDS
+            )
+            accepted = or_(
+                is_current,
+                and_(
+                    OAuth2SessionsInDB.previous_token_hash == token_hash,
+                    OAuth2SessionsInDB.rotated_at >= grace_start,
+                ),
+            )
+        stmt = (
+            update(OAuth2SessionsInDB)
+            .where(accepted)
+            .values(
+                refresh_token_hash=new_token_hash,
+                previous_token_hash=token_hash,
+                # retries within the grace window don't extend it
+                rotated_at=case((is_current, now), else_=OAuth2SessionsInDB.rotated_at),
+                last_used=now,
+            )
+            .returning(OAuth2SessionsInDB)
+        )
+        oauth2_session = (await session.scalars(stmt)).one_or_none()
+        revoked: list[UUID] = []
+        if oauth2_session is None:
+            result = await session.execute(
+                delete(OAuth2SessionsInDB)
+                .where(OAuth2SessionsInDB.previous_token_hash == token_hash)
+                .returning(OAuth2SessionsInDB.session_id)
+            )
+            revoked = list(result.scalars())
+            if revoked:
+                logger.warning("Refresh token reused, session revoked")
         await session.commit()
+        if revoked:
+            await OAuth2SessionsDB._revoke_access_tokens(revoked)
+        return oauth2_session
+
+    @staticmethod
+    async def _revoke_access_tokens(session_ids: list[UUID]) -> None:
+        # tokens issued for the sessions carry their id, the last ones
+        # expire at most a token lifetime from now
+        expires_at = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(
+            seconds=settings.ACCESS_TOKEN_EXPIRE_SECONDS
+        )
+        try:
+            await token_revocation.revoke(
+                {session_id: expires_at for session_id in session_ids}
+            )
+        except RedisError:
+            logger.exception("Failed to revoke the access tokens of a session")
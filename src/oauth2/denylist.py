@@ -0,0 +1,99 @@
+import asyncio
+import contextlib
+import datetime
+import logging
+import math
+
+from src.config import settings
+from src.redis_helper import redis_client
+
+logger = logging.getLogger(__name__)
+
+DENYLIST_KEY = "oauth2_denylist"
+
+
+class OAuth2Denylist:
+    """
+    Users whose OAuth2 access tokens must be rejected without a database
+    lookup.
+
+    Redis keeps a hash of `user_id -> timestamp`: tokens issued before the
+    timestamp are denied, `inf` denies every token (deactivated users).
+    Each worker checks a local mirror that is refreshed from Redis every
+    `sync_interval` seconds.
+    """
+
+    def __init__(self, sync_interval: float, token_lifetime: int) -> None:
+        self.sync_interval = sync_interval
+        self.token_lifetime = token_lifetime
+        self._denied: dict[int, float] = {}
+        self._task: asyncio.Task[None] | None = None
+
+    def is_denied(self, user_id: int, issued_at: datetime.datetime | None) -> bool:
+        denied_before = self._denied.get(user_id)
+        if denied_before is None:
+            return False
+        return issued_at is None or issued_at.timestamp() < denied_before
+
+    async def _deny(self, user_id: int, denied_before: float) -> None:
+        await redis_client.hset(DENYLIST_KEY, str(user_id), repr(denied_before))  # type: ignore[misc]
+        self._denied[user_id] = denied_before
+
+    async def revoke_user_tokens(self, user_id: int) -> None:
+        """Deny every access token issued to the user until now."""
+        now = datetime.datetime.now(datetime.timezone.utc).timestamp()
+        # `iat` has a one second resolution, tokens issued within the
+        # current second stay valid
+        await self._deny(user_id, math.floor(now))
+
+    async def deny_user(self, user_id: int) -> None:
+        """Deny every access token of the user, including future ones."""
+        await self._deny(user_id, math.inf)
+
+    async def allow_user(self, user_id: int) -> None:
+        await redis_client.hdel(DENYLIST_KEY, str(user_id))  # type: ignore[misc]
+        self._denied.pop(user_id, None)
+
+    async def sync(self) -> None:
+        entries = await redis_client.hgetall(DENYLIST_KEY)  # type: ignore[misc]
+        # tokens issued before this point have expired on their own
+        horizon = (
+            datetime.datetime.now(datetime.timezone.utc).timestamp()
+            - self.token_lifetime
+        )
+        denied: dict[int, float] = {}
+        stale: list[str] = []
+        for user_id, denied_before in entries.items():
+            if float(denied_before) < horizon:
+                stale.append(str(int(user_id)))
+            else:
+                denied[int(user_id)] = float(denied_before)
+        if stale:
+            await redis_client.hdel(DENYLIST_KEY, *stale)  # type: ignore[misc]
+        self._denied = denied
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self.sync()
+            except Exception:
+                logger.exception("Failed to sync the OAuth2 denylist")
+
+    async def start(self) -> None:
+        await self.sync()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
+oauth2_denylist = OAuth2Denylist(
+    sync_interval=settings.DENYLIST_SYNC_SECONDS,
+    token_lifetime=settings.ACCESS_TOKEN_EXPIRE_SECONDS,
+)
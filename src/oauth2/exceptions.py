@@ -41,6 +41,14 @@ class InvalidAuthorizationCode(HTTPException):
         )
 
 
+class InvalidCodeVerifier(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid code verifier",
+        )
+
+
 class InvalidSession(HTTPException):
     def __init__(self) -> None:
         super().__init__(
@@ -0,0 +1,93 @@
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth.dependencies import decode_payload
+from src.auth.exceptions import InvalidToken
+from src.auth.revocation import token_revocation
+from src.config import settings
+from src.oauth2.denylist import oauth2_denylist
+from src.users.crud import UsersDB
+
+from .schemas import OAuth2AccessTokenPayload, OAuth2TokenIntrospection
+
+INACTIVE = OAuth2TokenIntrospection(active=False)
+
+
+def _decode(token: str, client_id: UUID) -> OAuth2AccessTokenPayload | None:
+    try:
+        payload = decode_payload(token)
+    except InvalidToken:
+        return None
+    # clients may only introspect the access tokens issued to them
+    if (
+        not isinstance(payload, OAuth2AccessTokenPayload)
+        or payload.client_id != client_id
+    ):
+        return None
+    return payload
+
+
+def _user_id(payload: OAuth2AccessTokenPayload) -> int | None:
+    return int(payload.sub) if payload.sub.isdigit() else None
+
+
+def _check(
+    payload: OAuth2AccessTokenPayload,
+    active_users: set[int],
+    revoked: set[UUID],
+) -> OAuth2TokenIntrospection:
+    user_id = _user_id(payload)
+    if user_id is None or payload.jti in revoked or payload.sid in revoked:
+        return INACTIVE
+    if settings.STATELESS_ACCESS_TOKENS:
+        active = not oauth2_denylist.is_denied(user_id, issued_at=payload.iat)
+    else:
+        active = user_id in active_users
+    if not active:
+        return INACTIVE
+    return OAuth2TokenIntrospection(
+        active=True,
+        scope=" ".join(payload.scopes),
+        sub=str(user_id),
+        exp=int(payload.exp.timestamp()),
+        iat=int(payload.iat.timestamp()) if payload.iat else None,
+    )
+
+
+async def introspect_tokens(
+    tokens: list[str], client_id: UUID, session: AsyncSession
+) -> list[OAuth2TokenIntrospection]:
+    """
+    Check a batch of the client's access tokens the way the auth
+    dependencies check one.
+
+    Every token is decoded first, then the users they refer to are loaded
+    with one query, however many tokens there are.
+    """
+    payloads = [_decode(token, client_id) for token in tokens]
+
+    user_ids: set[int] = set()
+    jtis: set[UUID] = set()
+    for payload in payloads:
+        if payload is None:
+            continue
+        if payload.jti is not None:
+            jtis.add(payload.jti)
+        if payload.sid is not None:
+            jtis.add(payload.sid)
+        user_id = _user_id(payload)
+        if user_id is not None and not settings.STATELESS_ACCESS_TOKENS:
+            user_ids.add(user_id)
+
+    active_users = {
+        user.id
+        for user in await UsersDB.get_by_ids(ids=user_ids, session=session)
+        if user.active
+    }
+    revoked = await token_revocation.filter_revoked(jtis, sole_record=True)
+
+    return [
+        INACTIVE if payload is None else _check(payload, active_users, revoked)
+        for payload in payloads
+    ]
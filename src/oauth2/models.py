@@ -1,7 +1,7 @@
 import datetime
 from uuid import UUID
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.models import Base
@@ -9,12 +9,21 @@ from src.models import Base
 
 class OAuth2SessionsInDB(Base):
     __tablename__ = "oauth2_sessions"
+    __table_args__ = (
+        Index(
+            "ix_oauth2_sessions_user_id_session_id",
+            "user_id",
+            "session_id",
+            unique=True,
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    user_id: Mapped[int] = mapped_column(
-        ForeignKey("users.id", ondelete="CASCADE"), index=True
-    )
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
     refresh_token_hash: Mapped[bytes] = mapped_column(index=True)
+    # the token rotated out last, accepted again only for a short grace window
+    previous_token_hash: Mapped[bytes | None] = mapped_column(index=True)
+    rotated_at: Mapped[datetime.datetime | None]
     session_id: Mapped[UUID]
     app_id: Mapped[UUID]
     scope: Mapped[str]
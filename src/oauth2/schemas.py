@@ -1,9 +1,13 @@
 import datetime
+from typing import Literal
 from uuid import UUID
 
 from pydantic import BaseModel, Field, field_validator
 
-from .config import settings
+from src.config import settings
+
+# RFC 7636 section 4.1
+CODE_VERIFIER_PATTERN = r"^[A-Za-z0-9._~-]{43,128}$"
 
 
 class OAuth2AuthorizeRequest(BaseModel):
@@ -13,12 +17,17 @@ class OAuth2AuthorizeRequest(BaseModel):
     scopes: list[str]
     state: str | None = Field(default=None)
     nonce: str | None = Field(default=None)
+    code_challenge: str | None = Field(default=None)
+    code_challenge_method: Literal["S256", "plain"] = Field(default="S256")
 
 
 class OAuth2CodeExchangeRequest(BaseModel):
     client_id: UUID
     client_secret: UUID
     code: str
+    # the redirect_uri the code was issued for (RFC 6749 section 4.1.3)
+    redirect_uri: str
+    code_verifier: str | None = Field(default=None, pattern=CODE_VERIFIER_PATTERN)
 
 
 class OAuth2AuthorizeResponse(BaseModel):
@@ -33,6 +42,13 @@ class OAuth2AccessTokenPayload(BaseModel):
         default_factory=lambda: datetime.datetime.now()
         + datetime.timedelta(seconds=settings.ACCESS_TOKEN_EXPIRE_SECONDS)
     )
+    iat: datetime.datetime | None = Field(default=None)
+    # tokens issued before ids were added cannot be revoked one by one
+    jti: UUID | None = Field(default=None)
+    # client the token was issued to, missing from older tokens
+    client_id: UUID | None = Field(default=None)
+    # OAuth2 session the token was issued for, revoked together with it
+    sid: UUID | None = Field(default=None)
 
 
 class OAuth2CodeExchangeResponse(BaseModel):
@@ -53,3 +69,32 @@ class RefreshTokenRequest(BaseModel):
         if v != "refresh_token":
             raise ValueError("grant_type must be 'refresh_token'")
         return v
+
+
+class OAuth2IntrospectionRequest(BaseModel):
+    client_id: UUID
+    client_secret: UUID
+    tokens: list[str] = Field(
+        min_length=1, max_length=settings.INTROSPECTION_MAX_TOKENS
+    )
+
+
+class OAuth2TokenIntrospection(BaseModel):
+    """RFC 7662 introspection response for one token."""
+
+    active: bool
+    scope: str | None = Field(default=None)
+    sub: str | None = Field(default=None)
+    exp: int | None = Field(default=None)
+    iat: int | None = Field(default=None)
+
+
+class OAuth2IntrospectionResponse(BaseModel):
+    # in the order of the requested tokens
+    results: list[OAuth2TokenIntrospection]
+
+
+class OAuth2RevocationRequest(BaseModel):
+    client_id: UUID
+    client_secret: UUID
+    token: str
@@ -1,14 +1,15 @@
 import base64
+import datetime
 import hashlib
 import secrets
 from uuid import UUID, uuid4
 
-import jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.config import settings as global_settings
+from src.config import settings
+from src.keys.manager import key_manager
+from src.utils import UUIDEncoder
 
-from .config import settings
 from .crud import OAuth2SessionsDB
 from .models import OAuth2SessionsInDB
 from .schemas import OAuth2AccessTokenPayload, OAuth2CodeExchangeResponse
@@ -30,10 +31,8 @@ def validate_token(token: str, token_hash: bytes) -> bool:
 
 
 def gen_access_token(payload: OAuth2AccessTokenPayload) -> str:
-    return jwt.encode(
-        payload=payload.model_dump(),
-        key=global_settings.SECRET_KEY,
-        algorithm=global_settings.ALGORITHM,
+    return key_manager.encode(
+        payload=payload.model_dump(exclude_none=True), json_encoder=UUIDEncoder
     )
 
 
@@ -62,17 +61,29 @@ def create_token_pair(
 
 
 async def gen_token_pair_and_create_session(
-    scopes: list[str], user_id: int, app_id: UUID, session: AsyncSession
+    scopes: list[str],
+    user_id: int,
+    app_id: UUID,
+    client_id: UUID,
+    session: AsyncSession,
 ) -> OAuth2CodeExchangeResponse:
     scopes_str = " ".join(scopes)
     refresh_token_bytes = gen_refresh_token_bytes()
+    session_id = uuid4()
     access_token, refresh_token = create_token_pair(
-        payload=OAuth2AccessTokenPayload(sub=str(user_id), scopes=scopes),
+        payload=OAuth2AccessTokenPayload(
+            sub=str(user_id),
+            scopes=scopes,
+            iat=datetime.datetime.now(datetime.timezone.utc),
+            jti=uuid4(),
+            client_id=client_id,
+            sid=session_id,
+        ),
         refresh_token_bytes=refresh_token_bytes,
     )
     await OAuth2SessionsDB.create_session(
         user_id=user_id,
-        session_id=uuid4(),
+        session_id=session_id,
         refresh_token_hash=hash_token(refresh_token_bytes),
         app_id=app_id,
         scope=scopes_str,
@@ -85,22 +96,21 @@ async def gen_token_pair_and_create_session(
     )
 
 
-async def update_session_and_gen_new_token(
-    oauth2_session: OAuth2SessionsInDB, session: AsyncSession
+def gen_token_pair_for_session(
+    oauth2_session: OAuth2SessionsInDB, client_id: UUID, refresh_token_bytes: bytes
 ) -> OAuth2CodeExchangeResponse:
     scopes = oauth2_session.scope.split(" ")
-    refresh_token_bytes = gen_refresh_token_bytes()
     access_token, refresh_token = create_token_pair(
         payload=OAuth2AccessTokenPayload(
-            sub=str(oauth2_session.user_id), scopes=scopes
+            sub=str(oauth2_session.user_id),
+            scopes=scopes,
+            iat=datetime.datetime.now(datetime.timezone.utc),
+            jti=uuid4(),
+            client_id=client_id,
+            sid=oauth2_session.session_id,
         ),
         refresh_token_bytes=refresh_token_bytes,
     )
-    await OAuth2SessionsDB.update(
-        oauth2_session=oauth2_session,
-        refresh_token_hash=hash_token(refresh_token_bytes),
-        session=session,
-    )
     return OAuth2CodeExchangeResponse(
         access_token=access_token,
         refresh_token=refresh_token,
@@ -1,35 +1,47 @@
 from enum import Enum
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
 from src.apps.exceptions import AppNotFound
 from src.apps.registry import AppsRegistry
-from src.dependencies import DbSession, UserAuthorization
+from src.auth.dependencies import decode_payload
+from src.auth.exceptions import InvalidToken
+from src.auth.revocation import token_revocation
+from src.config import settings
+from src.dependencies import DbReadSession, DbSession, UserAuthorization
 from src.oauth2.crud import OAuth2SessionsDB
-from src.redis_helper import redis_client
+from src.rate_limit.dependencies import limit_by_ip
+from src.rate_limit.limiter import rate_limiter
 
-from .config import settings
+from .codes import AuthorizationCode, AuthorizationCodes
 from .exceptions import (
     AuthorizationTypeIsNotSupported,
     InvalidAuthorizationCode,
     InvalidClientSecret,
+    InvalidCodeVerifier,
     InvalidSession,
     NotAllowedScope,
     RedirectUriNotAllowed,
 )
+from .introspection import introspect_tokens
 from .schemas import (
+    OAuth2AccessTokenPayload,
     OAuth2AuthorizeRequest,
     OAuth2AuthorizeResponse,
     OAuth2CodeExchangeRequest,
     OAuth2CodeExchangeResponse,
+    OAuth2IntrospectionRequest,
+    OAuth2IntrospectionResponse,
+    OAuth2RevocationRequest,
     RefreshTokenRequest,
 )
 from .utils import (
     gen_authorization_code,
+    gen_refresh_token_bytes,
     gen_token_pair_and_create_session,
+    gen_token_pair_for_session,
     get_bytes_from_token,
     hash_token,
-    update_session_and_gen_new_token,
 )
 
 router = APIRouter(prefix="", tags=["oauth2"])
@@ -51,7 +63,9 @@ async def oauth2_authorize(
     if data.redirect_uri not in app.redirect_uris:
         raise RedirectUriNotAllowed()
 
-    disallowed_scopes = [scope for scope in data.scopes if scope not in app.scopes]
+    disallowed_scopes = [
+        scope for scope in data.scopes if scope not in app.allowed_scopes
+    ]
     if disallowed_scopes:
         raise NotAllowedScope(disallowed_scopes)
 
@@ -60,10 +74,18 @@ async def oauth2_authorize(
 
     auth_code = gen_authorization_code()
 
-    await redis_client.set(
-        f"auth_code_{app.client_id}_{auth_code}",
-        user.id,
-        ex=settings.AUTHORIZATION_CODE_EXPIRE_SECONDS,
+    await AuthorizationCodes.save(
+        client_id=app.client_id,
+        code=auth_code,
+        record=AuthorizationCode(
+            user_id=user.id,
+            scopes=data.scopes,
+            redirect_uri=data.redirect_uri,
+            code_challenge=data.code_challenge,
+            code_challenge_method=(
+                data.code_challenge_method if data.code_challenge else None
+            ),
+        ),
     )
 
     return OAuth2AuthorizeResponse(
@@ -72,7 +94,10 @@ async def oauth2_authorize(
     )
 
 
-@router.post("/token/")
+@router.post(
+    "/token/",
+    dependencies=[Depends(limit_by_ip("token", settings.RATE_LIMIT_TOKEN_PER_IP))],
+)
 async def oauth2_exchange_code(
     data: OAuth2CodeExchangeRequest, session: DbSession
 ) -> OAuth2CodeExchangeResponse:
@@ -81,17 +106,25 @@ async def oauth2_exchange_code(
         raise AppNotFound()
     if data.client_secret != app.client_secret:
         raise InvalidClientSecret()
+    # only once authenticated, others cannot use up the client's budget
+    await rate_limiter.hit(
+        "token", str(data.client_id), settings.RATE_LIMIT_TOKEN_PER_CLIENT
+    )
 
-    user_id = await redis_client.get(f"auth_code_{app.client_id}_{data.code}")
-    if not user_id:
+    code = await AuthorizationCodes.consume(client_id=app.client_id, code=data.code)
+    if code is None:
         raise InvalidAuthorizationCode()
-
-    await redis_client.delete(f"auth_code_{app.client_id}_{data.code}")
+    if data.redirect_uri != code.redirect_uri:
+        raise InvalidAuthorizationCode()
+    if not code.verify_code_verifier(data.code_verifier):
+        raise InvalidCodeVerifier()
 
     return await gen_token_pair_and_create_session(
-        scopes=app.scopes,
-        user_id=user_id,
+        # scopes the app lost since the user granted them are dropped
+        scopes=[scope for scope in code.scopes if scope in app.allowed_scopes],
+        user_id=code.user_id,
         app_id=app.id,
+        client_id=app.client_id,
         session=session,
     )
 
@@ -100,9 +133,55 @@ async def oauth2_exchange_code(
 async def refresh_token(
     data: RefreshTokenRequest, session: DbSession
 ) -> OAuth2CodeExchangeResponse:
-    oauth2_session = await OAuth2SessionsDB.get_by_token(
-        hash_token(get_bytes_from_token(data.refresh_token)), session=session
+    refresh_token_bytes = gen_refresh_token_bytes()
+    oauth2_session = await OAuth2SessionsDB.rotate(
+        token_hash=hash_token(get_bytes_from_token(data.refresh_token)),
+        new_token_hash=hash_token(refresh_token_bytes),
+        session=session,
     )
     if not oauth2_session:
         raise InvalidSession()
-    return await update_session_and_gen_new_token(oauth2_session, session)
+    app = await AppsRegistry.get(oauth2_session.app_id)
+    if not app:
+        raise AppNotFound()
+    return gen_token_pair_for_session(
+        oauth2_session, app.client_id, refresh_token_bytes
+    )
+
+
+@router.post("/introspect/", response_model_exclude_none=True)
+async def introspect(
+    data: OAuth2IntrospectionRequest, session: DbReadSession
+) -> OAuth2IntrospectionResponse:
+    app = await AppsRegistry.get_by_client_id(data.client_id)
+    if not app:
+        raise AppNotFound()
+    if data.client_secret != app.client_secret:
+        raise InvalidClientSecret()
+    return OAuth2IntrospectionResponse(
+        results=await introspect_tokens(
+            data.tokens, client_id=app.client_id, session=session
+        )
+    )
+
+
+@router.post("/revoke/")
+async def revoke(data: OAuth2RevocationRequest) -> None:
+    """Revoke an access token before it expires (RFC 7009)."""
+    app = await AppsRegistry.get_by_client_id(data.client_id)
+    if not app:
+        raise AppNotFound()
+    if data.client_secret != app.client_secret:
+        raise InvalidClientSecret()
+    try:
+        payload = decode_payload(data.token)
+    except InvalidToken:
+        # nothing to revoke, which is not an error for the client
+        return
+    if (
+        isinstance(payload, OAuth2AccessTokenPayload)
+        and payload.jti is not None
+        # only the client the token was issued to may revoke it
+        and payload.client_id == app.client_id
+    ):
+        await token_revocation.revoke({payload.jti: payload.exp})
@@ -0,0 +1,36 @@
+from typing import Literal
+
+from pydantic import BaseModel
+
+
+class RateLimit(BaseModel):
+    """
+    `requests` per `seconds`, given as JSON in the environment.
+
+    A sliding window counts the requests of the last `seconds`, a token
+    bucket allows bursts of `requests` and refills them over `seconds`.
+    """
+
+    requests: int
+    seconds: float
+    algorithm: Literal["sliding_window", "token_bucket"] = "sliding_window"
+
+
+class RateLimitSettings(BaseModel):
+    """Rate limits, read from the environment by `src.config.Settings`."""
+
+    RATE_LIMIT_ENABLED: bool = True
+    # limited keys each worker rejects without Redis until they may retry
+    RATE_LIMIT_LOCAL_CACHE_SIZE: int = 10_000
+
+    RATE_LIMIT_LOGIN_PER_IP: RateLimit = RateLimit(requests=30, seconds=60)
+    # by username or email, whichever is used to log in, and client IP
+    RATE_LIMIT_LOGIN_PER_ACCOUNT: RateLimit = RateLimit(requests=10, seconds=5 * 60)
+    RATE_LIMIT_OTP_PER_IP: RateLimit = RateLimit(requests=10, seconds=60)
+    RATE_LIMIT_OTP_PER_EMAIL: RateLimit = RateLimit(requests=3, seconds=5 * 60)
+    RATE_LIMIT_FORGOT_PER_IP: RateLimit = RateLimit(requests=10, seconds=60)
+    RATE_LIMIT_FORGOT_PER_EMAIL: RateLimit = RateLimit(requests=3, seconds=60 * 60)
+    RATE_LIMIT_TOKEN_PER_IP: RateLimit = RateLimit(requests=60, seconds=60)
+    RATE_LIMIT_TOKEN_PER_CLIENT: RateLimit = RateLimit(
+        requests=100, seconds=10, algorithm="token_bucket"
+    )
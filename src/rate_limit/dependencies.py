@@ -0,0 +1,45 @@
+import ipaddress
+from collections.abc import Awaitable, Callable
+
+from fastapi import Request
+
+from src.config import settings
+
+from .config import RateLimit
+from .limiter import rate_limiter
+
+
+def _is_trusted_proxy(host: str) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in settings.TRUSTED_PROXIES)
+
+
+def client_ip(req: Request) -> str | None:
+    """Address of the client, behind `TRUSTED_PROXIES` the forwarded one."""
+    if req.client is None:
+        return None
+    host = req.client.host
+    if not _is_trusted_proxy(host):
+        return host
+    forwarded = ",".join(req.headers.getlist("x-forwarded-for")).split(",")
+    # every proxy appends the address it was connected from, the client is
+    # the last one not added by a trusted proxy
+    for address in reversed([address.strip() for address in forwarded]):
+        if not address:
+            continue
+        host = address
+        if not _is_trusted_proxy(host):
+            break
+    return host
+
+
+def limit_by_ip(name: str, limit: RateLimit) -> Callable[[Request], Awaitable[None]]:
+    """Dependency counting the requests of the client IP against `limit`."""
+
+    async def dependency(req: Request) -> None:
+        await rate_limiter.hit(f"{name}_ip", client_ip(req) or "unknown", limit)
+
+    return dependency
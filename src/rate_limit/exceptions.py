@@ -0,0 +1,12 @@
+import math
+
+from fastapi import HTTPException, status
+
+
+class RateLimited(HTTPException):
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests, try again later",
+            headers={"Retry-After": str(max(math.ceil(retry_after), 1))},
+        )
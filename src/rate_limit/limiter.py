@@ -0,0 +1,143 @@
+import hashlib
+import logging
+import time
+from typing import Any
+
+from cachetools import TLRUCache
+from redis.exceptions import RedisError
+
+from src.config import settings
+from src.metrics import metrics
+from src.redis_helper import redis_client
+
+from .config import RateLimit
+from .exceptions import RateLimited
+
+logger = logging.getLogger(__name__)
+
+# both scripts record the request if it is allowed and return 0, otherwise
+# the milliseconds until it would be
+
+# sorted set of request times
+SLIDING_WINDOW = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+if redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[3]) then
+    redis.call('ZADD', KEYS[1], now, ARGV[4])
+    redis.call('PEXPIRE', KEYS[1], window)
+    return 0
+end
+local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+return math.max(tonumber(oldest[2]) + window - now, 1)
+"""
+
+# hash of the tokens left and when they were counted
+TOKEN_BUCKET = """
+local now = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local interval = tonumber(ARGV[3]) / capacity
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local elapsed = math.max(now - (tonumber(state[2]) or now), 0)
+tokens = math.min(capacity, tokens + elapsed / interval)
+local retry = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    retry = math.max(math.ceil((1 - tokens) * interval), 1)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) * interval))
+return retry
+"""
+
+sliding_window_script = redis_client.register_script(SLIDING_WINDOW)
+token_bucket_script = redis_client.register_script(TOKEN_BUCKET)
+
+
+def _blocked_until(_: str, until: float, __: float) -> float:
+    return until
+
+
+class RateLimiter:
+    """
+    Requests per key, checked and recorded in Redis in one round trip.
+
+    A key that reached its limit is remembered by the worker until it may
+    retry, so the rest of a burst is rejected without asking Redis. Redis
+    errors let requests through, the limits protect the server and must
+    not take logins down with Redis.
+    """
+
+    def __init__(self, enabled: bool, local_cache_size: int) -> None:
+        self.enabled = enabled
+        self._blocked = TLRUCache(
+            maxsize=max(local_cache_size, 1), ttu=_blocked_until, timer=time.monotonic
+        )
+        self.allowed = 0
+        self.limited = 0
+        self.limited_locally = 0
+        self.errors = 0
+
+    @staticmethod
+    def _key(name: str, key: str) -> str:
+        # identifiers are emails, keep them out of Redis
+        return f"{name}:{hashlib.sha256(key.encode()).hexdigest()[:32]}"
+
+    async def _retry_after_ms(self, key: str, limit: RateLimit) -> int:
+        now = time.time_ns() // 1_000_000
+        window = int(limit.seconds * 1000)
+        if limit.algorithm == "token_bucket":
+            retry: int = await token_bucket_script(
+                keys=[f"rate_limit:{key}"], args=[now, limit.requests, window]
+            )
+        else:
+            retry = await sliding_window_script(
+                keys=[f"rate_limit:{key}"],
+                args=[now, window, limit.requests, time.time_ns()],
+            )
+        return retry
+
+    async def hit(self, name: str, key: str, limit: RateLimit) -> None:
+        """Count a request of `key` against `limit`, raise if it is over."""
+        if not self.enabled:
+            return
+        cache_key = self._key(name, key)
+        blocked_until: float | None = self._blocked.get(cache_key)
+        if blocked_until is not None:
+            self.limited += 1
+            self.limited_locally += 1
+            raise RateLimited(retry_after=blocked_until - time.monotonic())
+        try:
+            retry_ms = await self._retry_after_ms(cache_key, limit)
+        except RedisError:
+            self.errors += 1
+            logger.warning("Rate limiter is unavailable", exc_info=True)
+            return
+        if retry_ms <= 0:
+            self.allowed += 1
+            return
+        self.limited += 1
+        self._blocked[cache_key] = time.monotonic() + retry_ms / 1000
+        raise RateLimited(retry_after=retry_ms / 1000)
+
+    def clear(self) -> None:
+        self._blocked.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "blocked": len(self._blocked),
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "limited_locally": self.limited_locally,
+            "errors": self.errors,
+        }
+
+
+rate_limiter = RateLimiter(
+    enabled=settings.RATE_LIMIT_ENABLED,
+    local_cache_size=settings.RATE_LIMIT_LOCAL_CACHE_SIZE,
+)
+metrics.register("rate_limit", rate_limiter.stats)
@@ -1,8 +1,155 @@
+import asyncio
+import time
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from typing import Any
+
 import redis.asyncio as aioredis
+from redis.asyncio.client import Pipeline
+from redis.asyncio.connection import Connection
+from redis.asyncio.retry import Retry
+from redis.backoff import ExponentialBackoff
+from redis.exceptions import ConnectionError, RedisError, TimeoutError
 
 from src.config import settings
+from src.metrics import metrics
+
+# KEYS: key; ARGV: expected value
+# one-time values (email tokens, OTPs) are checked and redeemed atomically
+COMPARE_AND_DELETE = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class InstrumentedConnectionPool(aioredis.BlockingConnectionPool):
+    """Blocking pool that records how long each checkout waited."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    async def get_connection(
+        self, command_name: str, *keys: Any, **options: Any
+    ) -> Connection:
+        # includes connecting when the pool has no idle connection
+        started = time.perf_counter()
+        try:
+            connection: Connection = await super().get_connection(  # type: ignore[no-untyped-call]
+                command_name, *keys, **options
+            )
+            return connection
+        except ConnectionError as err:
+            # the pool raises from the timeout of the wait for a free
+            # connection, errors while connecting are not timeouts
+            if isinstance(err.__cause__, asyncio.TimeoutError):
+                self.timeouts += 1
+            raise
+        finally:
+            wait = time.perf_counter() - started
+            self.checkouts += 1
+            self.wait_seconds_total += wait
+            self.wait_seconds_max = max(self.wait_seconds_max, wait)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "max_connections": self.max_connections,
+            "in_use": len(self._in_use_connections),
+            "idle": len(self._available_connections),
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_seconds_total": self.wait_seconds_total,
+            "wait_seconds_max": self.wait_seconds_max,
+        }
+
 
-redis_client = aioredis.from_url(
-    str(settings.REDIS_URL),  # type: ignore
-    # decode_responses=True,
+class RedisHelper:
+    def __init__(
+        self,
+        url: str,
+        max_connections: int = 50,
+        pool_timeout: float = 5,
+        socket_timeout: float | None = 5,
+        socket_connect_timeout: float | None = 5,
+        retry_attempts: int = 3,
+        health_check_interval: int = 30,
+    ) -> None:
+        # redis-py parses replies with hiredis whenever it is installed
+        self.pool = InstrumentedConnectionPool.from_url(
+            url,
+            max_connections=max_connections,
+            timeout=pool_timeout,
+            socket_timeout=socket_timeout,
+            socket_connect_timeout=socket_connect_timeout,
+            retry_on_timeout=True,
+            retry=Retry(
+                ExponentialBackoff(cap=1, base=0.05),  # type: ignore[no-untyped-call]
+                retry_attempts,
+            ),
+            retry_on_error=[ConnectionError, TimeoutError],
+            health_check_interval=health_check_interval,
+        )
+        self.client = aioredis.Redis(connection_pool=self.pool)
+        self._compare_and_delete = self.client.register_script(COMPARE_AND_DELETE)
+
+    @asynccontextmanager
+    async def pipeline(
+        self, transaction: bool = True
+    ) -> AsyncGenerator[Pipeline, None]:
+        """
+        Commands queued in the block are sent in one round trip when it
+        exits, inside MULTI/EXEC with `transaction`. Nothing is sent if the
+        block raises.
+        """
+        async with self.client.pipeline(transaction=transaction) as pipe:
+            yield pipe
+            await pipe.execute()
+
+    async def compare_and_delete(self, key: str, expected: bytes | str) -> bool:
+        """Delete `key` only if it holds `expected`, in one round trip."""
+        deleted = await self._compare_and_delete(keys=[key], args=[expected])
+        return bool(deleted)
+
+    async def warm_up(self, connections: int) -> None:
+        """Connect up to `connections` pooled connections."""
+        results = await asyncio.gather(
+            *(
+                self.pool.get_connection("PING")
+                for _ in range(min(connections, self.pool.max_connections))
+            ),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Connection):
+                await self.pool.release(result)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    async def ping(self) -> bool:
+        try:
+            return bool(await self.client.ping())
+        except RedisError:
+            return False
+
+    def pool_stats(self) -> dict[str, Any]:
+        return self.pool.stats()
+
+
+redis_helper = RedisHelper(
+    url=str(settings.REDIS_URL),
+    max_connections=settings.REDIS_MAX_CONNECTIONS,
+    pool_timeout=settings.REDIS_POOL_TIMEOUT_SECONDS,
+    socket_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+    socket_connect_timeout=settings.REDIS_SOCKET_CONNECT_TIMEOUT_SECONDS,
+    retry_attempts=settings.REDIS_RETRY_ATTEMPTS,
+    health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL_SECONDS,
 )
+metrics.register("redis_pool", redis_helper.pool_stats)
+
+redis_client: aioredis.Redis = redis_helper.client
@@ -0,0 +1,272 @@
+import datetime
+from abc import ABC, abstractmethod
+from collections.abc import Collection, Sequence
+from uuid import UUID
+
+from sqlalchemy import (
+    DateTime,
+    Integer,
+    Uuid,
+    bindparam,
+    column,
+    delete,
+    insert,
+    select,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import settings
+from src.users.models import UserInDB
+
+from .models import UserSessionsInDB
+
+# last_used bumps keyed by (user_id, session_id)
+LastUsed = dict[tuple[int, UUID], datetime.datetime]
+# expires_at of the revoked sessions by session_id
+Revoked = dict[UUID, datetime.datetime]
+
+
+def new_session_times() -> tuple[datetime.datetime, datetime.datetime]:
+    time_now = datetime.datetime.now()
+    return time_now, time_now + datetime.timedelta(
+        hours=settings.USER_TOKEN_EXPIRE_HOURS
+    )
+
+
+class SessionsBackend(ABC):
+    """
+    Storage of user sessions.
+
+    Every method gets the request's database session, backends that keep
+    sessions elsewhere use it for the user rows only.
+    """
+
+    @abstractmethod
+    async def create_new(
+        self,
+        user_id: int,
+        session_id: UUID,
+        ip_address: str | None,
+        session: AsyncSession,
+    ) -> UserSessionsInDB:
+        ...
+
+    @abstractmethod
+    async def get(
+        self, user_id: int, session_id: UUID, session: AsyncSession
+    ) -> UserSessionsInDB | None:
+        ...
+
+    @abstractmethod
+    async def get_with_user(
+        self, user_id: int, session_id: UUID, session: AsyncSession
+    ) -> tuple[UserInDB, UserSessionsInDB] | None:
+        ...
+
+    @abstractmethod
+    async def get_many(
+        self, keys: Collection[tuple[int, UUID]], session: AsyncSession
+    ) -> Sequence[UserSessionsInDB]:
+        """Sessions by (user_id, session_id), missing ones are left out."""
+
+    @abstractmethod
+    async def get_by_user_id(
+        self, user_id: int, session: AsyncSession
+    ) -> Sequence[UserSessionsInDB]:
+        """Sessions of the user that have not expired yet."""
+
+    @abstractmethod
+    async def update_last_used(
+        self, last_used: LastUsed, session: AsyncSession
+    ) -> None:
+        ...
+
+    @abstractmethod
+    async def delete_expired(
+        self, before: datetime.datetime, limit: int, session: AsyncSession
+    ) -> int:
+        """Delete up to `limit` sessions expired before `before`."""
+
+    @abstractmethod
+    async def revoke(
+        self, user_id: int, session_ids: list[UUID], session: AsyncSession
+    ) -> Revoked:
+        """Delete the sessions, return the ones that existed."""
+
+    @abstractmethod
+    async def revoke_except(
+        self, user_id: int, except_id: UUID, session: AsyncSession
+    ) -> Revoked:
+        ...
+
+
+class PostgresSessionsBackend(SessionsBackend):
+    async def create_new(
+        self,
+        user_id: int,
+        session_id: UUID,
+        ip_address: str | None,
+        session: AsyncSession,
+    ) -> UserSessionsInDB:
+        time_now, expires_at = new_session_times()
+        stmt = (
+            insert(UserSessionsInDB)
+            .values(
+                user_id=user_id,
+                session_id=session_id,
+                last_used=time_now,
+                ip_address=ip_address,
+                expires_at=expires_at,
+            )
+            .returning(UserSessionsInDB)
+        )
+        # INSERT ... RETURNING, committed together with any pending writes
+        new_session = (await session.scalars(stmt)).one()
+        await session.commit()
+        return new_session
+
+    async def get(
+        self, user_id: int, session_id: UUID, session: AsyncSession
+    ) -> UserSessionsInDB | None:
+        stmt = (
+            select(UserSessionsInDB)
+            .where(UserSessionsInDB.user_id == user_id)
+            .where(UserSessionsInDB.session_id == session_id)
+            .limit(1)
+        )
+        result = await session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def get_with_user(
+        self, user_id: int, session_id: UUID, session: AsyncSession
+    ) -> tuple[UserInDB, UserSessionsInDB] | None:
+        stmt = (
+            select(UserSessionsInDB, UserInDB)
+            .join(UserInDB)
+            .where(UserSessionsInDB.user_id == user_id)
+            .where(UserSessionsInDB.session_id == session_id)
+            .limit(1)
+        )
+        result = await session.execute(stmt)
+        row = result.one_or_none()
+        if row is None:
+            return None
+        user_session, user = row
+        return user, user_session
+
+    async def get_many(
+        self, keys: Collection[tuple[int, UUID]], session: AsyncSession
+    ) -> Sequence[UserSessionsInDB]:
+        if not keys:
+            return []
+        # row-value IN, served by the (user_id, session_id) index
+        stmt = select(UserSessionsInDB).where(
+            tuple_(UserSessionsInDB.user_id, UserSessionsInDB.session_id).in_(
+                list(keys)
+            )
+        )
+        result = await session.scalars(stmt)
+        return result.all()
+
+    async def get_by_user_id(
+        self, user_id: int, session: AsyncSession
+    ) -> Sequence[UserSessionsInDB]:
+        stmt = (
+            select(UserSessionsInDB)
+            .where(UserSessionsInDB.user_id == user_id)
+            .where(UserSessionsInDB.expires_at >= datetime.datetime.now())
+        )
+        result = await session.execute(stmt)
+        return result.scalars().all()
+
+    async def update_last_used(
+        self, last_used: LastUsed, session: AsyncSession
+    ) -> None:
+        if session.get_bind().dialect.name == "postgresql":
+            # single UPDATE ... FROM (VALUES ...) for the whole batch
+            new_values = values(
+                column("user_id", Integer),
+                column("session_id", Uuid),
+                column("last_used", DateTime),
+                name="new_values",
+            ).data(
+                [
+                    (user_id, session_id, used_at)
+                    for (user_id, session_id), used_at in last_used.items()
+                ]
+            )
+            stmt = (
+                update(UserSessionsInDB)
+                .where(UserSessionsInDB.user_id == new_values.c.user_id)
+                .where(UserSessionsInDB.session_id == new_values.c.session_id)
+                .values(last_used=new_values.c.last_used)
+            )
+            await session.execute(stmt)
+        else:
+            stmt = (
+                update(UserSessionsInDB.__table__)  # type: ignore
+                .where(UserSessionsInDB.user_id == bindparam("b_user_id"))
+                .where(UserSessionsInDB.session_id == bindparam("b_session_id"))
+                .values(last_used=bindparam("b_last_used"))
+            )
+            await session.execute(
+                stmt,
+                [
+                    {
+                        "b_user_id": user_id,
+                        "b_session_id": session_id,
+                        "b_last_used": used_at,
+                    }
+                    for (user_id, session_id), used_at in last_used.items()
+                ],
+            )
+        await session.commit()
+
+    async def delete_expired(
+        self, before: datetime.datetime, limit: int, session: AsyncSession
+    ) -> int:
+        batch = (
+            select(UserSessionsInDB.id)
+            .where(UserSessionsInDB.expires_at < before)
+            .order_by(UserSessionsInDB.expires_at)
+            .limit(limit)
+            # concurrent reapers on other instances take different rows
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        result = await session.execute(
+            delete(UserSessionsInDB).where(UserSessionsInDB.id.in_(batch))
+        )
+        await session.commit()
+        return result.rowcount
+
+    async def revoke(
+        self, user_id: int, session_ids: list[UUID], session: AsyncSession
+    ) -> Revoked:
+        stmt = (
+            delete(UserSessionsInDB)
+            .where(UserSessionsInDB.user_id == user_id)
+            .where(UserSessionsInDB.session_id.in_(session_ids))
+            .returning(UserSessionsInDB.session_id, UserSessionsInDB.expires_at)
+        )
+        result = await session.execute(stmt)
+        revoked = dict(result.tuples().all())
+        await session.commit()
+        return revoked
+
+    async def revoke_except(
+        self, user_id: int, except_id: UUID, session: AsyncSession
+    ) -> Revoked:
+        stmt = (
+            delete(UserSessionsInDB)
+            .where(UserSessionsInDB.user_id == user_id)
+            .where(UserSessionsInDB.session_id != except_id)
+            .returning(UserSessionsInDB.session_id, UserSessionsInDB.expires_at)
+        )
+        result = await session.execute(stmt)
+        revoked = dict(result.tuples().all())
+        await session.commit()
+        return revoked
@@ -0,0 +1,176 @@
+import datetime
+import json
+import logging
+from collections.abc import Iterable
+from typing import Any
+from uuid import UUID
+
+from redis.asyncio.client import Pipeline
+from redis.exceptions import RedisError
+from sqlalchemy.orm import make_transient_to_detached
+
+from src.config import settings
+from src.redis_helper import redis_client
+from src.users.models import UserInDB
+
+from .models import UserSessionsInDB
+
+logger = logging.getLogger(__name__)
+
+
+def _cache_key(user_id: int) -> str:
+    return f"user_sessions_cache_{user_id}"
+
+
+def _version_key(user_id: int) -> str:
+    return f"user_sessions_cache_version_{user_id}"
+
+
+# stores a snapshot unless the user's sessions were invalidated since the
+# version was read
+STORE_SNAPSHOT = """
+if (tonumber(redis.call('GET', KEYS[2])) or 0) ~= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('HSET', KEYS[1], ARGV[2], ARGV[3])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return 1
+"""
+
+store_snapshot_script = redis_client.register_script(STORE_SNAPSHOT)
+
+
+def _dump_snapshot(user: UserInDB, user_session: UserSessionsInDB) -> str:
+    expires = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(
+        seconds=settings.USER_SESSION_CACHE_TTL_SECONDS
+    )
+    snapshot = {
+        "user": [
+            user.username,
+            user.email,
+            user.email_verified,
+            user.created_at.isoformat(),
+            user.active,
+        ],
+        "session": [
+            user_session.id,
+            user_session.last_used.isoformat(),
+            user_session.ip_address,
+            user_session.expires_at.isoformat(),
+        ],
+        "exp": expires.timestamp(),
+    }
+    return json.dumps(snapshot, separators=(",", ":"))
+
+
+def _load_snapshot(
+    raw: bytes, user_id: int, session_id: UUID
+) -> tuple[UserInDB, UserSessionsInDB] | None:
+    snapshot: dict[str, Any] = json.loads(raw)
+    if snapshot["exp"] < datetime.datetime.now(datetime.timezone.utc).timestamp():
+        return None
+    username, email, email_verified, created_at, active = snapshot["user"]
+    session_pk, last_used, ip_address, expires_at = snapshot["session"]
+    user = UserInDB(
+        id=user_id,
+        username=username,
+        email=email,
+        email_verified=email_verified,
+        created_at=datetime.datetime.fromisoformat(created_at),
+        active=active,
+    )
+    user_session = UserSessionsInDB(
+        id=session_pk,
+        user_id=user_id,
+        session_id=session_id,
+        last_used=datetime.datetime.fromisoformat(last_used),
+        ip_address=ip_address,
+        expires_at=datetime.datetime.fromisoformat(expires_at),
+    )
+    # behave like rows loaded from the database, not pending inserts
+    make_transient_to_detached(user)
+    make_transient_to_detached(user_session)
+    return user, user_session
+
+
+class UserSessionCache:
+    """
+    Read-through cache for the user + session lookup done on every
+    user-token request.
+
+    Snapshots live in one Redis hash per user (field per session id), so
+    a single session or every session of a user can be dropped at once.
+    Invalidations also bump a per-user version, and a snapshot read from
+    the database is only stored if the version is still the one read
+    before, so a lookup racing a revoke cannot cache the revoked session.
+    Redis errors are treated as cache misses.
+    """
+
+    @staticmethod
+    async def get(
+        user_id: int, session_id: UUID
+    ) -> tuple[tuple[UserInDB, UserSessionsInDB] | None, int | None]:
+        """Return the cached snapshot, if any, and the version to `set` with."""
+        if settings.USER_SESSION_CACHE_TTL_SECONDS <= 0:
+            return None, None
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.hget(_cache_key(user_id), session_id.hex)
+                pipe.get(_version_key(user_id))
+                raw, version = await pipe.execute()
+        except RedisError:
+            logger.warning("User session cache is unavailable", exc_info=True)
+            return None, None
+        version = int(version or 0)
+        if raw is None:
+            return None, version
+        return _load_snapshot(raw, user_id=user_id, session_id=session_id), version
+
+    @staticmethod
+    async def set(
+        user: UserInDB, user_session: UserSessionsInDB, version: int | None
+    ) -> None:
+        if settings.USER_SESSION_CACHE_TTL_SECONDS <= 0 or version is None:
+            return
+        try:
+            await store_snapshot_script(
+                keys=[_cache_key(user.id), _version_key(user.id)],
+                args=[
+                    version,
+                    user_session.session_id.hex,
+                    _dump_snapshot(user, user_session),
+                    settings.USER_SESSION_CACHE_TTL_SECONDS,
+                ],
+            )
+        except RedisError:
+            logger.warning("User session cache is unavailable", exc_info=True)
+
+    @staticmethod
+    async def invalidate_sessions(user_id: int, session_ids: Iterable[UUID]) -> None:
+        fields = [session_id.hex for session_id in session_ids]
+        if not fields:
+            return
+        try:
+            async with redis_client.pipeline(transaction=True) as pipe:
+                UserSessionCache._bump_version(pipe, user_id)
+                pipe.hdel(_cache_key(user_id), *fields)
+                await pipe.execute()
+        except RedisError:
+            logger.exception("Failed to invalidate cached user sessions")
+
+    @staticmethod
+    async def invalidate_user(user_id: int) -> None:
+        try:
+            async with redis_client.pipeline(transaction=True) as pipe:
+                UserSessionCache._bump_version(pipe, user_id)
+                pipe.delete(_cache_key(user_id))
+                await pipe.execute()
+        except RedisError:
+            logger.exception("Failed to invalidate cached user sessions")
+
+    @staticmethod
+    def _bump_version(pipe: Pipeline, user_id: int) -> None:
+        key = _version_key(user_id)
+        pipe.incr(key)
+        # outlives the lookups that may have read the previous version
+        pipe.expire(key, max(settings.USER_SESSION_CACHE_TTL_SECONDS, 1))
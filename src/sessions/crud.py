@@ -1,12 +1,27 @@
 import datetime
-from collections.abc import Sequence
+import logging
+from collections.abc import Collection, Sequence
 from uuid import UUID
 
-from sqlalchemy import delete, select
+from redis.exceptions import RedisError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.auth.revocation import token_revocation
 from src.config import settings
+from src.sessions.cache import UserSessionCache
 from src.sessions.models import UserSessionsInDB
+from src.users.models import UserInDB
+
+from .backends import LastUsed, PostgresSessionsBackend, Revoked, SessionsBackend
+from .redis_backend import RedisSessionsBackend
+
+logger = logging.getLogger(__name__)
+
+sessions_backend: SessionsBackend = (
+    RedisSessionsBackend()
+    if settings.SESSIONS_BACKEND == "redis"
+    else PostgresSessionsBackend()
+)
 
 
 class SessionsDB:
@@ -17,18 +32,12 @@ class SessionsDB:
         ip_address: str | None,
         session: AsyncSession,
     ) -> UserSessionsInDB:
-        time_now = datetime.datetime.now()
-        new_session = UserSessionsInDB(
+        return await sessions_backend.create_new(
             user_id=user_id,
             session_id=session_id,
-            last_used=time_now,
             ip_address=ip_address,
-            expires_at=time_now
-            + datetime.timedelta(hours=settings.USER_TOKEN_EXPIRE_HOURS),
+            session=session,
         )
-        session.add(new_session)
-        await session.commit()
-        return new_session
 
     @staticmethod
     async def get(
@@ -36,40 +45,62 @@ class SessionsDB:
         session_id: str,
         session: AsyncSession,
     ) -> UserSessionsInDB | None:
-        stmt = (
-            select(UserSessionsInDB)
-            .where(UserSessionsInDB.user_id == user_id)
-            .where(UserSessionsInDB.session_id == UUID(hex=session_id))
-            .limit(1)
+        return await sessions_backend.get(
+            user_id=user_id, session_id=UUID(hex=session_id), session=session
         )
-        result = await session.execute(stmt)
-        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def get_with_user(
+        user_id: int,
+        session_id: UUID,
+        session: AsyncSession,
+    ) -> tuple[UserInDB, UserSessionsInDB] | None:
+        return await sessions_backend.get_with_user(
+            user_id=user_id, session_id=session_id, session=session
+        )
+
+    @staticmethod
+    async def get_many(
+        keys: Collection[tuple[int, UUID]],
+        session: AsyncSession,
+    ) -> Sequence[UserSessionsInDB]:
+        return await sessions_backend.get_many(keys=keys, session=session)
 
     @staticmethod
     async def update_last_used(
-        user_session: UserSessionsInDB,
+        last_used: LastUsed,
         session: AsyncSession,
     ) -> None:
-        user_session.last_used = datetime.datetime.now()
-        session.add(user_session)
-        await session.commit()
+        await sessions_backend.update_last_used(last_used=last_used, session=session)
 
     @staticmethod
     async def get_by_user_id(
         user_id: int,
         session: AsyncSession,
     ) -> Sequence[UserSessionsInDB]:
-        stmt = select(UserSessionsInDB).where(UserSessionsInDB.user_id == user_id)
-        result = await session.execute(stmt)
-        return result.scalars().all()
+        return await sessions_backend.get_by_user_id(user_id=user_id, session=session)
+
+    @staticmethod
+    async def delete_expired(
+        before: datetime.datetime,
+        limit: int,
+        session: AsyncSession,
+    ) -> int:
+        """Delete up to `limit` sessions expired before `before`."""
+        return await sessions_backend.delete_expired(
+            before=before, limit=limit, session=session
+        )
 
     @staticmethod
     async def revoke(
         user_session: UserSessionsInDB,
         session: AsyncSession,
     ) -> None:
-        await session.delete(user_session)
-        await session.commit()
+        await SessionsDB.revoke_by_ids(
+            user_id=user_session.user_id,
+            session_ids=[user_session.session_id],
+            session=session,
+        )
 
     @staticmethod
     async def revoke_by_id(
@@ -77,13 +108,9 @@ class SessionsDB:
         session_id: UUID,
         session: AsyncSession,
     ) -> None:
-        stmt = (
-            delete(UserSessionsInDB)
-            .where(UserSessionsInDB.user_id == user_id)
-            .where(UserSessionsInDB.session_id == session_id)
+        await SessionsDB.revoke_by_ids(
+            user_id=user_id, session_ids=[session_id], session=session
         )
-        await session.execute(stmt)
-        await session.commit()
 
     @staticmethod
     async def revoke_by_ids(
@@ -91,13 +118,13 @@ class SessionsDB:
         session_ids: list[UUID],
         session: AsyncSession,
     ) -> None:
-        stmt = (
-            delete(UserSessionsInDB)
-            .where(UserSessionsInDB.user_id == user_id)
-            .where(UserSessionsInDB.session_id.in_(session_ids))
+        revoked = await sessions_backend.revoke(
+            user_id=user_id, session_ids=session_ids, session=session
+        )
+        await UserSessionCache.invalidate_sessions(
+            user_id=user_id, session_ids=session_ids
         )
-        await session.execute(stmt)
-        await session.commit()
+        await SessionsDB._add_to_revocation_list(revoked)
 
     @staticmethod
     async def revoke_except(
@@ -105,10 +132,17 @@ class SessionsDB:
         except_id: UUID,
         session: AsyncSession,
     ) -> None:
-        stmt = (
-            delete(UserSessionsInDB)
-            .where(UserSessionsInDB.user_id == user_id)
-            .where(UserSessionsInDB.session_id != except_id)
+        revoked = await sessions_backend.revoke_except(
+            user_id=user_id, except_id=except_id, session=session
         )
-        await session.execute(stmt)
-        await session.commit()
+        await UserSessionCache.invalidate_user(user_id)
+        await SessionsDB._add_to_revocation_list(revoked)
+
+    @staticmethod
+    async def _add_to_revocation_list(revoked: Revoked) -> None:
+        # a user token expires with its session, the sessions are gone from
+        # the backend anyway and the list only rejects their tokens early
+        try:
+            await token_revocation.revoke(revoked)
+        except RedisError:
+            logger.exception("Failed to add revoked sessions to the revocation list")
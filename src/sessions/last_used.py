@@ -0,0 +1,96 @@
+import asyncio
+import contextlib
+import datetime
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm.attributes import set_committed_value
+
+from src.config import settings
+from src.database import db_helper
+
+from .backends import LastUsed
+from .crud import SessionsDB
+from .models import UserSessionsInDB
+
+logger = logging.getLogger(__name__)
+
+
+class LastUsedWriter:
+    """
+    Write-behind buffer for `UserSessionsInDB.last_used`.
+
+    Bumps are coalesced per session in memory and written in bulk
+    every `flush_interval` seconds, or earlier once `max_pending` sessions
+    are waiting.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        flush_interval: float,
+        max_pending: int,
+    ) -> None:
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: LastUsed = {}
+        self._flush_requested = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def touch(self, user_session: UserSessionsInDB) -> None:
+        time_now = datetime.datetime.now()
+        # keep the loaded object fresh without marking it dirty
+        set_committed_value(user_session, "last_used", time_now)  # type: ignore
+        self._pending[user_session.user_id, user_session.session_id] = time_now
+        if len(self._pending) >= self.max_pending:
+            self._flush_requested.set()
+
+    async def flush(self) -> int:
+        if not self._pending:
+            return 0
+        batch, self._pending = self._pending, {}
+        try:
+            async with self.session_factory() as session:
+                await SessionsDB.update_last_used(last_used=batch, session=session)
+        except Exception:
+            # newer bumps collected in the meantime win over the failed batch
+            for key, used_at in batch.items():
+                self._pending.setdefault(key, used_at)
+            raise
+        return len(batch)
+
+    async def _run(self) -> None:
+        while True:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(
+                    self._flush_requested.wait(), timeout=self.flush_interval
+                )
+            self._flush_requested.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Failed to flush last_used updates")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        await self.flush()
+
+
+last_used_writer = LastUsedWriter(
+    session_factory=db_helper.session_factory,
+    flush_interval=settings.SESSION_LAST_USED_FLUSH_SECONDS,
+    max_pending=settings.SESSION_LAST_USED_MAX_PENDING,
+)
@@ -1,7 +1,7 @@
 import datetime
 from uuid import UUID
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.models import Base
@@ -9,13 +9,25 @@ from src.models import Base
 
 class UserSessionsInDB(Base):
     __tablename__ = "user_sessions"
+    __table_args__ = (
+        Index(
+            "ix_user_sessions_user_id_session_id",
+            "user_id",
+            "session_id",
+            # unique indexes of a partitioned table have to contain its
+            # partition key, session ids are random uuids either way
+            "expires_at",
+            unique=True,
+            # the session check is answered from the index alone
+            postgresql_include=["id", "last_used", "ip_address"],
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(
         ForeignKey("users.id", ondelete="CASCADE"),
-        index=True,
     )
     session_id: Mapped[UUID]
     last_used: Mapped[datetime.datetime]
     ip_address: Mapped[str | None] = mapped_column(nullable=True)
-    expires_at: Mapped[datetime.datetime]
+    expires_at: Mapped[datetime.datetime] = mapped_column(index=True)
@@ -0,0 +1,85 @@
+"""
+Monthly range partitions of `user_sessions` by `expires_at` (postgres only).
+
+A partition holds the sessions expiring in one calendar month, once the month
+is over every row in it has expired and the whole table is dropped.
+"""
+
+import datetime
+from collections.abc import Iterator
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+TABLE = "user_sessions"
+
+
+def month_start(moment: datetime.datetime) -> datetime.date:
+    return datetime.date(moment.year, moment.month, 1)
+
+
+def next_month(month: datetime.date) -> datetime.date:
+    return datetime.date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def months(first: datetime.date, last: datetime.date) -> Iterator[datetime.date]:
+    month = first
+    while month <= last:
+        yield month
+        month = next_month(month)
+
+
+def partition_name(month: datetime.date) -> str:
+    return f"{TABLE}_y{month.year}m{month.month:02d}"
+
+
+def create_partition_sql(month: datetime.date) -> str:
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} "
+        f"PARTITION OF {TABLE} "
+        f"FOR VALUES FROM ('{month.isoformat()}') "
+        f"TO ('{next_month(month).isoformat()}')"
+    )
+
+
+async def is_partitioned(conn: AsyncConnection) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    result = await conn.execute(
+        text(
+            "SELECT 1 FROM pg_partitioned_table "
+            "JOIN pg_class ON pg_partitioned_table.partrelid = pg_class.oid "
+            "WHERE pg_class.relname = :table"
+        ),
+        {"table": TABLE},
+    )
+    return result.first() is not None
+
+
+async def list_partitions(conn: AsyncConnection) -> list[str]:
+    result = await conn.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON pg_inherits.inhparent = parent.oid "
+            "JOIN pg_class child ON pg_inherits.inhrelid = child.oid "
+            "WHERE parent.relname = :table"
+        ),
+        {"table": TABLE},
+    )
+    return list(result.scalars())
+
+
+async def ensure_partitions(conn: AsyncConnection, until: datetime.datetime) -> None:
+    """Create the partitions new sessions can expire into, up to `until`."""
+    now = datetime.datetime.now()
+    for month in months(month_start(now), month_start(until)):
+        await conn.execute(text(create_partition_sql(month)))
+
+
+async def drop_expired_partitions(conn: AsyncConnection) -> list[str]:
+    current = partition_name(month_start(datetime.datetime.now()))
+    # names sort chronologically, older months only hold expired sessions
+    expired = [name for name in await list_partitions(conn) if name < current]
+    for name in expired:
+        await conn.execute(text(f"DROP TABLE {name}"))
+    return expired
@@ -0,0 +1,115 @@
+import asyncio
+import contextlib
+import datetime
+import logging
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.config import settings
+from src.database import db_helper
+from src.metrics import metrics
+
+from . import partitions
+from .crud import SessionsDB
+
+logger = logging.getLogger(__name__)
+
+
+class SessionReaper:
+    """
+    Deletes expired user sessions in the background.
+
+    Rows are deleted in batches of `batch_size`, each in its own short
+    transaction, so a large backlog never holds locks for long. When
+    `user_sessions` is partitioned, expired monthly partitions are dropped
+    whole and the upcoming ones are created first. Whether it is, is read
+    from the database on every run.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        interval: float,
+        batch_size: int,
+    ) -> None:
+        self.session_factory = session_factory
+        self.interval = interval
+        self.batch_size = batch_size
+        self.deleted = 0
+        self.dropped_partitions = 0
+        self.last_run: datetime.datetime | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    async def maintain_partitions(self) -> None:
+        # sessions created now may expire as late as this
+        until = datetime.datetime.now() + datetime.timedelta(
+            hours=settings.USER_TOKEN_EXPIRE_HOURS, days=31
+        )
+        async with self.session_factory() as session:
+            conn = await session.connection()
+            if not await partitions.is_partitioned(conn):
+                return
+            await partitions.ensure_partitions(conn, until=until)
+            dropped = await partitions.drop_expired_partitions(conn)
+            await session.commit()
+        if dropped:
+            logger.info("Dropped expired session partitions: %s", ", ".join(dropped))
+        self.dropped_partitions += len(dropped)
+
+    async def reap(self) -> int:
+        """Delete every session that has expired so far."""
+        try:
+            await self.maintain_partitions()
+        except Exception:
+            # rows are still deleted one batch at a time below
+            logger.exception("Failed to maintain session partitions")
+        now = datetime.datetime.now()
+        deleted = 0
+        while True:
+            async with self.session_factory() as session:
+                batch = await SessionsDB.delete_expired(
+                    before=now, limit=self.batch_size, session=session
+                )
+            deleted += batch
+            self.deleted += batch
+            if batch < self.batch_size:
+                break
+            # let requests waiting for a connection go first
+            await asyncio.sleep(0)
+        self.last_run = now
+        return deleted
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.reap()
+            except Exception:
+                logger.exception("Failed to delete expired sessions")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "deleted": self.deleted,
+            "dropped_partitions": self.dropped_partitions,
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+        }
+
+
+session_reaper = SessionReaper(
+    session_factory=db_helper.session_factory,
+    interval=settings.SESSION_REAPER_INTERVAL_SECONDS,
+    batch_size=settings.SESSION_REAPER_BATCH_SIZE,
+)
+metrics.register("session_reaper", session_reaper.stats)
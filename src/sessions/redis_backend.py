@@ -0,0 +1,220 @@
+import datetime
+from collections.abc import Collection, Sequence
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from src.redis_helper import redis_client
+from src.users.models import UserInDB
+
+from .backends import LastUsed, Revoked, SessionsBackend, new_session_times
+from .models import UserSessionsInDB
+
+# KEYS: session hash, user's sorted set, user's id sequence
+# ARGV: last_used, ip_address, expires_at, expires_at (unix), now (unix), session_id
+CREATE_SESSION = """
+local id = redis.call('INCR', KEYS[3])
+redis.call('HSET', KEYS[1], 'id', id, 'last_used', ARGV[1],
+           'ip_address', ARGV[2], 'expires_at', ARGV[3])
+redis.call('EXPIREAT', KEYS[1], ARGV[4])
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', ARGV[5])
+redis.call('ZADD', KEYS[2], ARGV[4], ARGV[6])
+local latest = redis.call('ZRANGE', KEYS[2], -1, -1, 'WITHSCORES')[2]
+redis.call('EXPIREAT', KEYS[2], latest)
+redis.call('EXPIREAT', KEYS[3], latest)
+return id
+"""
+
+# KEYS: session hash; ARGV: last_used
+# an expired session must not come back as a hash without a TTL
+TOUCH_SESSION = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('HSET', KEYS[1], 'last_used', ARGV[1])
+end
+"""
+
+create_session_script = redis_client.register_script(CREATE_SESSION)
+touch_session_script = redis_client.register_script(TOUCH_SESSION)
+
+
+# the {user_id} hash tag keeps all keys of a user in one cluster slot
+def _user_key(user_id: int) -> str:
+    return f"user_sessions:{{{user_id}}}"
+
+
+def _seq_key(user_id: int) -> str:
+    return f"user_sessions:{{{user_id}}}:seq"
+
+
+def _session_prefix(user_id: int) -> str:
+    return f"user_session:{{{user_id}}}:"
+
+
+def _session_key(user_id: int, session_id: UUID) -> str:
+    return _session_prefix(user_id) + session_id.hex
+
+
+def _load_session(
+    fields: dict[bytes, bytes], user_id: int, session_id: UUID
+) -> UserSessionsInDB | None:
+    if not fields:
+        return None
+    user_session = UserSessionsInDB(
+        id=int(fields[b"id"]),
+        user_id=user_id,
+        session_id=session_id,
+        last_used=datetime.datetime.fromisoformat(fields[b"last_used"].decode()),
+        ip_address=fields[b"ip_address"].decode() or None,
+        expires_at=datetime.datetime.fromisoformat(fields[b"expires_at"].decode()),
+    )
+    # behave like rows loaded from the database, not pending inserts
+    make_transient_to_detached(user_session)
+    return user_session
+
+
+class RedisSessionsBackend(SessionsBackend):
+    """
+    User sessions in Redis.
+
+    A hash per session expires on its own with the session, a sorted set
+    per user scored by expiry lists them. Nothing is left for the reaper.
+    """
+
+    async def create_new(
+        self,
+        user_id: int,
+        session_id: UUID,
+        ip_address: str | None,
+        session: AsyncSession,
+    ) -> UserSessionsInDB:
+        time_now, expires_at = new_session_times()
+        session_pk = await create_session_script(
+            keys=[
+                _session_key(user_id, session_id),
+                _user_key(user_id),
+                _seq_key(user_id),
+            ],
+            args=[
+                time_now.isoformat(),
+                ip_address or "",
+                expires_at.isoformat(),
+                int(expires_at.timestamp()),
+                int(time_now.timestamp()),
+                session_id.hex,
+            ],
+        )
+        user_session = UserSessionsInDB(
+            id=int(session_pk),
+            user_id=user_id,
+            session_id=session_id,
+            last_used=time_now,
+            ip_address=ip_address,
+            expires_at=expires_at,
+        )
+        make_transient_to_detached(user_session)
+        return user_session
+
+    async def get(
+        self, user_id: int, session_id: UUID, session: AsyncSession
+    ) -> UserSessionsInDB | None:
+        fields = await redis_client.hgetall(_session_key(user_id, session_id))  # type: ignore[misc]
+        return _load_session(fields, user_id=user_id, session_id=session_id)
+
+    async def get_with_user(
+        self, user_id: int, session_id: UUID, session: AsyncSession
+    ) -> tuple[UserInDB, UserSessionsInDB] | None:
+        user_session = await self.get(user_id, session_id, session)
+        if user_session is None:
+            return None
+        user = await session.get(UserInDB, ident=user_id)
+        if user is None:
+            return None
+        return user, user_session
+
+    async def get_many(
+        self, keys: Collection[tuple[int, UUID]], session: AsyncSession
+    ) -> Sequence[UserSessionsInDB]:
+        keys = list(keys)
+        if not keys:
+            return []
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for user_id, session_id in keys:
+                pipe.hgetall(_session_key(user_id, session_id))
+            results: list[dict[bytes, bytes]] = await pipe.execute()
+        user_sessions = []
+        for (user_id, session_id), fields in zip(keys, results, strict=True):
+            user_session = _load_session(fields, user_id, session_id)
+            if user_session is not None:
+                user_sessions.append(user_session)
+        return user_sessions
+
+    async def get_by_user_id(
+        self, user_id: int, session: AsyncSession
+    ) -> Sequence[UserSessionsInDB]:
+        now = int(datetime.datetime.now().timestamp())
+        members = await redis_client.zrangebyscore(_user_key(user_id), now, "+inf")
+        session_ids = [UUID(hex=member.decode()) for member in members]
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for session_id in session_ids:
+                pipe.hgetall(_session_key(user_id, session_id))
+            results: list[dict[bytes, bytes]] = await pipe.execute()
+        user_sessions = []
+        for session_id, fields in zip(session_ids, results, strict=True):
+            user_session = _load_session(fields, user_id, session_id)
+            if user_session is not None:
+                user_sessions.append(user_session)
+        return user_sessions
+
+    async def update_last_used(
+        self, last_used: LastUsed, session: AsyncSession
+    ) -> None:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for (user_id, session_id), used_at in last_used.items():
+                await touch_session_script(
+                    keys=[_session_key(user_id, session_id)],
+                    args=[used_at.isoformat()],
+                    client=pipe,
+                )
+            await pipe.execute()
+
+    async def delete_expired(
+        self, before: datetime.datetime, limit: int, session: AsyncSession
+    ) -> int:
+        # hashes expire by themselves, sorted sets are trimmed on insert
+        return 0
+
+    async def revoke(
+        self, user_id: int, session_ids: list[UUID], session: AsyncSession
+    ) -> Revoked:
+        if not session_ids:
+            return {}
+        members = [session_id.hex for session_id in session_ids]
+        async with redis_client.pipeline(transaction=True) as pipe:
+            # scores are the expires_at, read before the members are removed
+            pipe.zmscore(_user_key(user_id), members)
+            pipe.delete(
+                *(_session_key(user_id, session_id) for session_id in session_ids)
+            )
+            pipe.zrem(_user_key(user_id), *members)
+            scores, *_ = await pipe.execute()
+        return {
+            session_id: datetime.datetime.fromtimestamp(score)
+            for session_id, score in zip(session_ids, scores, strict=True)
+            if score is not None
+        }
+
+    async def revoke_except(
+        self, user_id: int, except_id: UUID, session: AsyncSession
+    ) -> Revoked:
+        # the sessions are listed first, so the deletion is given every key
+        # it touches; sessions created in between are not revoked
+        members = await redis_client.zrange(_user_key(user_id), 0, -1)
+        session_ids = [
+            UUID(hex=member.decode())
+            for member in members
+            if member.decode() != except_id.hex
+        ]
+        return await self.revoke(
+            user_id=user_id, session_ids=session_ids, session=session
+        )
@@ -1,10 +1,14 @@
-import datetime
 from typing import Any
 from uuid import UUID
 
 from fastapi import APIRouter, status
 
-from src.dependencies import DbSession, UserAuthorization, UserAuthorizationWithSession
+from src.dependencies import (
+    DbReadSession,
+    DbSession,
+    UserAuthorization,
+    UserAuthorizationWithSession,
+)
 
 from .crud import SessionsDB
 from .schemas import SessionSchema, UserSessions
@@ -15,25 +19,12 @@ router = APIRouter()
 @router.get("/", response_model=UserSessions)
 async def get_my_sessions(
     user: UserAuthorization,
-    session: DbSession,
+    session: DbReadSession,
 ) -> UserSessions:
     user_sessions = await SessionsDB.get_by_user_id(
         user_id=user.id,
         session=session,
     )
-    time_now = datetime.datetime.now()
-
-    expired_ids = [
-        user_session.session_id
-        for user_session in user_sessions
-        if user_session.expires_at < time_now
-    ]
-    if expired_ids:
-        await SessionsDB.revoke_by_ids(
-            user_id=user.id,
-            session_ids=expired_ids,
-            session=session,
-        )
     session_schemas = [
         SessionSchema(
             session_id=user_session.session_id,
@@ -42,7 +33,6 @@ async def get_my_sessions(
             expires_at=user_session.expires_at,
         )
         for user_session in user_sessions
-        if user_session.expires_at >= time_now
     ]
     return UserSessions(
         user_sessions=session_schemas,
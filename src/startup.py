@@ -0,0 +1,183 @@
+import asyncio
+import contextlib
+import logging
+import time
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Any
+
+from fastapi import APIRouter, Response, status
+from sqlalchemy.engine import Connection
+
+from src import mongo_helper
+from src.apps.cache import app_cache
+from src.apps.registry import AppsRegistry
+from src.auth.revocation import token_revocation
+from src.config import settings
+from src.database import db_helper
+from src.keys.manager import key_manager
+from src.metrics import metrics
+from src.oauth2.denylist import oauth2_denylist
+from src.redis_helper import redis_helper
+from src.utils import ServerTiming
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_DIR = Path(__file__).resolve().parent.parent / "alembic"
+
+
+# alembic (with mako) takes longer to import than the rest of the app, it
+# is only imported for the check on boot
+
+
+def alembic_heads() -> set[str]:
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    config = Config()
+    config.set_main_option("script_location", str(ALEMBIC_DIR))
+    return set(ScriptDirectory.from_config(config).get_heads())
+
+
+def _current_heads(conn: Connection) -> set[str]:
+    from alembic.runtime.migration import MigrationContext
+
+    return set(MigrationContext.configure(conn).get_current_heads())
+
+
+class Startup:
+    """
+    Boot sequence of a worker, timed per phase.
+
+    The schema check and the signing keys load before the app is served;
+    the check replaces creating tables on boot, migrations are applied with
+    `alembic upgrade head`. The warm-up then runs in the background: pooled
+    connections are opened and apps preloaded while `/ping` already
+    answers, and `/ready` reports 503 until it is done.
+    """
+
+    def __init__(
+        self,
+        require_schema_head: bool,
+        warm_connections: int,
+        preload_apps: int,
+        phase_timeout: float,
+    ) -> None:
+        self.require_schema_head = require_schema_head
+        self.warm_connections = warm_connections
+        self.preload_apps = preload_apps
+        self.phase_timeout = phase_timeout
+        self.timing = ServerTiming()
+        self.ready = False
+        self._started = time.perf_counter()
+        self._task: asyncio.Task[None] | None = None
+
+    @contextlib.asynccontextmanager
+    async def _phase(self, name: str) -> AsyncIterator[None]:
+        with self.timing.measure(name):
+            async with asyncio.timeout(self.phase_timeout):
+                yield
+        logger.info("Startup phase %s took %.3fs", name, self.timing.stages[name])
+
+    async def check_schema(self) -> None:
+        async with self._phase("schema"):
+            async with db_helper.engine.connect() as conn:
+                # the scripts are read while the database answers
+                current, expected = await asyncio.gather(
+                    conn.run_sync(_current_heads), asyncio.to_thread(alembic_heads)
+                )
+        if current != expected:
+            message = (
+                f"Database schema is at {sorted(current) or 'no revision'}, "
+                f"expected the Alembic head {sorted(expected)}"
+            )
+            if self.require_schema_head:
+                raise RuntimeError(message)
+            logger.warning(message)
+
+    async def load_keys(self) -> None:
+        """
+        Load what every token is checked against, before the app is served.
+
+        Signing fails without the keys and the denylist mirror would let
+        tokens of denied users through, so neither is left to the warm-up.
+        """
+        async with self._phase("keys"):
+            keys = [key_manager.start()]
+            if settings.STATELESS_ACCESS_TOKENS:
+                keys.append(oauth2_denylist.start())
+            await asyncio.gather(*keys)
+
+    async def _load_apps(self) -> None:
+        if app_cache.maxsize <= 0:
+            return
+        app_cache.start()
+        # apps loaded before the listener subscribed would be cleared by it
+        await app_cache.subscribed.wait()
+        loaded = await AppsRegistry.preload(
+            limit=min(self.preload_apps, app_cache.maxsize)
+        )
+        logger.info("Preloaded %s apps", loaded)
+
+    async def _load_revocations(self) -> None:
+        token_revocation.start()
+        # until then every revocation check asks Redis
+        await token_revocation.synced.wait()
+
+    async def warm_up(self) -> None:
+        async with self._phase("connections"):
+            await asyncio.gather(
+                db_helper.warm_up(self.warm_connections),
+                redis_helper.warm_up(self.warm_connections),
+                mongo_helper.warm_up(self.warm_connections),
+            )
+        async with self._phase("caches"):
+            await asyncio.gather(self._load_apps(), self._load_revocations())
+        self.timing.stages["ready"] = time.perf_counter() - self._started
+        self.ready = True
+        logger.info("Ready after %.3fs", self.timing.stages["ready"])
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.warm_up()
+                return
+            except Exception:
+                logger.exception("Startup warm-up failed, retrying")
+                await asyncio.sleep(1)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        self.ready = False
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "phases": dict(self.timing.stages),
+        }
+
+
+startup = Startup(
+    require_schema_head=settings.STARTUP_REQUIRE_SCHEMA_HEAD,
+    warm_connections=settings.STARTUP_WARM_CONNECTIONS,
+    preload_apps=settings.STARTUP_PRELOAD_APPS,
+    phase_timeout=settings.STARTUP_PHASE_TIMEOUT_SECONDS,
+)
+metrics.register("startup", startup.stats)
+
+router = APIRouter(tags=["health"])
+
+
+@router.get("/ready", include_in_schema=False)
+async def get_ready(response: Response) -> dict[str, Any]:
+    if not startup.ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return startup.stats()
@@ -1,10 +1,14 @@
 import datetime
+from collections.abc import Collection, Sequence
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import case, func, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.auth.utils import hash_password
+from src.oauth2.denylist import oauth2_denylist
+from src.sessions.cache import UserSessionCache
+from src.sessions.crud import SessionsDB
 from src.sessions.models import UserSessionsInDB
 from src.users.models import UserInDB
 
@@ -19,7 +23,7 @@ class UsersDB:
     ) -> UserInDB:
         new_user = UserInDB(
             username=username,
-            hashed_password=hash_password(password),
+            hashed_password=await hash_password(password),
             email=email,
             created_at=datetime.datetime.now(),
         )
@@ -31,26 +35,36 @@ class UsersDB:
     async def get_by_id(id: int, session: AsyncSession) -> UserInDB | None:
         return await session.get(UserInDB, ident=id)
 
+    @staticmethod
+    async def get_by_ids(
+        ids: Collection[int], session: AsyncSession
+    ) -> Sequence[UserInDB]:
+        if not ids:
+            return []
+        result = await session.scalars(select(UserInDB).where(UserInDB.id.in_(ids)))
+        return result.all()
+
     @staticmethod
     async def get_with_session(
         user_id: int,
         session_id: UUID,
         session: AsyncSession,
     ) -> tuple[UserInDB | None, UserSessionsInDB | None]:
-        stmt = (
-            select(UserSessionsInDB, UserInDB)
-            .join(UserInDB)
-            .where(UserSessionsInDB.user_id == user_id)
-            .where(UserSessionsInDB.session_id == session_id)
-            .limit(1)
+        cached, version = await UserSessionCache.get(
+            user_id=user_id, session_id=session_id
         )
-        result = await session.execute(stmt)
-        row = result.one_or_none()
-        if row:
-            user_session, user = row
-            return user, user_session
-        else:
+        if cached:
+            return cached
+        row = await SessionsDB.get_with_user(
+            user_id=user_id, session_id=session_id, session=session
+        )
+        if row is None:
             return None, None
+        user, user_session = row
+        await UserSessionCache.set(
+            user=user, user_session=user_session, version=version
+        )
+        return user, user_session
 
     @staticmethod
     async def get_by_email(email: str, session: AsyncSession) -> UserInDB | None:
@@ -64,6 +78,32 @@ class UsersDB:
         result = await session.execute(stmt)
         return result.scalar_one_or_none()
 
+    @staticmethod
+    async def get_by_login(login: str, session: AsyncSession) -> UserInDB | None:
+        """Case-insensitive lookup by username or email in one indexed query."""
+        lowered = login.lower()
+        stmt = (
+            select(UserInDB)
+            .where(
+                or_(
+                    func.lower(UserInDB.username) == lowered,
+                    func.lower(UserInDB.email) == lowered,
+                )
+            )
+            # the unique indexes are case-sensitive, an exact match wins over
+            # users whose login differs only in case
+            .order_by(
+                case(
+                    (or_(UserInDB.username == login, UserInDB.email == login), 0),
+                    else_=1,
+                ),
+                UserInDB.id,
+            )
+            .limit(1)
+        )
+        result = await session.execute(stmt)
+        return result.scalar_one_or_none()
+
     @staticmethod
     async def get_by_email_or_username(
         username: str, email: str, session: AsyncSession
@@ -81,8 +121,23 @@ class UsersDB:
     async def update_password(
         user: UserInDB, new_password: str, session: AsyncSession
     ) -> None:
-        user.hashed_password = hash_password(new_password)
+        user.hashed_password = await hash_password(new_password)
         await session.commit()
+        await UserSessionCache.invalidate_user(user.id)
+        await oauth2_denylist.revoke_user_tokens(user.id)
+
+    @staticmethod
+    async def rehash_password(
+        user: UserInDB, password: str, session: AsyncSession
+    ) -> None:
+        """Store the password with the current hasher, the caller commits."""
+        user.hashed_password = await hash_password(password)
+        stmt = (
+            update(UserInDB)
+            .where(UserInDB.id == user.id)
+            .values(hashed_password=user.hashed_password)
+        )
+        await session.execute(stmt)
 
     @staticmethod
     async def verify_email(
@@ -91,3 +146,14 @@ class UsersDB:
     ) -> None:
         user.email_verified = True
         await session.commit()
+        await UserSessionCache.invalidate_user(user.id)
+
+    @staticmethod
+    async def deactivate(
+        user: UserInDB,
+        session: AsyncSession,
+    ) -> None:
+        user.active = False
+        await session.commit()
+        await UserSessionCache.invalidate_user(user.id)
+        await oauth2_denylist.deny_user(user.id)
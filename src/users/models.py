@@ -1,5 +1,6 @@
 import datetime
 
+from sqlalchemy import Index, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.models import Base
@@ -15,3 +16,8 @@ class UserInDB(Base):
     hashed_password: Mapped[bytes]
     created_at: Mapped[datetime.datetime]
     active: Mapped[bool] = mapped_column(default=True)
+
+
+# login looks users up case-insensitively by either column
+Index("ix_users_lower_username", func.lower(UserInDB.username))
+Index("ix_users_lower_email", func.lower(UserInDB.email))
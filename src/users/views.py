@@ -3,7 +3,7 @@ from typing import Any
 from fastapi import APIRouter
 from pydantic import PositiveInt
 
-from src.dependencies import DbSession, UserAuthorization
+from src.dependencies import DbReadSession, UserProfileAuthorization
 
 from .crud import UsersDB
 from .exceptions import UserNotFound
@@ -13,12 +13,12 @@ router = APIRouter(tags=["users"])
 
 
 @router.get("/me", response_model=UserSchema)
-async def get_me(user: UserAuthorization) -> Any:
+async def get_me(user: UserProfileAuthorization) -> Any:
     return user
 
 
 @router.get("/{user_id}", response_model=UserSchema)
-async def get_user(user_id: PositiveInt, session: DbSession) -> Any:
+async def get_user(user_id: PositiveInt, session: DbReadSession) -> Any:
     found_user = await UsersDB.get_by_id(id=user_id, session=session)
     if not found_user:
         raise UserNotFound()
@@ -1,4 +1,7 @@
+import contextlib
 import json
+import time
+from collections.abc import Iterator
 from typing import Any
 from uuid import UUID
 
@@ -8,3 +11,24 @@ class UUIDEncoder(json.JSONEncoder):
         if isinstance(obj, UUID):
             return obj.hex
         return super().default(obj)
+
+
+class ServerTiming:
+    """Durations of request stages, rendered as a Server-Timing header."""
+
+    def __init__(self) -> None:
+        self.stages: dict[str, float] = {}
+
+    @contextlib.contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = time.perf_counter() - started
+
+    def header(self) -> str:
+        return ", ".join(
+            f"{name};dur={duration * 1000:.2f}"
+            for name, duration in self.stages.items()
+        )
@@ -5,6 +5,8 @@ from uuid import UUID
 
 import pytest
 
+from src.apps.cache import app_cache
+
 TEST_APP_CLIENT_ID = "30219807-9f3f-4da1-bd25-ef0f7abefa1a"
 TEST_APP_CLIENT_SECRET = "5d8b84a1-3e18-41d5-8c05-2d77254b21e7"
 TEST_APP_NAME = "Test app"
@@ -46,7 +48,8 @@ async def mock_find_one_and_update(filter, data, return_document):
 @pytest.fixture(autouse=True, scope="function")
 async def mock_mongodb(mocker):
     mock = AsyncMock()
-    mocker.patch("src.apps.views.app_collection", mock)
+    mocker.patch("src.apps.registry.app_collection", mock)
+    app_cache.clear()
     return mock
 
 
@@ -0,0 +1,47 @@
+from unittest.mock import AsyncMock
+from uuid import UUID
+
+from src.apps.cache import INVALIDATION_CHANNEL, app_cache
+from src.apps.registry import AppsRegistry
+from tests.app_tests.conftest import (
+    TEST_APP,
+    TEST_APP_CLIENT_ID,
+    mock_find_one,
+    mock_find_one_and_update,
+)
+
+
+async def test_get_by_client_id_is_cached(mock_mongodb):
+    mock_mongodb.find_one.side_effect = mock_find_one
+    client_id = UUID(TEST_APP_CLIENT_ID)
+
+    app = await AppsRegistry.get_by_client_id(client_id)
+    assert await AppsRegistry.get_by_client_id(client_id) is app
+    assert mock_mongodb.find_one.call_count == 1
+    assert app.redirect_uris == frozenset(TEST_APP["redirect_uris"])
+    assert app.scopes == tuple(TEST_APP["scopes"])
+
+
+async def test_update_invalidates_cached_app(mock_mongodb, mocker):
+    redis = mocker.patch("src.apps.cache.redis_client", AsyncMock())
+    mock_mongodb.find_one.side_effect = mock_find_one
+    mock_mongodb.find_one_and_update.side_effect = mock_find_one_and_update
+    client_id = UUID(TEST_APP_CLIENT_ID)
+    await AppsRegistry.get_by_client_id(client_id)
+
+    await AppsRegistry.update(TEST_APP["_id"], {"redirect_uris": []})
+    redis.publish.assert_called_once_with(INVALIDATION_CHANNEL, client_id.hex)
+    await AppsRegistry.get_by_client_id(client_id)
+    assert mock_mongodb.find_one.call_count == 2
+
+
+async def test_lookup_racing_an_eviction_is_not_stored(mock_mongodb):
+    client_id = UUID(TEST_APP_CLIENT_ID)
+
+    async def evicting_find_one(query):
+        app_cache.evict(client_id)
+        return TEST_APP
+
+    mock_mongodb.find_one.side_effect = evicting_find_one
+    await AppsRegistry.get_by_client_id(client_id)
+    assert app_cache.get(client_id) is None
@@ -9,7 +9,7 @@ from tests.app_tests.conftest import (
 async def test_create_app(async_client, mock_mongodb, authorized_header):
     mock_mongodb.insert_one.side_effect = None
     response = await async_client.post(
-        "/app/",
+        "/apps/",
         json={
             "name": TEST_APP_NAME,
             "redirect_uris": TEST_APP_REDIRECT_URIS,
@@ -8,9 +8,9 @@ from tests.app_tests.conftest import (
 
 async def test_regenerate_app_secret(async_client, mock_mongodb, authorized_header):
     mock_mongodb.find_one.side_effect = mock_find_one
-    mock_mongodb.update_one.side_effect = None
+    mock_mongodb.find_one_and_update.side_effect = mock_find_one_and_update
     response = await async_client.put(
-        f"/app/{TEST_APP['_id']}/regenerate-client-secret/",
+        f"/apps/{TEST_APP['_id']}/regenerate-client-secret/",
         headers={"Authorization": authorized_header},
     )
     json_response = response.json()
@@ -23,7 +23,7 @@ async def test_update_app(async_client, mock_mongodb, authorized_header):
     mock_mongodb.find_one.side_effect = mock_find_one
     mock_mongodb.find_one_and_update.side_effect = mock_find_one_and_update
     response = await async_client.patch(
-        f"/app/{TEST_APP['_id']}/",
+        f"/apps/{TEST_APP['_id']}/",
         json={
             "name": "Updated name",
             "description": "Updated description",
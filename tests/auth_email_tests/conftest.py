@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
@@ -39,16 +40,21 @@ async def prepare_test_recovery_pass_user(async_client):
 
 @pytest.fixture(scope="function")
 async def mock_send_email(mocker):
-    mock_SMTP = MagicMock()
-    mocker.patch("src.emails.utils.smtplib.SMTP_SSL", new=mock_SMTP)
-    return mock_SMTP
+    mock = AsyncMock()
+    mocker.patch("src.emails.utils.EmailQueue.enqueue", new=mock)
+    return mock
 
 
 @pytest.fixture(scope="function")
 async def mock_redis_client(mocker):
-    mock = AsyncMock()
-    mocker.patch("src.emails.main.redis_client", new=mock)
-    return mock
+    pipe = MagicMock()
+
+    @asynccontextmanager
+    async def pipeline(transaction=True):
+        yield pipe
+
+    mocker.patch("src.emails.utils.redis_helper.pipeline", new=pipeline)
+    return pipe
 
 
 @pytest.fixture(scope="function")
@@ -61,5 +67,5 @@ async def mock_get_user_from_db_by_email(mocker):
 @pytest.fixture(scope="function")
 async def mock_redis_client_in_dep(mocker):
     mock = AsyncMock()
-    mocker.patch("src.emails.dependencies.redis_client", new=mock)
+    mocker.patch("src.emails.dependencies.redis_helper", new=mock)
     return mock
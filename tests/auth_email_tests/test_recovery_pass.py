@@ -46,10 +46,11 @@ async def test_forgot_password(
 async def test_reset_password_success(async_client, mock_redis_client_in_dep):
     TEST_JTI = uuid4()
 
-    async def mock_redis_get(key):
-        if key == f"reset_password_token_id_{TEST_RECOVERY_PASS_EMAIL}":
-            return TEST_JTI.bytes
-        return None
+    async def mock_compare_and_delete(key, expected):
+        return (
+            key == f"reset_password_token_id_{TEST_RECOVERY_PASS_EMAIL}"
+            and expected == TEST_JTI.bytes
+        )
 
     token_for_recovery_password = gen_email_token(
         EmailTokenPayload(
@@ -60,7 +61,7 @@ async def test_reset_password_success(async_client, mock_redis_client_in_dep):
         )
     )
 
-    mock_redis_client_in_dep.get.side_effect = mock_redis_get
+    mock_redis_client_in_dep.compare_and_delete.side_effect = mock_compare_and_delete
     response = await async_client.post(
         "/auth/reset/",
         json={
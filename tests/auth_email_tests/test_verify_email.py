@@ -15,12 +15,13 @@ async def test_verify_email_success(
 ):
     VERIFY_JTI = uuid4()
 
-    async def mock_redis_get(key):
-        if key == f"verify_email_token_id_{TEST_EMAIL_USER_EMAIL}":
-            return VERIFY_JTI.bytes
-        return None
+    async def mock_compare_and_delete(key, expected):
+        return (
+            key == f"verify_email_token_id_{TEST_EMAIL_USER_EMAIL}"
+            and expected == VERIFY_JTI.bytes
+        )
 
-    mock_redis_client_in_dep.get.side_effect = mock_redis_get
+    mock_redis_client_in_dep.compare_and_delete.side_effect = mock_compare_and_delete
     token_for_verify_email = gen_email_token(
         EmailTokenPayload(
             sub=TEST_EMAIL_USER_EMAIL,
@@ -1,3 +1,9 @@
+from unittest.mock import AsyncMock
+
+from src.auth.schemas import UserTokenSchema
+from src.config import settings
+from src.database import db_helper
+from src.users.crud import UsersDB
 from tests.conftest import TEST_USER_EMAIL, TEST_USER_PASSWORD, TEST_USER_USERNAME
 
 
@@ -35,3 +41,71 @@ async def test_login_failed(async_client):
     )
     assert response.status_code == 403, response.json()
     assert response.json() == {"detail": "Invalid username or password"}
+
+
+async def test_login_is_case_insensitive(async_client):
+    response = await async_client.post(
+        "/auth/login/",
+        json={
+            "login": TEST_USER_EMAIL.upper(),
+            "password": TEST_USER_PASSWORD,
+        },
+    )
+    assert response.status_code == 200, response.json()
+    assert "Server-Timing" not in response.headers
+
+
+async def test_login_server_timing(async_client, mocker):
+    mocker.patch.object(settings, "LOGIN_SERVER_TIMING", True)
+    response = await async_client.post(
+        "/auth/login/",
+        json={"login": TEST_USER_EMAIL, "password": TEST_USER_PASSWORD},
+    )
+    assert response.status_code == 200, response.json()
+    stages = [
+        stage.split(";")[0] for stage in response.headers["Server-Timing"].split(", ")
+    ]
+    assert stages == ["lookup", "verify", "session"]
+
+
+async def test_login_prefers_exact_match(async_client):
+    # registered after TEST_USER_USERNAME, differs only in case
+    response = await async_client.post(
+        "/auth/register/",
+        json={
+            "username": TEST_USER_USERNAME.capitalize(),
+            "password": "Other@123",
+            "email": "other.johndoe@example.com",
+        },
+    )
+    assert response.status_code == 201, response.json()
+
+    for username, password in [
+        (TEST_USER_USERNAME, TEST_USER_PASSWORD),
+        (TEST_USER_USERNAME.capitalize(), "Other@123"),
+    ]:
+        response = await async_client.post(
+            "/auth/login/", json={"login": username, "password": password}
+        )
+        assert response.status_code == 200, response.json()
+
+
+async def test_rehash_is_committed_without_database_sessions(async_client, mocker):
+    # as with SESSIONS_BACKEND=redis, creating the session commits nothing
+    mocker.patch(
+        "src.auth.views.create_new_session",
+        AsyncMock(return_value=UserTokenSchema(user_id=1, token="token")),
+    )
+    mocker.patch("src.auth.views.password_needs_rehash", return_value=True)
+    async with db_helper.session_factory() as session:
+        before = await UsersDB.get_by_username(TEST_USER_USERNAME, session=session)
+
+    response = await async_client.post(
+        "/auth/login/",
+        json={"login": TEST_USER_USERNAME, "password": TEST_USER_PASSWORD},
+    )
+
+    assert response.status_code == 200, response.json()
+    async with db_helper.session_factory() as session:
+        after = await UsersDB.get_by_username(TEST_USER_USERNAME, session=session)
+    assert after.hashed_password != before.hashed_password
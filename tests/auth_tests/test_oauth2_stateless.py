@@ -0,0 +1,138 @@
+import datetime
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.config import settings
+from src.database import db_helper
+from src.oauth2.denylist import oauth2_denylist
+from src.oauth2.schemas import OAuth2AccessTokenPayload
+from src.oauth2.utils import gen_access_token
+from src.users.crud import UsersDB
+from tests.conftest import TEST_USER_PASSWORD, TEST_USER_USERNAME
+
+
+@pytest.fixture(scope="function")
+async def test_user_id(async_client):
+    response = await async_client.post(
+        "/auth/login/",
+        json={
+            "login": TEST_USER_USERNAME,
+            "password": TEST_USER_PASSWORD,
+        },
+    )
+    return response.json()["user_id"]
+
+
+@pytest.fixture(scope="function")
+async def stateless_mode(mocker, test_user_id):
+    mocker.patch.object(settings, "STATELESS_ACCESS_TOKENS", True)
+    mocker.patch("src.oauth2.denylist.redis_client", AsyncMock())
+    yield
+    await oauth2_denylist.allow_user(test_user_id)
+
+
+def oauth2_header(user_id: int, issued_at: datetime.datetime) -> str:
+    token = gen_access_token(
+        OAuth2AccessTokenPayload(sub=str(user_id), scopes=[], iat=issued_at)
+    )
+    return f"Bearer {token}"
+
+
+async def test_stateless_token_skips_users_table(
+    async_client, mocker, stateless_mode, test_user_id
+):
+    get_by_id = mocker.patch("src.auth.dependencies.UsersDB.get_by_id")
+    response = await async_client.get(
+        "/auth/sessions/",
+        headers={
+            "Authorization": oauth2_header(
+                test_user_id, datetime.datetime.now(datetime.timezone.utc)
+            )
+        },
+    )
+    assert response.status_code == 200, response.json()
+    assert get_by_id.call_count == 0
+
+
+async def test_stateless_token_loads_profile_on_demand(
+    async_client, stateless_mode, test_user_id
+):
+    response = await async_client.get(
+        "/users/me",
+        headers={
+            "Authorization": oauth2_header(
+                test_user_id, datetime.datetime.now(datetime.timezone.utc)
+            )
+        },
+    )
+    assert response.status_code == 200, response.json()
+    assert response.json()["username"] == TEST_USER_USERNAME
+
+
+async def test_revoked_tokens_are_denied(async_client, stateless_mode, test_user_id):
+    issued_at = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(
+        seconds=10
+    )
+    await oauth2_denylist.revoke_user_tokens(test_user_id)
+
+    response = await async_client.get(
+        "/auth/sessions/",
+        headers={"Authorization": oauth2_header(test_user_id, issued_at)},
+    )
+    assert response.status_code == 403, response.json()
+    assert response.json() == {"detail": "Invalid token"}
+
+    # a token issued right after the revocation
+    response = await async_client.get(
+        "/auth/sessions/",
+        headers={
+            "Authorization": oauth2_header(
+                test_user_id, datetime.datetime.now(datetime.timezone.utc)
+            )
+        },
+    )
+    assert response.status_code == 200, response.json()
+
+
+async def test_password_reset_revokes_tokens(
+    async_client, stateless_mode, test_user_id
+):
+    issued_at = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(
+        seconds=10
+    )
+    async with db_helper.session_factory() as session:
+        user = await UsersDB.get_by_id(test_user_id, session=session)
+        await UsersDB.update_password(
+            user=user, new_password=TEST_USER_PASSWORD, session=session
+        )
+
+    response = await async_client.get(
+        "/auth/sessions/",
+        headers={"Authorization": oauth2_header(test_user_id, issued_at)},
+    )
+    assert response.status_code == 403, response.json()
+
+
+async def test_denied_user_is_rejected(async_client, stateless_mode, test_user_id):
+    await oauth2_denylist.deny_user(test_user_id)
+    response = await async_client.get(
+        "/auth/sessions/",
+        headers={
+            "Authorization": oauth2_header(
+                test_user_id, datetime.datetime.now(datetime.timezone.utc)
+            )
+        },
+    )
+    assert response.status_code == 403, response.json()
+
+
+async def test_sync_drops_expired_entries(mocker):
+    redis = AsyncMock()
+    redis.hgetall.return_value = {b"1": b"inf", b"2": b"0.0"}
+    mocker.patch("src.oauth2.denylist.redis_client", redis)
+    await oauth2_denylist.sync()
+    assert oauth2_denylist.is_denied(1, issued_at=None)
+    assert not oauth2_denylist.is_denied(2, issued_at=None)
+    redis.hdel.assert_called_once_with("oauth2_denylist", "2")
+    await oauth2_denylist.allow_user(1)
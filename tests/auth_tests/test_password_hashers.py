@@ -0,0 +1,73 @@
+import bcrypt
+from sqlalchemy import select, update
+
+from src.auth.hashers import Argon2idHasher, BcryptHasher, HasherRegistry
+from src.database import db_helper
+from src.users.models import UserInDB
+from tests.conftest import TEST_USER_PASSWORD, TEST_USER_USERNAME
+
+
+def make_registry(default: str, rounds: int = 4) -> HasherRegistry:
+    return HasherRegistry(
+        hashers=[
+            BcryptHasher(rounds=rounds),
+            Argon2idHasher(time_cost=1, memory_cost=1024, parallelism=1),
+        ],
+        default=default,
+    )
+
+
+def test_verifies_hashes_of_every_scheme():
+    bcrypt_hash = make_registry("bcrypt").hash("password")
+    argon2_hash = make_registry("argon2id").hash("password")
+    assert bcrypt_hash.startswith(b"$2b$04$")
+    assert argon2_hash.startswith(b"$argon2id$")
+
+    registry = make_registry("argon2id")
+    for hashed_password in (bcrypt_hash, argon2_hash):
+        assert registry.verify("password", hashed_password)
+        assert not registry.verify("wrong", hashed_password)
+    assert not registry.verify("password", b"plain")
+
+
+def test_needs_rehash():
+    bcrypt_hash = make_registry("bcrypt").hash("password")
+    assert not make_registry("bcrypt").needs_rehash(bcrypt_hash)
+    assert make_registry("bcrypt", rounds=5).needs_rehash(bcrypt_hash)
+    assert make_registry("argon2id").needs_rehash(bcrypt_hash)
+
+    argon2_hash = make_registry("argon2id").hash("password")
+    assert not make_registry("argon2id").needs_rehash(argon2_hash)
+    stronger = HasherRegistry(
+        hashers=[Argon2idHasher(time_cost=2, memory_cost=1024, parallelism=1)],
+        default="argon2id",
+    )
+    assert stronger.needs_rehash(argon2_hash)
+
+
+async def test_login_upgrades_stale_hash(async_client):
+    stale_hash = bcrypt.hashpw(TEST_USER_PASSWORD.encode(), bcrypt.gensalt(4))
+    async with db_helper.session_factory() as session:
+        await session.execute(
+            update(UserInDB)
+            .where(UserInDB.username == TEST_USER_USERNAME)
+            .values(hashed_password=stale_hash)
+        )
+        await session.commit()
+
+    response = await async_client.post(
+        "/auth/login/",
+        json={
+            "login": TEST_USER_USERNAME,
+            "password": TEST_USER_PASSWORD,
+        },
+    )
+    assert response.status_code == 200, response.json()
+
+    async with db_helper.session_factory() as session:
+        hashed_password = await session.scalar(
+            select(UserInDB.hashed_password).where(
+                UserInDB.username == TEST_USER_USERNAME
+            )
+        )
+    assert hashed_password.startswith(b"$argon2id$")
@@ -0,0 +1,63 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.auth.exceptions import HashingOverloaded
+from src.auth.hashing import HashingExecutor
+from tests.conftest import TEST_USER_PASSWORD, TEST_USER_USERNAME
+
+
+async def test_rejects_when_queue_is_full():
+    executor = HashingExecutor(workers=1, max_queue=1, use_processes=False)
+    release = threading.Event()
+    blocked = [
+        asyncio.create_task(executor.run(release.wait)),
+        asyncio.create_task(executor.run(release.wait)),
+    ]
+    await asyncio.sleep(0)
+
+    with pytest.raises(HashingOverloaded):
+        await executor.run(release.wait)
+
+    release.set()
+    await asyncio.gather(*blocked)
+    executor.shutdown()
+    stats = executor.stats()
+    assert stats["completed"] == 2
+    assert stats["rejected"] == 1
+    assert stats["in_flight"] == 0
+    assert stats["wait_seconds_max"] > 0
+
+
+async def test_login_reports_hashing_metrics(async_client, metrics_header):
+    response = await async_client.post(
+        "/auth/login/",
+        json={
+            "login": TEST_USER_USERNAME,
+            "password": TEST_USER_PASSWORD,
+        },
+    )
+    assert response.status_code == 200, response.json()
+
+    response = await async_client.get("/metrics", headers=metrics_header)
+    assert response.status_code == 200
+    stats = response.json()["password_hashing"]
+    assert stats["completed"] >= 1
+    assert stats["hash_seconds_total"] > 0
+
+
+async def test_login_returns_429_when_saturated(async_client, mocker):
+    mocker.patch(
+        "src.auth.utils.hashing_executor",
+        HashingExecutor(workers=0, max_queue=0, use_processes=False),
+    )
+    response = await async_client.post(
+        "/auth/login/",
+        json={
+            "login": TEST_USER_USERNAME,
+            "password": TEST_USER_PASSWORD,
+        },
+    )
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "1"
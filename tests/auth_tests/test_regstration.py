@@ -1,3 +1,5 @@
+import asyncio
+
 from tests.conftest import TEST_USER_EMAIL, TEST_USER_PASSWORD, TEST_USER_USERNAME
 
 
@@ -5,14 +7,45 @@ async def test_register_email_taken(async_client, mocker):
     response = await async_client.post(
         "/auth/register/",
         json={
-            "username": TEST_USER_USERNAME,
+            "username": "another_johndoe",
             "password": TEST_USER_PASSWORD,
             "email": TEST_USER_EMAIL,
         },
     )
 
-    assert response.status_code == 400, response.json()
+    assert response.status_code == 409, response.json()
+
+    assert response.json() == {"detail": "User with this email already exists"}
+
+
+async def test_register_username_taken(async_client):
+    response = await async_client.post(
+        "/auth/register/",
+        json={
+            "username": TEST_USER_USERNAME,
+            "password": TEST_USER_PASSWORD,
+            "email": "another_johndoe@example.com",
+        },
+    )
+
+    assert response.status_code == 409, response.json()
+    assert response.json() == {"detail": "User with this username already exists"}
+
+
+async def test_concurrent_registrations_with_same_username(async_client):
+    responses = await asyncio.gather(
+        *(
+            async_client.post(
+                "/auth/register/",
+                json={
+                    "username": "janedoe",
+                    "password": TEST_USER_PASSWORD,
+                    "email": f"janedoe{i}@example.com",
+                },
+            )
+            for i in range(5)
+        )
+    )
 
-    assert response.json() == {
-        "detail": "User with this username or email already exists"
-    }
+    codes = sorted(response.status_code for response in responses)
+    assert codes == [201, 409, 409, 409, 409]
@@ -0,0 +1,60 @@
+import datetime
+import time
+import uuid
+
+import pytest
+
+from src.auth.dependencies import decode_payload
+from src.auth.exceptions import InvalidToken
+from src.auth.schemas import UserTokenPayload
+from src.auth.token_cache import TokenCache, token_cache
+from src.auth.utils import create_user_token
+
+
+@pytest.fixture(scope="function")
+def clean_token_cache():
+    token_cache.clear()
+    yield token_cache
+    token_cache.clear()
+
+
+def test_decode_payload_is_cached(mocker, clean_token_cache):
+    token = create_user_token(UserTokenPayload(sub=1, jti=uuid.uuid4())).token
+    store = mocker.spy(token_cache, "set")
+
+    first = decode_payload(token)
+    hits = token_cache.hits
+    second = decode_payload(token)
+
+    assert first is second
+    assert token_cache.hits == hits + 1
+    assert store.call_count == 1
+
+
+def test_invalid_tokens_are_not_cached(clean_token_cache):
+    for _ in range(2):
+        with pytest.raises(InvalidToken):
+            decode_payload("not-a-token")
+    assert token_cache.stats()["size"] == 0
+
+
+def test_entries_expire_with_the_token():
+    cache = TokenCache(maxsize=10)
+    payload = UserTokenPayload(
+        sub=1,
+        jti=uuid.uuid4(),
+        exp=datetime.datetime.now(datetime.timezone.utc)
+        + datetime.timedelta(seconds=1),
+    )
+    cache.set("token", payload)
+    assert cache.get("token") is payload
+
+    time.sleep(1.1)
+    assert cache.get("token") is None
+    assert cache.stats() == {"size": 0, "maxsize": 10, "hits": 1, "misses": 1}
+
+
+def test_disabled_cache():
+    cache = TokenCache(maxsize=0)
+    cache.set("token", UserTokenPayload(sub=1, jti=uuid.uuid4()))
+    assert cache.get("token") is None
@@ -0,0 +1,120 @@
+import datetime
+from unittest.mock import AsyncMock
+from uuid import UUID, uuid4
+
+from redis.exceptions import ConnectionError
+
+from src.auth.revocation import BloomFilter, TokenRevocationList
+from tests.sessions_tests.test_last_used import login
+
+
+def in_an_hour():
+    return datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(hours=1)
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    added = [uuid4() for _ in range(1000)]
+    for jti in added:
+        bloom.add(jti)
+
+    assert all(jti in bloom for jti in added)
+    false_positives = sum(uuid4() in bloom for _ in range(10_000))
+    assert false_positives < 300
+
+
+async def test_unrevoked_tokens_skip_redis_once_synced(fake_redis):
+    revocation = TokenRevocationList(
+        capacity=1000, error_rate=0.001, rebuild_interval=60
+    )
+    assert await revocation.is_revoked(uuid4()) is False
+    # the filter may be incomplete before it is synced
+    assert fake_redis.round_trips == 1
+
+    revocation.synced.set()
+    for _ in range(100):
+        assert await revocation.is_revoked(uuid4()) is False
+    assert fake_redis.round_trips == 1
+
+
+async def test_revoked_tokens_are_checked_in_redis(fake_redis):
+    revocation = TokenRevocationList(
+        capacity=1000, error_rate=0.001, rebuild_interval=60
+    )
+    revocation.synced.set()
+    jti = uuid4()
+
+    await revocation.revoke({jti: in_an_hour()})
+
+    assert fake_redis.published == [jti.bytes]
+    assert 3590 < fake_redis.keys[f"revoked_jti:{jti.hex}"] <= 3600
+    assert await revocation.is_revoked(jti) is True
+    assert await revocation.filter_revoked([jti, uuid4()]) == {jti}
+
+
+async def test_redis_errors_fail_closed_for_sole_records(mocker):
+    redis = AsyncMock()
+    redis.exists.side_effect = ConnectionError()
+    mocker.patch("src.auth.revocation.redis_client", redis)
+    revocation = TokenRevocationList(
+        capacity=1000, error_rate=0.001, rebuild_interval=60, fail_closed=True
+    )
+    jti = uuid4()
+
+    assert await revocation.is_revoked(jti, sole_record=True) is True
+    # the sessions table still rejects revoked user tokens
+    assert await revocation.is_revoked(jti) is False
+
+    revocation.fail_closed = False
+    assert await revocation.is_revoked(jti, sole_record=True) is False
+
+
+async def test_expired_tokens_are_not_recorded(fake_redis):
+    revocation = TokenRevocationList(
+        capacity=1000, error_rate=0.001, rebuild_interval=60
+    )
+    expired = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(
+        seconds=1
+    )
+    await revocation.revoke({uuid4(): expired})
+    assert fake_redis.keys == {}
+
+
+async def test_rebuild_forgets_expired_ids(fake_redis):
+    revocation = TokenRevocationList(
+        capacity=1000, error_rate=0.001, rebuild_interval=60
+    )
+    expired, revoked = uuid4(), uuid4()
+    await revocation.revoke({expired: in_an_hour(), revoked: in_an_hour()})
+    del fake_redis.keys[f"revoked_jti:{expired.hex}"]
+
+    await revocation.rebuild()
+
+    assert revocation.stats()["size"] == 1
+    assert await revocation.filter_revoked([revoked]) == {revoked}
+
+
+async def test_only_deleted_sessions_are_revoked(async_client, mocker):
+    revoke = mocker.patch(
+        "src.sessions.crud.token_revocation.revoke", AsyncMock(return_value=None)
+    )
+    current, other = await login(async_client), await login(async_client)
+    response = await async_client.get(
+        "/auth/sessions/current/", headers={"Authorization": other}
+    )
+    other_session = response.json()
+
+    response = await async_client.delete(
+        f"/auth/sessions/{uuid4()}/", headers={"Authorization": current}
+    )
+    assert response.status_code == 204
+    revoke.assert_awaited_once_with({})
+
+    response = await async_client.delete(
+        "/auth/sessions/logout-others/", headers={"Authorization": current}
+    )
+    assert response.status_code == 204
+    (revoked,) = revoke.await_args.args
+    assert revoked[
+        UUID(other_session["session_id"])
+    ] == datetime.datetime.fromisoformat(other_session["expires_at"])
@@ -1,6 +1,7 @@
 import pytest
 from httpx import AsyncClient
 
+from src.config import settings
 from src.database import db_helper
 from src.main import app
 from src.models import Base
@@ -34,6 +35,12 @@ async def async_client():
         yield ac
 
 
+@pytest.fixture(scope="function")
+def metrics_header(mocker):
+    mocker.patch.object(settings, "METRICS_TOKEN", "metrics-token")
+    return {"Authorization": "Bearer metrics-token"}
+
+
 @pytest.fixture(scope="function")
 async def authorized_header(async_client):
     response = await async_client.post(
@@ -45,3 +52,56 @@ async def authorized_header(async_client):
     )
     token = response.json()["token"]
     return f"Bearer {token}"
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return None
+
+    def set(self, key, value, ex):
+        self.commands.append(lambda: self.redis.set(key, value, ex))
+
+    def publish(self, channel, message):
+        self.commands.append(lambda: self.redis.published.append(message))
+
+    def exists(self, key):
+        self.commands.append(lambda: int(key in self.redis.keys))
+
+    async def execute(self):
+        self.redis.round_trips += 1
+        return [command() for command in self.commands]
+
+
+class FakeRedis:
+    def __init__(self):
+        self.keys = {}
+        self.published = []
+        self.round_trips = 0
+
+    def set(self, key, value, ex):
+        self.keys[key] = ex
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def exists(self, key):
+        self.round_trips += 1
+        return int(key in self.keys)
+
+    async def scan_iter(self, match, count):
+        for key in list(self.keys):
+            yield key.encode()
+
+
+@pytest.fixture(scope="function")
+def fake_redis(mocker):
+    redis = FakeRedis()
+    mocker.patch("src.auth.revocation.redis_client", redis)
+    return redis
@@ -0,0 +1,36 @@
+import asyncio
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.database import InstrumentedPool
+
+
+async def test_instrumented_pool_records_waits(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedPool,
+        pool_size=1,
+        max_overflow=0,
+    )
+
+    async def query() -> None:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            await asyncio.sleep(0.05)
+
+    await asyncio.gather(query(), query())
+    pool = engine.pool
+    await engine.dispose()
+
+    stats = pool.wait_stats()
+    assert stats["checkouts"] == 2
+    assert stats["timeouts"] == 0
+    # the second checkout waited for the first connection to be returned
+    assert stats["wait_seconds_max"] >= 0.04
+
+
+async def test_metrics_endpoint_reports_pool(async_client, metrics_header):
+    response = await async_client.get("/metrics", headers=metrics_header)
+    assert response.status_code == 200
+    assert "pool" in response.json()["db_pool"]
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+
+from src.database import DatabaseHelper
+
+
+async def create_db(engine, name: str) -> None:
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE node (name TEXT)"))
+        await conn.execute(text("INSERT INTO node VALUES (:name)"), {"name": name})
+
+
+async def read_node(db_helper: DatabaseHelper) -> str:
+    async with db_helper.read_session_factory() as session:
+        return await session.scalar(text("SELECT name FROM node").columns())
+
+
+@pytest.fixture(scope="function")
+async def db_helper(tmp_path):
+    helper = DatabaseHelper(
+        url=f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}",
+        echo=False,
+        replica_urls=[
+            f"sqlite+aiosqlite:///{tmp_path / 'replica_1.db'}",
+            f"sqlite+aiosqlite:///{tmp_path / 'replica_2.db'}",
+        ],
+    )
+    await create_db(helper.engine, "primary")
+    for i, replica in enumerate(helper.replicas, start=1):
+        await create_db(replica, f"replica_{i}")
+    yield helper
+    for engine in [helper.engine, *helper.replicas]:
+        await engine.dispose()
+
+
+async def test_reads_are_spread_over_replicas(db_helper):
+    names = {await read_node(db_helper) for _ in range(4)}
+    assert names == {"replica_1", "replica_2"}
+
+
+async def test_reads_after_commit_stay_on_primary(db_helper):
+    async def request() -> tuple[str, str]:
+        before = await read_node(db_helper)
+        async with db_helper.session_factory() as session:
+            await session.execute(text("UPDATE node SET name = 'written'"))
+            await session.commit()
+        return before, await read_node(db_helper)
+
+    assert await asyncio.create_task(request()) == ("replica_1", "written")
+    # the next request is routed to replicas again
+    assert await asyncio.create_task(read_node(db_helper)) == "replica_2"
+
+
+async def test_unhealthy_replicas_are_skipped(db_helper, tmp_path):
+    broken = DatabaseHelper(
+        url=str(db_helper.engine.url),
+        echo=False,
+        replica_urls=[f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica.db'}"],
+    )
+    await broken.check_replicas()
+    assert broken.healthy_replicas == []
+    assert await read_node(broken) == "primary"
+    assert broken.pool_stats()["healthy_replicas"] == 0
+    await broken.engine.dispose()
@@ -1,17 +1,55 @@
+import socket
+from contextlib import asynccontextmanager
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
+from aiosmtpd.controller import Controller
 
 
 @pytest.fixture(scope="function")
 async def mock_send_email(mocker):
-    mock_SMTP = MagicMock()
-    mocker.patch("src.emails.utils.smtplib.SMTP_SSL", new=mock_SMTP)
-    return mock_SMTP
+    mock = AsyncMock()
+    mocker.patch("src.emails.utils.EmailQueue.enqueue", new=mock)
+    return mock
 
 
 @pytest.fixture(scope="function")
 async def mock_redis_client(mocker):
-    mock = AsyncMock()
-    mocker.patch("src.emails.main.redis_client", new=mock)
-    return mock
+    pipe = MagicMock()
+
+    @asynccontextmanager
+    async def pipeline(transaction=True):
+        yield pipe
+
+    mocker.patch("src.emails.utils.redis_helper.pipeline", new=pipeline)
+    return pipe
+
+
+class RecordingHandler:
+    def __init__(self):
+        self.messages = []
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith("rejected"):
+            return "550 Mailbox unavailable"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append((session.peer, envelope.rcpt_tos))
+        return "250 OK"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(scope="function")
+def smtp_server():
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    yield controller, handler
+    controller.stop()
@@ -10,9 +10,8 @@ from src.emails.schemas import EmailTokenPayload
 from src.emails.token_utils import gen_email_token
 
 
-async def test_check_token_valid_token():
-    jti = uuid4()
-    token = gen_email_token(
+def email_token(jti):
+    return gen_email_token(
         payload=EmailTokenPayload(
             sub="valid_sub",
             typ="email",
@@ -20,24 +19,22 @@ async def test_check_token_valid_token():
             exp=datetime.datetime.now(datetime.UTC) + datetime.timedelta(seconds=60),
         )
     )
-    with patch("src.emails.dependencies.redis_client") as mock_redis_client:
-        mock_redis_client.get = AsyncMock(return_value=jti.bytes)
-        result = await check_token(token, "key_prefix")
+
+
+async def test_check_token_valid_token():
+    jti = uuid4()
+    with patch("src.emails.dependencies.redis_helper") as mock_redis_helper:
+        mock_redis_helper.compare_and_delete = AsyncMock(return_value=True)
+        result = await check_token(email_token(jti), "key_prefix")
 
     assert result == "valid_sub"
+    mock_redis_helper.compare_and_delete.assert_called_once_with(
+        "key_prefixvalid_sub", jti.bytes
+    )
 
 
 async def test_check_token_invalid_token():
-    jti = uuid4()
-    token = gen_email_token(
-        payload=EmailTokenPayload(
-            sub="valid_sub",
-            typ="email",
-            jti=uuid4(),
-            exp=datetime.datetime.now(datetime.UTC) + datetime.timedelta(seconds=60),
-        )
-    )
-    with patch("src.emails.dependencies.redis_client") as mock_redis_client:
+    with patch("src.emails.dependencies.redis_helper") as mock_redis_helper:
+        mock_redis_helper.compare_and_delete = AsyncMock(return_value=False)
         with pytest.raises(InvalidToken):
-            mock_redis_client.get = AsyncMock(return_value=jti.bytes)
-            await check_token(token, "key_prefix")
+            await check_token(email_token(uuid4()), "key_prefix")
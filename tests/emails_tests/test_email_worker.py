@@ -0,0 +1,150 @@
+import json
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.emails.queue import (
+    EMAIL_DEAD_LETTER_STREAM,
+    EMAIL_RETRY_KEY,
+    EMAIL_STREAM,
+    EmailQueue,
+)
+from src.emails.transport import SMTPPool
+from src.emails.utils import send_email
+from src.emails.worker import EmailWorker
+
+
+@pytest.fixture(scope="function")
+def queue_redis(mocker):
+    mock = AsyncMock()
+    mocker.patch("src.emails.queue.redis_client", mock)
+    mocker.patch("src.emails.worker.redis_client", mock)
+    mocker.patch("src.emails.queue.requeue_due_script", AsyncMock(return_value=0))
+    return mock
+
+
+@pytest.fixture(scope="function")
+async def worker_pool(mocker, smtp_server):
+    controller, _ = smtp_server
+    pool = SMTPPool(
+        hostname="127.0.0.1",
+        port=controller.port,
+        username=None,
+        password=None,
+        use_tls=False,
+        start_tls=False,
+        size=1,
+        timeout=5,
+    )
+    mocker.patch("src.emails.worker.smtp_pool", pool)
+    yield pool
+    await pool.close()
+
+
+def make_worker() -> EmailWorker:
+    return EmailWorker(
+        consumer="test",
+        batch_size=10,
+        max_attempts=3,
+        retry_base=10,
+        claim_idle_seconds=60,
+    )
+
+
+def entry(entry_id: bytes, email_to: str, attempts: int = 0) -> tuple:
+    email = {
+        "id": entry_id.decode(),
+        "to": email_to,
+        "subject": "subject",
+        "body": "body",
+        "attempts": attempts,
+    }
+    return entry_id, {b"email": json.dumps(email).encode()}
+
+
+async def test_send_email_enqueues(queue_redis):
+    await send_email("user@example.com", "subject", "<p>body</p>")
+    stream, fields = queue_redis.xadd.call_args.args
+    assert stream == EMAIL_STREAM
+    email = EmailQueue.decode(fields["email"])
+    assert email["to"] == "user@example.com"
+    assert email["attempts"] == 0
+
+
+async def test_batch_is_delivered_over_one_connection(
+    queue_redis, smtp_server, worker_pool
+):
+    _, handler = smtp_server
+    await make_worker().deliver(
+        [entry(b"1-0", "a@example.com"), entry(b"2-0", "b@example.com")]
+    )
+
+    assert [rcpt for _, rcpt in handler.messages] == [
+        ["a@example.com"],
+        ["b@example.com"],
+    ]
+    assert len({peer for peer, _ in handler.messages}) == 1
+    queue_redis.xack.assert_called_once_with(
+        EMAIL_STREAM, "email_workers", b"1-0", b"2-0"
+    )
+
+
+async def test_failed_delivery_is_retried_with_backoff(
+    queue_redis, smtp_server, worker_pool
+):
+    _, handler = smtp_server
+    await make_worker().deliver(
+        [
+            entry(b"1-0", "rejected@example.com", attempts=1),
+            entry(b"2-0", "b@example.com"),
+        ]
+    )
+
+    assert [rcpt for _, rcpt in handler.messages] == [["b@example.com"]]
+    key, mapping = queue_redis.zadd.call_args.args
+    assert key == EMAIL_RETRY_KEY
+    ((data, due),) = mapping.items()
+    assert json.loads(data)["attempts"] == 2
+    queue_redis.xack.assert_called_once_with(
+        EMAIL_STREAM, "email_workers", b"1-0", b"2-0"
+    )
+
+
+async def test_exhausted_email_is_dead_lettered(queue_redis, smtp_server, worker_pool):
+    await make_worker().deliver([entry(b"1-0", "rejected@example.com", attempts=2)])
+
+    assert queue_redis.zadd.call_count == 0
+    stream, fields = queue_redis.xadd.call_args.args
+    assert stream == EMAIL_DEAD_LETTER_STREAM
+    assert "550" in fields["error"]
+
+
+async def test_connection_failure_retries_whole_batch(queue_redis, mocker):
+    pool = SMTPPool(
+        hostname="127.0.0.1",
+        port=1,
+        username=None,
+        password=None,
+        use_tls=False,
+        start_tls=False,
+        size=1,
+        timeout=1,
+    )
+    mocker.patch("src.emails.worker.smtp_pool", pool)
+    await make_worker().deliver(
+        [entry(b"1-0", "a@example.com"), entry(b"2-0", "b@example.com")]
+    )
+
+    assert queue_redis.zadd.call_count == 2
+    queue_redis.xack.assert_called_once_with(
+        EMAIL_STREAM, "email_workers", b"1-0", b"2-0"
+    )
+
+
+async def test_due_retries_are_moved_in_one_script(mocker):
+    script = mocker.patch(
+        "src.emails.queue.requeue_due_script", AsyncMock(return_value=2)
+    )
+    assert await EmailQueue.requeue_due(limit=50) == 2
+    assert script.call_args.kwargs["keys"] == [EMAIL_RETRY_KEY, EMAIL_STREAM]
+    assert script.call_args.kwargs["args"][1] == 50
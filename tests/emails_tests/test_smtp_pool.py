@@ -0,0 +1,81 @@
+import asyncio
+from email.message import EmailMessage
+
+from aiosmtpd.controller import Controller
+
+from src.emails.transport import SMTPPool
+from tests.emails_tests.conftest import RecordingHandler, free_port
+
+
+def make_pool(port: int, size: int = 2) -> SMTPPool:
+    return SMTPPool(
+        hostname="127.0.0.1",
+        port=port,
+        username=None,
+        password=None,
+        use_tls=False,
+        start_tls=False,
+        size=size,
+        timeout=5,
+    )
+
+
+def make_message(email_to: str) -> EmailMessage:
+    msg = EmailMessage()
+    msg["From"] = "sender@example.com"
+    msg["To"] = email_to
+    msg["Subject"] = "test"
+    msg.set_content("test")
+    return msg
+
+
+async def test_connections_are_reused(smtp_server):
+    controller, handler = smtp_server
+    pool = make_pool(controller.port)
+
+    await pool.send(make_message("a@example.com"), make_message("b@example.com"))
+    await pool.send(make_message("c@example.com"))
+    await pool.close()
+
+    assert [rcpt for _, rcpt in handler.messages] == [
+        ["a@example.com"],
+        ["b@example.com"],
+        ["c@example.com"],
+    ]
+    assert len({peer for peer, _ in handler.messages}) == 1
+
+
+async def test_concurrent_sends_are_bounded(smtp_server):
+    controller, handler = smtp_server
+    pool = make_pool(controller.port, size=2)
+
+    await asyncio.gather(
+        *(pool.send(make_message(f"{i}@example.com")) for i in range(6))
+    )
+    await pool.close()
+
+    assert len(handler.messages) == 6
+    assert len({peer for peer, _ in handler.messages}) <= 2
+
+
+async def test_reconnects_after_server_restart():
+    handler = RecordingHandler()
+    port = free_port()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    pool = make_pool(port)
+    await pool.send(make_message("a@example.com"))
+
+    controller.stop()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    try:
+        await pool.send(make_message("b@example.com"))
+        await pool.close()
+    finally:
+        controller.stop()
+
+    assert [rcpt for _, rcpt in handler.messages] == [
+        ["a@example.com"],
+        ["b@example.com"],
+    ]
@@ -0,0 +1,137 @@
+import datetime
+
+import jwt
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from src.keys.manager import KeyManager, key_manager
+
+
+class FakeKeyCollection:
+    def __init__(self):
+        self.docs = {}
+
+    async def insert_one(self, doc):
+        if doc["_id"] in self.docs:
+            raise DuplicateKeyError("duplicate key")
+        self.docs[doc["_id"]] = doc
+
+    async def delete_many(self, query):
+        for kid in query["_id"]["$in"]:
+            del self.docs[kid]
+
+    def find(self, query):
+        docs = [
+            doc for doc in self.docs.values() if doc["algorithm"] == query["algorithm"]
+        ]
+
+        class Cursor:
+            async def to_list(self, length):
+                return docs
+
+        return Cursor()
+
+
+@pytest.fixture(scope="function")
+def key_collection(mocker):
+    collection = FakeKeyCollection()
+    mocker.patch("src.keys.manager.key_collection", collection)
+    return collection
+
+
+def make_manager(algorithm: str) -> KeyManager:
+    return KeyManager(
+        algorithm=algorithm,
+        secret_key="test_secret",
+        rotation_period=datetime.timedelta(days=30),
+        overlap=datetime.timedelta(days=30),
+        publish_ahead=datetime.timedelta(hours=1),
+        refresh_interval=300,
+    )
+
+
+@pytest.mark.parametrize("algorithm", ["RS256", "ES256", "EdDSA"])
+async def test_sign_and_verify(key_collection, algorithm):
+    manager = make_manager(algorithm)
+    await manager.refresh()
+
+    token = manager.encode({"sub": "1"})
+    header = jwt.get_unverified_header(token)
+    assert header["alg"] == algorithm
+    assert header["kid"] in key_collection.docs
+    assert manager.decode(token) == {"sub": "1"}
+
+    jwks, _ = manager.jwks()
+    public_key = jwt.PyJWK(jwks["keys"][0]).key
+    assert jwt.decode(token, public_key, algorithms=[algorithm]) == {"sub": "1"}
+
+
+async def test_unknown_kid_is_rejected(key_collection):
+    manager = make_manager("ES256")
+    await manager.refresh()
+    other = make_manager("ES384")
+    await other.refresh()
+
+    with pytest.raises(jwt.InvalidTokenError):
+        manager.decode(other.encode({"sub": "1"}))
+
+
+async def test_rotation_keeps_previous_key_published(key_collection):
+    manager = make_manager("ES256")
+    await manager.refresh()
+    old_token = manager.encode({"sub": "1"})
+    (old_doc,) = key_collection.docs.values()
+    old_doc["not_before"] -= datetime.timedelta(days=31)
+
+    await manager.refresh()
+    jwks, _ = manager.jwks()
+    assert len(jwks["keys"]) == 2
+    # the new key is published ahead, the old one still signs
+    assert jwt.get_unverified_header(manager.encode({}))["kid"] == old_doc["_id"]
+    assert manager.decode(old_token) == {"sub": "1"}
+
+
+async def test_workers_share_created_keys(key_collection):
+    workers = [make_manager("ES256"), make_manager("ES256")]
+    for worker in workers:
+        await worker.refresh()
+    assert len(key_collection.docs) == 1
+    token = workers[0].encode({"sub": "1"})
+    assert workers[1].decode(token) == {"sub": "1"}
+
+    (doc,) = key_collection.docs.values()
+    doc["not_before"] -= datetime.timedelta(days=31)
+    for worker in workers:
+        await worker.refresh()
+    assert len(key_collection.docs) == 2
+
+
+async def test_retired_key_outlives_its_last_tokens(key_collection):
+    manager = make_manager("ES256")
+    await manager.refresh()
+    (old_doc,) = key_collection.docs.values()
+    # the old key signed until its successor started a day ago
+    old_doc["not_before"] -= datetime.timedelta(days=61)
+    await manager.refresh()
+    (new_doc,) = (doc for doc in key_collection.docs.values() if doc is not old_doc)
+    new_doc["not_before"] -= datetime.timedelta(days=1, hours=1)
+
+    await manager.refresh()
+    assert old_doc["_id"] in key_collection.docs
+
+    new_doc["not_before"] -= datetime.timedelta(days=29)
+    await manager.refresh()
+    assert old_doc["_id"] not in key_collection.docs
+
+
+async def test_jwks_endpoint_supports_etag(async_client):
+    response = await async_client.get("/.well-known/jwks.json")
+    assert response.status_code == 200, response.text
+    assert response.json() == key_manager.jwks()[0]
+    assert "max-age" in response.headers["cache-control"]
+
+    response = await async_client.get(
+        "/.well-known/jwks.json",
+        headers={"If-None-Match": response.headers["etag"]},
+    )
+    assert response.status_code == 304
@@ -4,6 +4,9 @@ from uuid import UUID
 
 import pytest
 
+from src.apps.cache import app_cache
+from src.oauth2.codes import AuthorizationCode
+
 TEST_APP_CLIENT_ID = "30219807-9f3f-4da1-bd25-ef0f7abefa1a"
 TEST_APP_CLIENT_SECRET = "5d8b84a1-3e18-41d5-8c05-2d77254b21e7"
 TEST_APP_NAME = "Test app"
@@ -12,6 +15,11 @@ TEST_APP_SCOPES = ["read", "write"]
 
 TEST_AUTHORIZATION_CODE = "ud988ff7q3rrfikope8t"
 TEST_USER_ID = 1
+TEST_AUTHORIZATION_CODE_RECORD = AuthorizationCode(
+    user_id=TEST_USER_ID,
+    scopes=TEST_APP_SCOPES,
+    redirect_uri=TEST_APP_REDIRECT_URIS[0],
+)
 
 TEST_APP = {
     "_id": UUID("6a628054-591c-4618-9edb-008e402b4652"),
@@ -39,17 +47,18 @@ async def mock_find_one(data):
 @pytest.fixture
 async def mock_redis_client(mocker):
     mock = AsyncMock()
-    mocker.patch("src.oauth2.views.redis_client", mock)
+    mocker.patch("src.oauth2.codes.redis_client", mock)
     yield mock
 
 
-async def mock_redis_get(key):
+async def mock_redis_getdel(key):
     if key == f"auth_code_{TEST_APP_CLIENT_ID}_{TEST_AUTHORIZATION_CODE}":
-        return TEST_USER_ID
+        return TEST_AUTHORIZATION_CODE_RECORD.dump().encode()
 
 
 @pytest.fixture(autouse=True, scope="function")
 async def mock_mongodb(mocker):
     mock = AsyncMock()
-    mocker.patch("src.oauth2.views.app_collection", mock)
+    mocker.patch("src.apps.registry.app_collection", mock)
+    app_cache.clear()
     return mock
@@ -0,0 +1,114 @@
+import base64
+import hashlib
+
+from src.oauth2.codes import AuthorizationCode
+from tests.oidc_tests.conftest import (
+    TEST_APP_CLIENT_ID,
+    TEST_APP_CLIENT_SECRET,
+    TEST_APP_REDIRECT_URIS,
+    TEST_AUTHORIZATION_CODE,
+    TEST_USER_ID,
+    mock_find_one,
+)
+
+CODE_VERIFIER = "dBjftJeZ4CVP-mJ92K9qeQ-EdNxHpVy5BNZ2-1-m0qs"
+CODE_CHALLENGE = (
+    base64.urlsafe_b64encode(hashlib.sha256(CODE_VERIFIER.encode()).digest())
+    .rstrip(b"=")
+    .decode()
+)
+
+
+def exchange_data(**extra):
+    return {
+        "client_id": TEST_APP_CLIENT_ID,
+        "client_secret": TEST_APP_CLIENT_SECRET,
+        "code": TEST_AUTHORIZATION_CODE,
+        "redirect_uri": TEST_APP_REDIRECT_URIS[0],
+        **extra,
+    }
+
+
+def test_record_round_trip():
+    record = AuthorizationCode(
+        user_id=TEST_USER_ID,
+        scopes=["read"],
+        redirect_uri=TEST_APP_REDIRECT_URIS[0],
+        code_challenge=CODE_CHALLENGE,
+        code_challenge_method="S256",
+    )
+    assert AuthorizationCode.load(record.dump().encode()) == record
+    assert record.verify_code_verifier(CODE_VERIFIER)
+    assert not record.verify_code_verifier("wrong")
+    assert not record.verify_code_verifier(None)
+
+
+async def test_exchange_checks_pkce_and_grants_requested_scopes(
+    async_client, mock_mongodb, mock_redis_client
+):
+    mock_mongodb.find_one.side_effect = mock_find_one
+    mock_redis_client.getdel.return_value = (
+        AuthorizationCode(
+            user_id=TEST_USER_ID,
+            scopes=["read"],
+            redirect_uri=TEST_APP_REDIRECT_URIS[0],
+            code_challenge=CODE_CHALLENGE,
+            code_challenge_method="S256",
+        )
+        .dump()
+        .encode()
+    )
+
+    response = await async_client.post("/oauth2/token/", json=exchange_data())
+    assert response.status_code == 400, response.json()
+    assert response.json() == {"detail": "Invalid code verifier"}
+
+    response = await async_client.post(
+        "/oauth2/token/",
+        json=exchange_data(
+            code_verifier=CODE_VERIFIER, redirect_uri=TEST_APP_REDIRECT_URIS[0]
+        ),
+    )
+    assert response.status_code == 200, response.json()
+    assert response.json()["scope"] == "read"
+    assert mock_redis_client.getdel.call_count == 2
+    assert mock_redis_client.get.call_count == 0
+
+
+async def test_exchange_rejects_malformed_code_verifier(async_client, mock_mongodb):
+    mock_mongodb.find_one.side_effect = mock_find_one
+    for code_verifier in ["é" * 43, "short"]:
+        response = await async_client.post(
+            "/oauth2/token/", json=exchange_data(code_verifier=code_verifier)
+        )
+        assert response.status_code == 422, response.json()
+
+
+async def test_exchange_requires_redirect_uri(async_client, mock_mongodb):
+    mock_mongodb.find_one.side_effect = mock_find_one
+    data = exchange_data()
+    del data["redirect_uri"]
+    response = await async_client.post("/oauth2/token/", json=data)
+    assert response.status_code == 422, response.json()
+
+
+async def test_exchange_rejects_other_redirect_uri(
+    async_client, mock_mongodb, mock_redis_client
+):
+    mock_mongodb.find_one.side_effect = mock_find_one
+    mock_redis_client.getdel.return_value = (
+        AuthorizationCode(
+            user_id=TEST_USER_ID,
+            scopes=["read"],
+            redirect_uri=TEST_APP_REDIRECT_URIS[0],
+        )
+        .dump()
+        .encode()
+    )
+
+    response = await async_client.post(
+        "/oauth2/token/",
+        json=exchange_data(redirect_uri="http://attacker.example.com"),
+    )
+    assert response.status_code == 400, response.json()
+    assert response.json() == {"detail": "Invalid authorization code"}
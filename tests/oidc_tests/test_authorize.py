@@ -79,7 +79,9 @@ async def test_oauth2_authorize_failed_bad_scopes(
     )
     json_response = response.json()
     assert response.status_code == 400, json_response
-    assert json_response == {"detail": "Scope not allowed by app"}, json_response
+    assert json_response == {
+        "detail": "Scopes: 'scope1, scope2, scope3' not allowed by the app"
+    }, json_response
 
 
 async def test_oauth2_authorize_failed_bad_response_type(
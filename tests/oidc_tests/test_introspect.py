@@ -0,0 +1,98 @@
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import event
+
+from src.database import db_helper
+from src.oauth2.schemas import OAuth2AccessTokenPayload
+from src.oauth2.utils import gen_access_token
+from tests.oidc_tests.conftest import (
+    TEST_APP_CLIENT_ID,
+    TEST_APP_CLIENT_SECRET,
+    TEST_APP_REDIRECT_URIS,
+    TEST_AUTHORIZATION_CODE,
+    TEST_USER_ID,
+    mock_find_one,
+    mock_redis_getdel,
+)
+
+
+@pytest.fixture(scope="function")
+async def access_token(async_client, mock_mongodb, mock_redis_client) -> str:
+    mock_redis_client.getdel.side_effect = mock_redis_getdel
+    mock_mongodb.find_one.side_effect = mock_find_one
+    response = await async_client.post(
+        "/oauth2/token/",
+        json={
+            "client_id": TEST_APP_CLIENT_ID,
+            "client_secret": TEST_APP_CLIENT_SECRET,
+            "code": TEST_AUTHORIZATION_CODE,
+            "redirect_uri": TEST_APP_REDIRECT_URIS[0],
+        },
+    )
+    assert response.status_code == 200, response.json()
+    return response.json()["access_token"]
+
+
+async def introspect(async_client, tokens, client_secret=TEST_APP_CLIENT_SECRET):
+    return await async_client.post(
+        "/oauth2/introspect/",
+        json={
+            "client_id": TEST_APP_CLIENT_ID,
+            "client_secret": client_secret,
+            "tokens": tokens,
+        },
+    )
+
+
+async def test_introspect_batch(
+    async_client, access_token, authorized_header, fake_redis
+):
+    user_token = authorized_header.removeprefix("Bearer ")
+    other_client_token = gen_access_token(
+        OAuth2AccessTokenPayload(
+            sub=str(TEST_USER_ID), scopes=[], jti=uuid4(), client_id=uuid4()
+        )
+    )
+
+    response = await introspect(
+        async_client, [access_token, user_token, other_client_token, "not a token"]
+    )
+
+    assert response.status_code == 200, response.json()
+    oauth2_result, *inactive = response.json()["results"]
+    assert oauth2_result["active"] is True
+    assert oauth2_result["scope"] == "read write"
+    assert oauth2_result["sub"] == str(TEST_USER_ID)
+    assert oauth2_result["exp"] > oauth2_result["iat"]
+    # first-party tokens and other clients' tokens are not disclosed
+    assert inactive == [{"active": False}] * 3
+
+
+async def test_introspect_loads_users_once(async_client, access_token, fake_redis):
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db_helper.engine.sync_engine, "before_cursor_execute", record)
+    try:
+        response = await introspect(async_client, [access_token] * 20)
+    finally:
+        event.remove(db_helper.engine.sync_engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200, response.json()
+    assert all(result["active"] for result in response.json()["results"])
+    assert len(statements) == 1
+
+
+async def test_introspect_requires_client_secret(async_client, access_token):
+    response = await introspect(
+        async_client, [access_token], client_secret=str(uuid4())
+    )
+    assert response.status_code == 400
+
+
+async def test_introspect_rejects_empty_batch(async_client, access_token):
+    response = await introspect(async_client, [])
+    assert response.status_code == 422
@@ -0,0 +1,95 @@
+import asyncio
+from uuid import UUID
+
+import pytest
+
+from src.config import settings
+from src.keys.manager import key_manager
+from tests.oidc_tests.conftest import (
+    TEST_APP_CLIENT_ID,
+    TEST_APP_CLIENT_SECRET,
+    TEST_APP_REDIRECT_URIS,
+    TEST_AUTHORIZATION_CODE,
+    mock_find_one,
+    mock_redis_getdel,
+)
+
+
+@pytest.fixture(scope="function")
+async def refresh_token(async_client, mock_mongodb, mock_redis_client) -> str:
+    mock_redis_client.getdel.side_effect = mock_redis_getdel
+    mock_mongodb.find_one.side_effect = mock_find_one
+    response = await async_client.post(
+        "/oauth2/token/",
+        json={
+            "client_id": TEST_APP_CLIENT_ID,
+            "client_secret": TEST_APP_CLIENT_SECRET,
+            "code": TEST_AUTHORIZATION_CODE,
+            "redirect_uri": TEST_APP_REDIRECT_URIS[0],
+        },
+    )
+    assert response.status_code == 200, response.json()
+    return response.json()["refresh_token"]
+
+
+async def refresh(async_client, token: str):
+    return await async_client.post(
+        "/oauth2/refresh/",
+        json={"refresh_token": token, "grant_type": "refresh_token"},
+    )
+
+
+async def test_refresh_rotates_token(async_client, refresh_token):
+    response = await refresh(async_client, refresh_token)
+    assert response.status_code == 200, response.json()
+    new_token = response.json()["refresh_token"]
+    assert new_token != refresh_token
+    access_token = key_manager.decode(response.json()["access_token"])
+    assert UUID(access_token["client_id"]) == UUID(TEST_APP_CLIENT_ID)
+
+    response = await refresh(async_client, new_token)
+    assert response.status_code == 200, response.json()
+
+
+async def test_concurrent_refreshes_rotate_once(async_client, refresh_token, mocker):
+    mocker.patch.object(settings, "REFRESH_TOKEN_REUSE_GRACE_SECONDS", 0)
+    responses = await asyncio.gather(
+        *(refresh(async_client, refresh_token) for _ in range(3))
+    )
+    assert sorted(response.status_code for response in responses) == [200, 403, 403]
+
+
+async def test_reuse_within_grace_window_is_accepted(async_client, refresh_token):
+    first = await refresh(async_client, refresh_token)
+    retry = await refresh(async_client, refresh_token)
+    assert retry.status_code == 200, retry.json()
+
+    # only the latest token stays valid
+    assert (
+        await refresh(async_client, first.json()["refresh_token"])
+    ).status_code == 403
+    response = await refresh(async_client, retry.json()["refresh_token"])
+    assert response.status_code == 200, response.json()
+
+
+async def test_reuse_after_grace_window_revokes_session(
+    async_client, refresh_token, mocker, fake_redis
+):
+    mocker.patch.object(settings, "REFRESH_TOKEN_REUSE_GRACE_SECONDS", 0)
+    response = await refresh(async_client, refresh_token)
+    new_token = response.json()["refresh_token"]
+    access_token = response.json()["access_token"]
+
+    assert (await refresh(async_client, refresh_token)).status_code == 403
+    # the whole session is gone, the current token included
+    assert (await refresh(async_client, new_token)).status_code == 403
+    # and so are the access tokens issued for it
+    response = await async_client.post(
+        "/oauth2/introspect/",
+        json={
+            "client_id": TEST_APP_CLIENT_ID,
+            "client_secret": TEST_APP_CLIENT_SECRET,
+            "tokens": [access_token],
+        },
+    )
+    assert response.json()["results"] == [{"active": False}]
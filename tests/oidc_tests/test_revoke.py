@@ -0,0 +1,109 @@
+from uuid import UUID, uuid4
+
+import pytest
+
+from src.oauth2.schemas import OAuth2AccessTokenPayload
+from src.oauth2.utils import gen_access_token
+from tests.oidc_tests.conftest import (
+    TEST_APP_CLIENT_ID,
+    TEST_APP_CLIENT_SECRET,
+    TEST_APP_REDIRECT_URIS,
+    TEST_AUTHORIZATION_CODE,
+    TEST_USER_ID,
+    mock_find_one,
+    mock_redis_getdel,
+)
+
+
+@pytest.fixture(scope="function")
+async def access_token(async_client, mock_mongodb, mock_redis_client) -> str:
+    mock_redis_client.getdel.side_effect = mock_redis_getdel
+    mock_mongodb.find_one.side_effect = mock_find_one
+    response = await async_client.post(
+        "/oauth2/token/",
+        json={
+            "client_id": TEST_APP_CLIENT_ID,
+            "client_secret": TEST_APP_CLIENT_SECRET,
+            "code": TEST_AUTHORIZATION_CODE,
+            "redirect_uri": TEST_APP_REDIRECT_URIS[0],
+        },
+    )
+    assert response.status_code == 200, response.json()
+    return response.json()["access_token"]
+
+
+async def revoke(async_client, token, client_secret=TEST_APP_CLIENT_SECRET):
+    return await async_client.post(
+        "/oauth2/revoke/",
+        json={
+            "client_id": TEST_APP_CLIENT_ID,
+            "client_secret": client_secret,
+            "token": token,
+        },
+    )
+
+
+def issue_token(client_id: UUID) -> str:
+    return gen_access_token(
+        OAuth2AccessTokenPayload(
+            sub=str(TEST_USER_ID), scopes=[], jti=uuid4(), client_id=client_id
+        )
+    )
+
+
+async def test_revoked_access_token_is_rejected(async_client, mock_mongodb, fake_redis):
+    mock_mongodb.find_one.side_effect = mock_find_one
+    token = issue_token(UUID(TEST_APP_CLIENT_ID))
+    headers = {"Authorization": f"Bearer {token}"}
+    response = await async_client.get("/users/me", headers=headers)
+    assert response.status_code == 200, response.json()
+
+    response = await revoke(async_client, token)
+    assert response.status_code == 200, response.json()
+
+    response = await async_client.get("/users/me", headers=headers)
+    assert response.status_code == 403
+
+
+async def test_revoked_access_token_is_inactive(async_client, access_token, fake_redis):
+    response = await revoke(async_client, access_token)
+    assert response.status_code == 200, response.json()
+
+    response = await async_client.post(
+        "/oauth2/introspect/",
+        json={
+            "client_id": TEST_APP_CLIENT_ID,
+            "client_secret": TEST_APP_CLIENT_SECRET,
+            "tokens": [access_token],
+        },
+    )
+    assert response.json()["results"] == [{"active": False}]
+
+
+async def test_only_issuing_client_can_revoke(async_client, mock_mongodb, fake_redis):
+    mock_mongodb.find_one.side_effect = mock_find_one
+    token = issue_token(uuid4())
+
+    response = await revoke(async_client, token)
+    assert response.status_code == 200, response.json()
+
+    assert fake_redis.keys == {}
+    response = await async_client.get(
+        "/users/me", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 200, response.json()
+
+
+async def test_revoke_requires_client_secret(async_client, access_token):
+    response = await revoke(
+        async_client,
+        access_token,
+        client_secret="00000000-0000-0000-0000-000000000000",
+    )
+    assert response.status_code != 200
+
+
+async def test_revoking_invalid_token_succeeds(async_client, mock_mongodb):
+    mock_mongodb.find_one.side_effect = mock_find_one
+    response = await revoke(async_client, "not a token")
+    assert response.status_code == 200
@@ -0,0 +1,137 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi import Request
+from redis.exceptions import ConnectionError
+
+from src.rate_limit.config import RateLimit
+from src.rate_limit.dependencies import client_ip
+from src.rate_limit.exceptions import RateLimited
+from src.rate_limit.limiter import RateLimiter, rate_limiter
+from tests.conftest import TEST_USER_PASSWORD, TEST_USER_USERNAME
+
+LIMIT = RateLimit(requests=5, seconds=60)
+
+
+@pytest.fixture(scope="function")
+def sliding_window(mocker):
+    script = AsyncMock(return_value=0)
+    mocker.patch("src.rate_limit.limiter.sliding_window_script", script)
+    rate_limiter.clear()
+    yield script
+    rate_limiter.clear()
+
+
+async def test_allowed_requests_are_recorded(sliding_window):
+    limiter = RateLimiter(enabled=True, local_cache_size=10)
+    await limiter.hit("login", "johndoe", LIMIT)
+
+    keys = sliding_window.call_args.kwargs["keys"]
+    assert keys[0].startswith("rate_limit:login:")
+    # identifiers are hashed
+    assert "johndoe" not in keys[0]
+    assert limiter.stats()["allowed"] == 1
+
+
+async def test_limited_key_is_rejected_locally(sliding_window):
+    limiter = RateLimiter(enabled=True, local_cache_size=10)
+    sliding_window.return_value = 30_000
+
+    with pytest.raises(RateLimited) as exc_info:
+        await limiter.hit("login", "johndoe", LIMIT)
+    assert exc_info.value.headers == {"Retry-After": "30"}
+
+    with pytest.raises(RateLimited):
+        await limiter.hit("login", "johndoe", LIMIT)
+    assert sliding_window.call_count == 1
+    assert limiter.stats()["limited_locally"] == 1
+
+    # other keys are still counted in Redis
+    sliding_window.return_value = 0
+    await limiter.hit("login", "janedoe", LIMIT)
+    assert sliding_window.call_count == 2
+
+
+async def test_token_bucket_uses_its_script(mocker, sliding_window):
+    token_bucket = mocker.patch(
+        "src.rate_limit.limiter.token_bucket_script", AsyncMock(return_value=0)
+    )
+    limiter = RateLimiter(enabled=True, local_cache_size=10)
+    await limiter.hit(
+        "token",
+        "client",
+        RateLimit(requests=100, seconds=10, algorithm="token_bucket"),
+    )
+    assert token_bucket.call_args.kwargs["args"][1:] == [100, 10_000]
+    assert sliding_window.call_count == 0
+
+
+async def test_redis_errors_let_requests_through(sliding_window):
+    limiter = RateLimiter(enabled=True, local_cache_size=10)
+    sliding_window.side_effect = ConnectionError()
+    await limiter.hit("login", "johndoe", LIMIT)
+    assert limiter.stats()["errors"] == 1
+
+
+async def test_disabled_limiter_skips_redis(sliding_window):
+    limiter = RateLimiter(enabled=False, local_cache_size=10)
+    await limiter.hit("login", "johndoe", LIMIT)
+    assert sliding_window.call_count == 0
+
+
+async def test_login_is_limited_before_password_check(
+    async_client, mocker, sliding_window
+):
+    mocker.patch.object(rate_limiter, "enabled", True)
+    check_password = mocker.patch("src.auth.views.check_password")
+    sliding_window.return_value = 1500
+
+    response = await async_client.post(
+        "/auth/login/",
+        json={"login": TEST_USER_USERNAME, "password": TEST_USER_PASSWORD},
+    )
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "2"
+    assert check_password.call_count == 0
+
+
+async def test_login_limit_is_per_client(async_client, mocker, sliding_window):
+    mocker.patch.object(rate_limiter, "enabled", True)
+
+    async def login(forwarded_for):
+        return await async_client.post(
+            "/auth/login/",
+            json={"login": TEST_USER_USERNAME, "password": TEST_USER_PASSWORD},
+            headers={"X-Forwarded-For": forwarded_for},
+        )
+
+    sliding_window.return_value = 1500
+    response = await login("203.0.113.7")
+    assert response.status_code == 429
+
+    # the owner logs in from elsewhere while the attacker is limited
+    sliding_window.return_value = 0
+    response = await login("198.51.100.1")
+    assert response.status_code == 200, response.json()
+    response = await login("203.0.113.7")
+    assert response.status_code == 429
+
+
+def request_from(host: str, forwarded_for: str | None = None) -> Request:
+    headers = []
+    if forwarded_for is not None:
+        headers.append((b"x-forwarded-for", forwarded_for.encode()))
+    return Request({"type": "http", "client": (host, 1234), "headers": headers})
+
+
+def test_client_ip_trusts_only_configured_proxies():
+    # the default trusts a proxy on the same host
+    assert client_ip(request_from("127.0.0.1", "203.0.113.7")) == "203.0.113.7"
+    assert client_ip(request_from("198.51.100.1", "203.0.113.7")) == "198.51.100.1"
+    # addresses prepended by the client are ignored
+    assert (
+        client_ip(request_from("127.0.0.1", "10.0.0.1, 203.0.113.7, 127.0.0.1"))
+        == "203.0.113.7"
+    )
+    assert client_ip(request_from("127.0.0.1")) == "127.0.0.1"
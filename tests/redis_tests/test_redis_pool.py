@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+from redis.asyncio.connection import Connection
+from redis.exceptions import ConnectionError
+
+from src.redis_helper import InstrumentedConnectionPool
+
+
+class OfflineConnection(Connection):
+    """Checked out and returned like a real connection, never opens a socket."""
+
+    async def connect(self):
+        pass
+
+    async def can_read_destructive(self):
+        return False
+
+
+def offline_pool(timeout: float) -> InstrumentedConnectionPool:
+    return InstrumentedConnectionPool(
+        max_connections=1, timeout=timeout, connection_class=OfflineConnection
+    )
+
+
+async def test_pool_records_waits():
+    pool = offline_pool(timeout=1)
+
+    async def command() -> None:
+        connection = await pool.get_connection("PING")
+        await asyncio.sleep(0.05)
+        await pool.release(connection)
+
+    await asyncio.gather(command(), command())
+
+    stats = pool.stats()
+    assert stats["max_connections"] == 1
+    assert stats["in_use"] == 0
+    assert stats["idle"] == 1
+    assert stats["checkouts"] == 2
+    assert stats["timeouts"] == 0
+    # the second command waited for the only connection
+    assert stats["wait_seconds_max"] >= 0.04
+
+
+async def test_pool_counts_timeouts():
+    pool = offline_pool(timeout=0.01)
+    connection = await pool.get_connection("PING")
+
+    with pytest.raises(ConnectionError):
+        await pool.get_connection("PING")
+
+    assert pool.stats()["timeouts"] == 1
+    assert pool.stats()["in_use"] == 1
+    await pool.release(connection)
+
+
+class RefusedConnection(OfflineConnection):
+    async def connect(self):
+        raise ConnectionError("Connection refused")
+
+
+async def test_pool_does_not_count_connect_errors_as_timeouts():
+    pool = InstrumentedConnectionPool(
+        max_connections=1, timeout=1, connection_class=RefusedConnection
+    )
+
+    with pytest.raises(ConnectionError):
+        await pool.get_connection("PING")
+
+    assert pool.stats()["timeouts"] == 0
+    assert pool.stats()["checkouts"] == 1
+
+
+async def test_metrics_endpoint_reports_redis_pool(async_client, metrics_header):
+    response = await async_client.get("/metrics", headers=metrics_header)
+    assert response.status_code == 200
+    assert "max_connections" in response.json()["redis_pool"]
+
+
+async def test_metrics_endpoint_requires_token(async_client, metrics_header):
+    response = await async_client.get("/metrics")
+    assert response.status_code == 403
+    response = await async_client.get(
+        "/metrics", headers={"Authorization": "Bearer wrong"}
+    )
+    assert response.status_code == 403
+
+
+async def test_metrics_endpoint_is_disabled_without_token(async_client):
+    response = await async_client.get("/metrics")
+    assert response.status_code == 404
@@ -0,0 +1,57 @@
+import datetime
+from uuid import UUID
+
+from sqlalchemy import select
+
+from src.database import db_helper
+from src.sessions.last_used import last_used_writer
+from src.sessions.models import UserSessionsInDB
+from tests.conftest import TEST_USER_PASSWORD, TEST_USER_USERNAME
+
+
+async def login(async_client) -> str:
+    response = await async_client.post(
+        "/auth/login/",
+        json={
+            "login": TEST_USER_USERNAME,
+            "password": TEST_USER_PASSWORD,
+        },
+    )
+    return f"Bearer {response.json()['token']}"
+
+
+async def test_last_used_is_buffered_and_flushed(async_client):
+    authorization = await login(async_client)
+    await last_used_writer.flush()
+
+    response = await async_client.get(
+        "/auth/sessions/current/", headers={"Authorization": authorization}
+    )
+    assert response.status_code == 200, response.json()
+    assert last_used_writer.pending == 1
+    reported_last_used = datetime.datetime.fromisoformat(response.json()["last_used"])
+
+    assert await last_used_writer.flush() == 1
+    assert last_used_writer.pending == 0
+
+    async with db_helper.session_factory() as session:
+        result = await session.execute(
+            select(UserSessionsInDB.last_used).where(
+                UserSessionsInDB.session_id == UUID(response.json()["session_id"])
+            )
+        )
+        assert result.scalar_one() == reported_last_used
+
+
+async def test_last_used_is_coalesced_per_session(async_client):
+    authorization = await login(async_client)
+    await last_used_writer.flush()
+
+    for _ in range(3):
+        response = await async_client.get(
+            "/auth/sessions/current/", headers={"Authorization": authorization}
+        )
+        assert response.status_code == 200, response.json()
+
+    assert last_used_writer.pending == 1
+    assert await last_used_writer.flush() == 1
@@ -0,0 +1,111 @@
+import datetime
+import uuid
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.sessions.redis_backend import RedisSessionsBackend
+
+
+@pytest.fixture(scope="function")
+def redis(mocker):
+    mock = AsyncMock()
+    pipe = MagicMock()
+    pipe.__aenter__.return_value = pipe
+    pipe.execute = AsyncMock()
+    mock.pipeline = MagicMock(return_value=pipe)
+    mocker.patch("src.sessions.redis_backend.redis_client", mock)
+    return mock
+
+
+def session_hash(expires_at: datetime.datetime) -> dict[bytes, bytes]:
+    return {
+        b"id": b"3",
+        b"last_used": datetime.datetime(2026, 1, 1).isoformat().encode(),
+        b"ip_address": b"",
+        b"expires_at": expires_at.isoformat().encode(),
+    }
+
+
+async def test_create_keeps_user_keys_in_one_slot(mocker):
+    script = mocker.patch(
+        "src.sessions.redis_backend.create_session_script",
+        AsyncMock(return_value=7),
+    )
+    session_id = uuid.uuid4()
+
+    user_session = await RedisSessionsBackend().create_new(
+        user_id=42, session_id=session_id, ip_address=None, session=MagicMock()
+    )
+
+    assert user_session.id == 7
+    assert user_session.session_id == session_id
+    keys = script.call_args.kwargs["keys"]
+    assert keys[0] == f"user_session:{{42}}:{session_id.hex}"
+    assert all("{42}" in key for key in keys)
+
+
+async def test_get_by_user_id_skips_expired_hashes(redis):
+    alive, expired = uuid.uuid4(), uuid.uuid4()
+    redis.zrangebyscore.return_value = [alive.hex.encode(), expired.hex.encode()]
+    expires_at = datetime.datetime(2030, 1, 1)
+    redis.pipeline.return_value.execute.return_value = [session_hash(expires_at), {}]
+
+    user_sessions = await RedisSessionsBackend().get_by_user_id(
+        user_id=42, session=MagicMock()
+    )
+
+    assert [user_session.session_id for user_session in user_sessions] == [alive]
+    assert user_sessions[0].expires_at == expires_at
+    assert user_sessions[0].ip_address is None
+
+
+async def test_get_many_reads_all_hashes_in_one_pipeline(redis):
+    found, missing = (7, uuid.uuid4()), (8, uuid.uuid4())
+    redis.pipeline.return_value.execute.return_value = [
+        session_hash(datetime.datetime(2030, 1, 1)),
+        {},
+    ]
+
+    user_sessions = await RedisSessionsBackend().get_many(
+        keys=[found, missing], session=MagicMock()
+    )
+
+    assert redis.pipeline.call_count == 1
+    assert [(s.user_id, s.session_id) for s in user_sessions] == [found]
+
+
+async def test_revoke_except_deletes_the_other_sessions(redis):
+    revoked, keep = uuid.uuid4(), uuid.uuid4()
+    expires_at = datetime.datetime(2030, 1, 1)
+    redis.zrange.return_value = [revoked.hex.encode(), keep.hex.encode()]
+    redis.pipeline.return_value.execute.return_value = [
+        [expires_at.timestamp()],
+        1,
+        1,
+    ]
+
+    result = await RedisSessionsBackend().revoke_except(
+        user_id=42, except_id=keep, session=MagicMock()
+    )
+
+    pipe = redis.pipeline.return_value
+    pipe.delete.assert_called_once_with(f"user_session:{{42}}:{revoked.hex}")
+    pipe.zrem.assert_called_once_with("user_sessions:{42}", revoked.hex)
+    assert result == {revoked: expires_at}
+
+
+async def test_revoke_returns_existing_sessions(redis):
+    existing, missing = uuid.uuid4(), uuid.uuid4()
+    expires_at = datetime.datetime(2030, 1, 1)
+    redis.pipeline.return_value.execute.return_value = [
+        [expires_at.timestamp(), None],
+        1,
+        1,
+    ]
+
+    result = await RedisSessionsBackend().revoke(
+        user_id=42, session_ids=[existing, missing], session=MagicMock()
+    )
+
+    assert result == {existing: expires_at}
@@ -0,0 +1,125 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.sessions.cache import UserSessionCache
+from src.sessions.crud import SessionsDB
+from tests.conftest import TEST_USER_PASSWORD, TEST_USER_USERNAME
+
+
+@pytest.fixture(scope="function")
+async def mock_cache_redis(mocker):
+    mock = AsyncMock()
+    pipe = MagicMock()
+    pipe.__aenter__.return_value = pipe
+    # the cached snapshot and the version
+    pipe.execute = AsyncMock(return_value=[None, b"3"])
+    mock.pipeline = MagicMock(return_value=pipe)
+    mocker.patch("src.sessions.cache.redis_client", mock)
+    return mock
+
+
+@pytest.fixture(scope="function")
+def store_snapshot(mocker):
+    script = AsyncMock(return_value=1)
+    mocker.patch("src.sessions.cache.store_snapshot_script", script)
+    return script
+
+
+async def login(async_client) -> str:
+    response = await async_client.post(
+        "/auth/login/",
+        json={
+            "login": TEST_USER_USERNAME,
+            "password": TEST_USER_PASSWORD,
+        },
+    )
+    return f"Bearer {response.json()['token']}"
+
+
+async def test_cache_miss_stores_snapshot(
+    async_client, mock_cache_redis, store_snapshot
+):
+    authorization = await login(async_client)
+    response = await async_client.get(
+        "/users/me", headers={"Authorization": authorization}
+    )
+    assert response.status_code == 200, response.json()
+    assert store_snapshot.call_count == 1
+    # stored only if nothing was invalidated since the version was read
+    version = store_snapshot.call_args.kwargs["args"][0]
+    assert version == 3
+
+
+async def test_cache_hit_serves_snapshot(
+    async_client, mock_cache_redis, store_snapshot
+):
+    authorization = await login(async_client)
+    response = await async_client.get(
+        "/users/me", headers={"Authorization": authorization}
+    )
+    pipe = mock_cache_redis.pipeline.return_value
+    _, _, snapshot, _ = store_snapshot.call_args.kwargs["args"]
+    pipe.execute.return_value = [snapshot.encode(), b"3"]
+
+    cached_response = await async_client.get(
+        "/users/me", headers={"Authorization": authorization}
+    )
+    assert cached_response.status_code == 200, cached_response.json()
+    assert cached_response.json() == response.json()
+    assert store_snapshot.call_count == 1
+
+    response = await async_client.delete(
+        "/auth/logout/", headers={"Authorization": authorization}
+    )
+    assert response.status_code == 204, response.json()
+
+
+async def test_logout_invalidates_session(async_client, mock_cache_redis):
+    authorization = await login(async_client)
+    response = await async_client.get(
+        "/auth/sessions/current/", headers={"Authorization": authorization}
+    )
+    session_id = response.json()["session_id"]
+
+    response = await async_client.delete(
+        "/auth/logout/", headers={"Authorization": authorization}
+    )
+    assert response.status_code == 204, response.json()
+    pipe = mock_cache_redis.pipeline.return_value
+    args = pipe.hdel.call_args.args
+    assert args[1:] == (session_id.replace("-", ""),)
+    assert pipe.incr.call_count == 1
+
+
+async def test_logout_others_invalidates_user(async_client, mock_cache_redis):
+    authorization = await login(async_client)
+    response = await async_client.delete(
+        "/auth/sessions/logout-others/", headers={"Authorization": authorization}
+    )
+    assert response.status_code == 204, response.json()
+    pipe = mock_cache_redis.pipeline.return_value
+    assert pipe.delete.call_count == 1
+    assert pipe.incr.call_count == 1
+
+
+async def test_lookup_racing_a_revoke_keeps_its_version(
+    async_client, mocker, mock_cache_redis, store_snapshot
+):
+    authorization = await login(async_client)
+    pipe = mock_cache_redis.pipeline.return_value
+    get_with_user = SessionsDB.get_with_user
+
+    async def revoked_during_read(**kwargs):
+        row = await get_with_user(**kwargs)
+        await UserSessionCache.invalidate_user(kwargs["user_id"])
+        pipe.execute.return_value = [None, b"4"]
+        return row
+
+    mocker.patch.object(SessionsDB, "get_with_user", side_effect=revoked_during_read)
+    response = await async_client.get(
+        "/users/me", headers={"Authorization": authorization}
+    )
+    assert response.status_code == 200, response.json()
+    # the script refuses the snapshot as the version is no longer 3
+    assert store_snapshot.call_args.kwargs["args"][0] == 3
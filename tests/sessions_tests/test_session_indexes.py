@@ -0,0 +1,32 @@
+import datetime
+import uuid
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from src.database import db_helper
+from src.sessions.crud import SessionsDB
+from src.sessions.models import UserSessionsInDB
+from src.users.crud import UsersDB
+from tests.conftest import TEST_USER_USERNAME
+
+
+async def test_session_id_is_unique_per_user(async_client):
+    async with db_helper.session_factory() as session:
+        user = await UsersDB.get_by_username(TEST_USER_USERNAME, session=session)
+        assert user is not None
+        session_id = uuid.uuid4()
+        user_session = await SessionsDB.create_new(
+            user_id=user.id, session_id=session_id, ip_address=None, session=session
+        )
+        # the index also holds expires_at, the partition key of user_sessions
+        with pytest.raises(IntegrityError):
+            await session.execute(
+                insert(UserSessionsInDB).values(
+                    user_id=user.id,
+                    session_id=session_id,
+                    last_used=datetime.datetime.now(),
+                    expires_at=user_session.expires_at,
+                )
+            )
@@ -0,0 +1,115 @@
+import datetime
+import uuid
+
+from sqlalchemy import select
+
+from src.database import db_helper
+from src.sessions import partitions
+from src.sessions.models import UserSessionsInDB
+from src.sessions.reaper import SessionReaper
+from tests.sessions_tests.test_last_used import login
+
+
+async def add_sessions(user_id: int, expires_at: datetime.datetime, count: int) -> None:
+    async with db_helper.session_factory() as session:
+        session.add_all(
+            UserSessionsInDB(
+                user_id=user_id,
+                session_id=uuid.uuid4(),
+                last_used=datetime.datetime.now(),
+                expires_at=expires_at,
+            )
+            for _ in range(count)
+        )
+        await session.commit()
+
+
+async def count_expired() -> int:
+    async with db_helper.session_factory() as session:
+        result = await session.execute(
+            select(UserSessionsInDB.id).where(
+                UserSessionsInDB.expires_at < datetime.datetime.now()
+            )
+        )
+        return len(result.all())
+
+
+async def test_sessions_listing_skips_expired_without_deleting(async_client):
+    authorization = await login(async_client)
+    user_id = (
+        await async_client.get("/users/me", headers={"Authorization": authorization})
+    ).json()["id"]
+    await add_sessions(user_id, datetime.datetime(2020, 1, 1), count=2)
+
+    response = await async_client.get(
+        "/auth/sessions/", headers={"Authorization": authorization}
+    )
+    assert response.status_code == 200, response.json()
+    expires = [
+        datetime.datetime.fromisoformat(user_session["expires_at"])
+        for user_session in response.json()["user_sessions"]
+    ]
+    assert expires and min(expires) > datetime.datetime.now()
+    assert await count_expired() >= 2
+
+
+async def test_reaper_deletes_expired_sessions_in_batches(async_client):
+    authorization = await login(async_client)
+    user_id = (
+        await async_client.get("/users/me", headers={"Authorization": authorization})
+    ).json()["id"]
+    await add_sessions(user_id, datetime.datetime(2020, 1, 1), count=5)
+    expired = await count_expired()
+
+    reaper = SessionReaper(
+        session_factory=db_helper.session_factory,
+        interval=60,
+        batch_size=2,
+    )
+    assert await reaper.reap() == expired
+    assert await count_expired() == 0
+    assert reaper.stats()["deleted"] == expired
+
+    response = await async_client.get(
+        "/auth/sessions/current/", headers={"Authorization": authorization}
+    )
+    assert response.status_code == 200, response.json()
+
+
+def test_partition_names_and_bounds():
+    december = datetime.date(2026, 12, 1)
+    assert partitions.next_month(december) == datetime.date(2027, 1, 1)
+    assert list(
+        partitions.months(datetime.date(2026, 11, 1), datetime.date(2027, 1, 1))
+    ) == [datetime.date(2026, 11, 1), december, datetime.date(2027, 1, 1)]
+    assert partitions.create_partition_sql(december) == (
+        "CREATE TABLE IF NOT EXISTS user_sessions_y2026m12 PARTITION OF user_sessions "
+        "FOR VALUES FROM ('2026-12-01') TO ('2027-01-01')"
+    )
+
+
+async def test_reaper_deletes_rows_when_partitioning_is_off_or_fails(
+    async_client, mocker
+):
+    authorization = await login(async_client)
+    user_id = (
+        await async_client.get("/users/me", headers={"Authorization": authorization})
+    ).json()["id"]
+    reaper = SessionReaper(
+        session_factory=db_helper.session_factory,
+        interval=60,
+        batch_size=100,
+    )
+
+    await add_sessions(user_id, datetime.datetime(2020, 1, 1), count=2)
+    # user_sessions is a plain table
+    await reaper.reap()
+    assert await count_expired() == 0
+
+    mocker.patch(
+        "src.sessions.reaper.partitions.is_partitioned",
+        side_effect=RuntimeError("not a partitioned table"),
+    )
+    await add_sessions(user_id, datetime.datetime(2020, 1, 1), count=2)
+    await reaper.reap()
+    assert await count_expired() == 0
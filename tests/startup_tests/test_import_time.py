@@ -0,0 +1,31 @@
+import os
+
+from benchmarks.import_time import measure, report
+
+# needed only by the email worker, on boot or when configured
+DEFERRED = (
+    "aiosmtplib",
+    "smtplib",
+    "email.mime",
+    "alembic",
+    "mako",
+    "concurrent.futures.process",
+)
+
+
+def test_app_import_defers_heavy_modules(tmp_path):
+    entries = measure("src.main")
+
+    # the breakdown is kept as an artifact when IMPORTTIME_REPORT is set
+    path = os.environ.get("IMPORTTIME_REPORT", tmp_path / "importtime.txt")
+    with open(path, "w") as file:
+        file.write(report(entries))
+
+    imported = {entry.module for entry in entries}
+    assert "src.main" in imported
+    deferred = [
+        module
+        for module in imported
+        if any(module == name or module.startswith(f"{name}.") for name in DEFERRED)
+    ]
+    assert deferred == []
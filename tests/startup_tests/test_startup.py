@@ -0,0 +1,67 @@
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.database import DatabaseHelper, InstrumentedPool
+from src.startup import Startup, alembic_heads, startup
+
+
+def make_startup(require_schema_head: bool) -> Startup:
+    return Startup(
+        require_schema_head=require_schema_head,
+        warm_connections=5,
+        preload_apps=10,
+        phase_timeout=5,
+    )
+
+
+async def test_check_schema_rejects_unmigrated_database():
+    # the test database is created with `create_all`, not migrated
+    with pytest.raises(RuntimeError, match="expected the Alembic head"):
+        await make_startup(require_schema_head=True).check_schema()
+
+
+async def test_check_schema_can_only_warn(caplog):
+    boot = make_startup(require_schema_head=False)
+    await boot.check_schema()
+    assert "expected the Alembic head" in caplog.text
+    assert "schema" in boot.stats()["phases"]
+
+
+def test_alembic_has_single_head():
+    assert len(alembic_heads()) == 1
+
+
+async def test_warm_up_opens_pool_size_connections(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'warm.db'}",
+        poolclass=InstrumentedPool,
+        pool_size=3,
+        max_overflow=2,
+    )
+    await DatabaseHelper._warm_up_engine(engine, connections=5)
+    pool = engine.pool
+    await engine.dispose()
+
+    # overflow connections would not stay in the pool
+    assert pool.wait_stats()["checkouts"] == 3
+
+
+async def test_ready_probe(async_client, monkeypatch):
+    response = await async_client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["ready"] is False
+
+    monkeypatch.setattr(startup, "ready", True)
+    response = await async_client.get("/ready")
+    assert response.status_code == 200
+
+
+async def test_keys_load_before_serving(mocker):
+    start = mocker.patch("src.startup.key_manager.start")
+    boot = make_startup(require_schema_head=False)
+
+    await boot.load_keys()
+
+    assert start.await_count == 1
+    assert "keys" in boot.stats()["phases"]
+    assert boot.ready is False